@@ -1,32 +1,219 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
+from starlette.requests import Request
 from dotenv import load_dotenv
+import asyncio
+import logging
 import os
+import time
+
+from app.monitoring.instrumentation import instrument_engine, timed_pool_class
+from app.database.routing import ReplicaSet, RoutingSession, PIN_COOKIE, pin_to_primary
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 # Database configuration from environment variables
 DATABASE_URL = os.getenv(
     "DATABASE_URL",
     os.getenv("DEFAULT_DB_URL", "")
 )
 
+# Connection pool tuning from environment variables
+# DB_POOL_SIZE / DB_MAX_OVERFLOW: persistent connections and extra connections under burst
+# DB_POOL_TIMEOUT: seconds to wait for a free connection before failing with PoolSaturatedError
+# DB_POOL_PRE_PING: test each connection on checkout (one extra round trip); when off,
+#   dead connections are detected on use and the pool is invalidated instead
+# DB_POOL_RECYCLE: recycle connections after N seconds (MySQL's default wait_timeout is 8 hours)
+# DB_POOL_RETRY_AFTER: Retry-After seconds sent with the 503 when the pool is saturated
+# DB_STATEMENT_TIMEOUT_MS: abort statements running longer than this (MySQL: SELECTs only; 0 = no limit)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 5))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 3600))
+DB_POOL_RETRY_AFTER = int(os.getenv("DB_POOL_RETRY_AFTER", 1))
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+# DB_POOL_WARMUP: connections opened per engine at startup, so early requests skip connecting
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", DB_POOL_SIZE))
+
+# Optional read replicas (comma-separated) for search / get-by-id / export;
+# writes always go to DATABASE_URL
+DATABASE_READ_URLS = [url.strip() for url in os.getenv("DATABASE_READ_URL", "").split(",") if url.strip()]
+
+
+def engine_options(url: str, label: str = "primary") -> dict:
+    """
+    Keyword arguments for create_engine / create_async_engine built from the
+    DB_POOL_* settings. Sizing options are only passed to queue-based pools
+    (e.g. not to the single-connection pool of in-memory SQLite).
+    """
+    options = {
+        "pool_pre_ping": DB_POOL_PRE_PING,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "echo": False,  # Set to True for SQL query logging during development
+    }
+    # Tracks pool checkout wait time (admission control) and timeouts
+    poolclass = options["poolclass"] = timed_pool_class(url, label)
+    if issubclass(poolclass, QueuePool):
+        options.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+    return options
+
+
+def apply_statement_timeout(engine: Engine, timeout_ms: int = DB_STATEMENT_TIMEOUT_MS) -> None:
+    """
+    Limit how long a single statement may run.
+
+    MySQL enforces max_execution_time (SELECT statements) per session.
+    SQLite has no server-side limit, so a progress handler interrupts a
+    statement once its deadline has passed; the deadline covers execution
+    only, so long streamed reads (exports) are not cut off while fetching.
+    """
+    if timeout_ms <= 0:
+        return
+    dialect = engine.dialect.name
+
+    if dialect == "mysql":
+        @event.listens_for(engine, "connect")
+        def _set_max_execution_time(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f"SET SESSION max_execution_time = {int(timeout_ms)}")
+            cursor.close()
+
+    elif dialect == "sqlite" and not engine.dialect.is_async:
+        @event.listens_for(engine, "connect")
+        def _install_progress_handler(dbapi_connection, connection_record):
+            deadline = connection_record.info["statement_deadline"] = [0.0]
+            # A non-zero return value interrupts the running statement
+            dbapi_connection.set_progress_handler(
+                lambda: deadline[0] and time.monotonic() > deadline[0], 10000
+            )
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _start_deadline(conn, cursor, statement, parameters, context, executemany):
+            conn.info["statement_deadline"][0] = time.monotonic() + timeout_ms / 1000
+
+        @event.listens_for(engine, "after_cursor_execute")
+        def _clear_deadline(conn, cursor, statement, parameters, context, executemany):
+            conn.info["statement_deadline"][0] = 0.0
+
+    else:
+        logger.warning(f"DB_STATEMENT_TIMEOUT_MS is not supported for {dialect} ({engine.driver}); ignoring")
+
+
+def _warmup_count(engine: Engine, count: int) -> int:
+    # Never open more than the pool keeps (single-connection pools keep one)
+    pool = engine.pool
+    return min(count, pool.size() if isinstance(pool, QueuePool) else 1)
+
+
+def warm_pool(engine: Engine, count: int = DB_POOL_WARMUP) -> None:
+    """
+    Open up to `count` connections and return them to the pool.
+    Engines connect lazily, so without this the first requests pay for it.
+    """
+    connections = []
+    try:
+        for _ in range(_warmup_count(engine, count)):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+async def warm_async_pool(engine, count: int = DB_POOL_WARMUP) -> None:
+    """Async counterpart of warm_pool; the connections are opened concurrently."""
+    results = await asyncio.gather(
+        *(engine.connect() for _ in range(_warmup_count(engine.sync_engine, count))), return_exceptions=True
+    )
+    for result in results:
+        if not isinstance(result, BaseException):
+            await result.close()
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+
 # Create SQLAlchemy engine
-# pool_pre_ping: Enables connection health checks before using a connection
-# pool_recycle: Recycles connections after 3600 seconds(1 hour) to prevent stale connections
 # This approach is suitable because:
 # 1. Connection pooling improves performance by reusing connections
-# 2. Pre-ping ensures we don't use dead connections
+# 2. Pre-ping (or invalidation on disconnect) ensures we don't keep using dead connections
 # 3. Pool recycling handles MySQL's default 8-hour connection timeout
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    echo=False  # Set to True for SQL query logging during development
-)
+# 4. A short checkout timeout turns pool exhaustion into a fast, retryable error
+engine = create_engine(DATABASE_URL, **engine_options(DATABASE_URL))
+instrument_engine(engine)
+apply_statement_timeout(engine)
+
+# Read replicas used by read-only routes (falls back to the primary when empty or all unhealthy)
+replica_engines = []
+for index, url in enumerate(DATABASE_READ_URLS):
+    replica = create_engine(url, **engine_options(url, f"replica_{index}"))
+    instrument_engine(replica, f"replica_{index}")
+    apply_statement_timeout(replica)
+    replica_engines.append(replica)
+replicas = ReplicaSet(replica_engines)
 
 #    for creating database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Sessions for read-only routes: reads go to a replica, writes to the primary
+ReadSessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, bind=engine, class_=RoutingSession, replicas=replicas
+)
+
+# Async database path (async engine + async route handlers)
+# Enabled with USE_ASYNC_DB=true; requires aiomysql (MySQL) or aiosqlite (SQLite)
+USE_ASYNC_DB = os.getenv("USE_ASYNC_DB", "false").lower() == "true"
+
+# Async drivers used when deriving the async URL from DATABASE_URL
+ASYNC_DRIVERS = {
+    "mysql": "aiomysql",
+    "sqlite": "aiosqlite",
+}
+
+
+def get_async_database_url(url: str) -> str:
+    """
+    Derive an async driver URL from a sync one,
+    e.g. mysql+pymysql://... -> mysql+aiomysql://...
+    """
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    driver = ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"No async driver configured for '{backend}' databases")
+    return parsed.set(drivername=f"{backend}+{driver}").render_as_string(hide_password=False)
+
+
+async_engine = None
+AsyncSessionLocal = None
+AsyncReadSessionLocal = None
+async_replicas = ReplicaSet()
+
+if USE_ASYNC_DB:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+    ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or get_async_database_url(DATABASE_URL)
+    async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, "async"))
+    instrument_engine(async_engine.sync_engine, "async")
+    apply_statement_timeout(async_engine.sync_engine)
+    # expire_on_commit=False: attributes stay loaded after commit (no implicit async IO)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async_replica_engines = []
+    for index, url in enumerate(DATABASE_READ_URLS):
+        url = get_async_database_url(url)
+        replica = create_async_engine(url, **engine_options(url, f"async_replica_{index}"))
+        instrument_engine(replica.sync_engine, f"async_replica_{index}")
+        apply_statement_timeout(replica.sync_engine)
+        async_replica_engines.append(replica)
+    async_replicas = ReplicaSet(async_replica_engines)
+    AsyncReadSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False,
+        sync_session_class=RoutingSession, replicas=async_replicas
+    )
 
 # Base class for declarative models
 Base = declarative_base()
@@ -42,3 +229,35 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db(request: Request):
+    """
+    Dependency function that provides a session for read-only routes.
+    Reads go to a read replica unless the client recently wrote (read-your-writes).
+    """
+    db = ReadSessionLocal()
+    if PIN_COOKIE in request.cookies:
+        pin_to_primary(db)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    """
+    Dependency function that provides an async database session.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db(request: Request):
+    """
+    Dependency function that provides an async session for read-only routes.
+    """
+    async with AsyncReadSessionLocal() as db:
+        if PIN_COOKIE in request.cookies:
+            pin_to_primary(db)
+        yield db
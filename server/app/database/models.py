@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Index
+from sqlalchemy import Column, Integer, String, Date, DateTime, Index, func
 from app.database.connection import Base
 
 
@@ -25,3 +25,33 @@ class Employee(Base):
 
     def __repr__(self):
         return f"<Employee(id={self.id}, name={self.name}, department={self.department})>"
+
+
+class EmployeeChange(Base):
+    """
+    Change feed: one row per created (later also updated / deleted) employee.
+
+    `seq` is handed out by ChangeSequence inside the writing transaction,
+    so changes become visible in increasing `seq` order.
+    """
+    __tablename__ = "employee_changes"
+
+    seq = Column(Integer, primary_key=True, autoincrement=False)
+    employee_id = Column(Integer, nullable=False)
+    operation = Column(String(10), nullable=False)
+    changed_at = Column(DateTime, nullable=False, server_default=func.now())
+
+    def __repr__(self):
+        return f"<EmployeeChange(seq={self.seq}, employee_id={self.employee_id}, operation={self.operation})>"
+
+
+class ChangeSequence(Base):
+    """
+    Single-row counter of the last change sequence number. Writers bump it
+    first; the row lock it takes is held until commit, which serializes
+    concurrent writers so a lower seq can never become visible after a higher one.
+    """
+    __tablename__ = "change_sequence"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    value = Column(Integer, nullable=False)
@@ -0,0 +1,174 @@
+from itertools import count
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+from dotenv import load_dotenv
+from typing import List, Optional
+import logging
+import os
+import threading
+import time
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Replica selection: "round_robin" or "least_connections"
+REPLICA_STRATEGY = os.getenv("REPLICA_STRATEGY", "round_robin").lower()
+# How long a failing replica is kept out of rotation (health checks can re-admit it earlier)
+REPLICA_EJECT_SECONDS = float(os.getenv("REPLICA_EJECT_SECONDS", 30))
+# Interval of the background replica health check
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", 10))
+# After a write, the writing client reads from the primary for this long (0 disables pinning)
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 5))
+
+# Cookie set on write responses while the client is pinned to the primary
+PIN_COOKIE = "read_primary"
+# Session.info flag that routes every statement of the session to the primary
+PIN_PRIMARY = "pin_primary"
+
+
+class ReplicaSet:
+    """
+    Read replicas behind a load-balancing policy.
+
+    `choose()` picks a healthy replica round-robin or by fewest checked-out
+    connections. A replica whose connection fails is ejected for
+    REPLICA_EJECT_SECONDS; `check_health()` pings every replica and
+    re-admits (or ejects) them early. Engines may be sync or async;
+    routing works on the sync engine underneath either.
+    """
+
+    def __init__(self, engines: List = (), strategy: str = REPLICA_STRATEGY):
+        if strategy not in ("round_robin", "least_connections"):
+            logger.warning(f"Unknown REPLICA_STRATEGY '{strategy}', using round_robin")
+            strategy = "round_robin"
+        self.engines = list(engines)
+        self.strategy = strategy
+        self._binds: List[Engine] = [getattr(e, "sync_engine", e) for e in self.engines]
+        self._ejected_until = {bind: 0.0 for bind in self._binds}
+        self._next = count()
+        self._lock = threading.Lock()
+        for bind in self._binds:
+            event.listen(bind, "handle_error", self._on_error)
+
+    def __bool__(self) -> bool:
+        return bool(self._binds)
+
+    def _on_error(self, context) -> None:
+        # Failed connects (no connection yet) and dropped connections mean the
+        # replica is unhealthy; ordinary statement errors do not.
+        if context.is_disconnect or context.connection is None:
+            self.eject(context.engine)
+
+    def eject(self, bind: Engine) -> None:
+        with self._lock:
+            if self._ejected_until.get(bind, 0.0) <= time.monotonic():
+                logger.warning(f"Ejecting read replica {bind.url.render_as_string()} for {REPLICA_EJECT_SECONDS}s")
+            self._ejected_until[bind] = time.monotonic() + REPLICA_EJECT_SECONDS
+
+    def admit(self, bind: Engine) -> None:
+        with self._lock:
+            if self._ejected_until.get(bind, 0.0) > time.monotonic():
+                logger.info(f"Read replica {bind.url.render_as_string()} is healthy again")
+            self._ejected_until[bind] = 0.0
+
+    def healthy(self) -> List[Engine]:
+        now = time.monotonic()
+        return [bind for bind in self._binds if self._ejected_until[bind] <= now]
+
+    def choose(self) -> Optional[Engine]:
+        """A healthy replica to read from, or None if all are ejected."""
+        candidates = self.healthy()
+        if not candidates:
+            return None
+        if self.strategy == "least_connections":
+            return min(candidates, key=_checked_out)
+        return candidates[next(self._next) % len(candidates)]
+
+    async def check_health(self) -> None:
+        """Ping every replica with SELECT 1, ejecting or re-admitting it."""
+        from starlette.concurrency import run_in_threadpool
+
+        for engine, bind in zip(self.engines, self._binds):
+            try:
+                if bind is engine:
+                    await run_in_threadpool(_ping, engine)
+                else:
+                    async with engine.connect() as conn:
+                        await conn.exec_driver_sql("SELECT 1")
+            except Exception as e:
+                logger.warning(f"Replica health check failed: {str(e)}")
+                self.eject(bind)
+            else:
+                self.admit(bind)
+
+    def stats(self) -> List[dict]:
+        now = time.monotonic()
+        return [
+            {
+                "url": bind.url.render_as_string(),
+                "healthy": self._ejected_until[bind] <= now,
+                "checked_out": _checked_out(bind),
+            }
+            for bind in self._binds
+        ]
+
+
+def _checked_out(bind: Engine) -> int:
+    pool = bind.pool
+    return pool.checkedout() if hasattr(pool, "checkedout") else 0
+
+
+def _ping(engine: Engine) -> None:
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+
+
+class RoutingSession(Session):
+    """
+    Session that sends reads to a read replica and everything else to the primary.
+
+    The replica is chosen once per session, so all reads of a request see
+    the same replica. Flushes and INSERT/UPDATE/DELETE statements always
+    use the primary, as does every statement once the session is pinned
+    with pin_to_primary(). With no healthy replica, reads use the primary.
+    """
+
+    def __init__(self, replicas: Optional[ReplicaSet] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.replicas = replicas
+        self._replica: Optional[Engine] = None
+
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        primary = super().get_bind(mapper, clause=clause, **kw)
+        if (
+            not self.replicas
+            or self._flushing
+            or self.info.get(PIN_PRIMARY)
+            or isinstance(clause, UpdateBase)
+        ):
+            return primary
+        if self._replica is None:
+            self._replica = self.replicas.choose()
+        return self._replica or primary
+
+
+def pin_to_primary(db) -> None:
+    """
+    Route every following statement of this session (sync or async) to the primary.
+    Has no effect on plain sessions, which always use the primary.
+    """
+    db.info[PIN_PRIMARY] = True
+
+
+def pin_client_to_primary(response, replicas: Optional[ReplicaSet], lagging_reads: bool = False) -> None:
+    """
+    After a write, make the client's reads go to the primary for
+    READ_YOUR_WRITES_SECONDS (via a short-lived cookie) so it sees its
+    own write despite replica lag (or, with `lagging_reads`, another read
+    source that trails the primary, such as the in-memory snapshot).
+    """
+    if (replicas or lagging_reads) and READ_YOUR_WRITES_SECONDS > 0:
+        response.set_cookie(PIN_COOKIE, "1", max_age=READ_YOUR_WRITES_SECONDS, httponly=True)
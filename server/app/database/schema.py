@@ -0,0 +1,67 @@
+from sqlalchemy import func, insert, literal, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from dotenv import load_dotenv
+import logging
+import os
+
+from app.database.connection import engine
+from app.database.models import Base, ChangeSequence, Employee, EmployeeChange
+from app.repositories.search_backends import configure_search_backend
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Create missing tables and the full-text index at startup (convenient in development).
+# In production set this to false and run `python migrate.py` as a deploy step instead,
+# so workers start without DDL or schema inspection.
+SCHEMA_AUTO_CREATE = os.getenv("SCHEMA_AUTO_CREATE", "true").lower() == "true"
+
+
+def backfill_change_feed(conn) -> None:
+    """
+    Start the change feed with a 'create' entry per existing employee
+    (seq = id), so reading the feed from 0 replays the whole directory.
+
+    The counter row is inserted first and acts as the lock: when workers
+    migrate at the same time, the others' insert conflicts on it (after
+    waiting for this transaction) and raises IntegrityError.
+    """
+    conn.execute(insert(ChangeSequence).values(id=1, value=0))
+    conn.execute(insert(EmployeeChange).from_select(
+        ["seq", "employee_id", "operation"],
+        select(Employee.id, Employee.id, literal("create")).order_by(Employee.id)
+    ))
+    head = conn.execute(select(func.coalesce(func.max(Employee.id), 0))).scalar_one()
+    conn.execute(update(ChangeSequence).where(ChangeSequence.id == 1).values(value=head))
+    logger.info(f"Change feed started at sequence {head}")
+
+
+def migrate(bind: Engine = engine) -> None:
+    """
+    Create missing tables, the change feed counter and the full-text search
+    index. Safe to run repeatedly, and from several workers at once. The
+    search backend is selected even if the rest fails.
+    """
+    try:
+        Base.metadata.create_all(bind=bind)
+        try:
+            with bind.begin() as conn:
+                if conn.execute(select(ChangeSequence.id)).first() is None:
+                    backfill_change_feed(conn)
+        except IntegrityError:
+            logger.info("Change feed was started by another process")
+    finally:
+        configure_search_backend(bind)
+
+
+def prepare_schema(bind: Engine = engine) -> None:
+    """
+    Startup schema step: migrate when SCHEMA_AUTO_CREATE is on, otherwise
+    only look up the existing full-text index to select the search backend.
+    """
+    if SCHEMA_AUTO_CREATE:
+        migrate(bind)
+    else:
+        configure_search_backend(bind, create_index=False)
@@ -11,3 +11,19 @@ class ValidationError(Exception):
 class EmployeeNotFoundError(Exception):
     """Raised when employee is not found."""
     pass
+
+
+class PoolSaturatedError(DatabaseConnectionError):
+    """Raised when no pooled database connection frees up within the checkout timeout."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitedError(Exception):
+    """Raised when a request is turned away to protect the database (rate limit, admission queue, load shedding)."""
+
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
@@ -1,16 +1,35 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+import asyncio
 import os
+import time
 import httpx
 import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 
 from app.routers import employee_router
-from app.database.connection import engine
-from app.database import models
+from app.database.connection import (
+    engine, async_engine, USE_ASYNC_DB, replicas, async_replicas, SessionLocal, warm_pool, warm_async_pool
+)
+from app.database.routing import REPLICA_HEALTH_INTERVAL
+from app.database.schema import prepare_schema
+from app.services.cache import employee_cache
+from app.services.single_flight import single_flight, async_single_flight
+from app.monitoring.metrics import METRICS_ENABLED, registry
+from app.monitoring.instrumentation import MetricsMiddleware
+from app.middleware.compression import COMPRESSION_ENABLED, CompressionMiddleware
+from app.services.suggest_index import SUGGEST_ENABLED, suggest_index
+from app.services.fuzzy_index import FUZZY_SEARCH_ENABLED, fuzzy_index
+from app.services.snapshot import (
+    SNAPSHOT_REFRESH_SECONDS, build_snapshot, database_collation, directory_snapshot, refresh_snapshot,
+    snapshot_enabled
+)
+from app.repositories.employee_repository import EmployeeRepository
+from starlette.concurrency import run_in_threadpool
 
 # Load environment variables
 load_dotenv()
@@ -19,11 +38,9 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
-
-# Initialize scheduler
-scheduler = AsyncIOScheduler()
+# Rebuild the in-memory indexes every N seconds (0 = only at startup). With several
+# workers, each keeps its own indexes; this picks up employees added through the others.
+INDEX_REFRESH_SECONDS = int(os.getenv("INDEX_REFRESH_SECONDS", 0))
 
 
 async def keep_alive_ping():
@@ -41,10 +58,69 @@ async def keep_alive_ping():
         logger.error(f"Keep-alive ping failed: {str(e)}")
 
 
+def build_search_indexes() -> None:
+    """
+    Load the typeahead and ranked search indexes from a single scan of the
+    employees table (the scan costs about as much as building either index).
+    """
+    db = SessionLocal()
+    try:
+        rows = list(EmployeeRepository(db).iter_index_rows())
+    finally:
+        db.close()
+    if SUGGEST_ENABLED:
+        suggest_index.load(rows)
+    if FUZZY_SEARCH_ENABLED:
+        fuzzy_index.load(rows)
+
+
+def _warmup_steps():
+    """(name, awaitable) pairs run concurrently at startup."""
+    yield "primary pool", run_in_threadpool(warm_pool, engine)
+    for index, replica in enumerate(replicas.engines):
+        yield f"replica_{index} pool", run_in_threadpool(warm_pool, replica)
+    if async_engine is not None:
+        yield "async pool", warm_async_pool(async_engine)
+    for index, replica in enumerate(async_replicas.engines):
+        yield f"async_replica_{index} pool", warm_async_pool(replica)
+    # In-memory typeahead and ranked search indexes, built from the employees table
+    if SUGGEST_ENABLED or FUZZY_SEARCH_ENABLED:
+        yield "search indexes", run_in_threadpool(build_search_indexes)
+    # In-memory directory snapshot serving reads
+    if snapshot_enabled():
+        yield "directory snapshot", run_in_threadpool(build_snapshot)
+
+
+async def warm_up() -> None:
+    """
+    Open pooled connections and build the in-memory indexes concurrently.
+    Failures are logged, not raised: the app still starts and serves what it can.
+    """
+    start = time.perf_counter()
+    names, steps = zip(*_warmup_steps())
+    for name, result in zip(names, await asyncio.gather(*steps, return_exceptions=True)):
+        if isinstance(result, Exception):
+            logger.error(f"Warm-up of {name} failed: {str(result)}")
+    logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Manage application lifespan - startup and shutdown events"""
+    # Schema work happens here rather than at import: creating tables (or, with
+    # SCHEMA_AUTO_CREATE=false, only looking up the full-text index) needs the database
+    try:
+        await run_in_threadpool(prepare_schema)
+    except Exception as e:
+        logger.error(f"Schema setup failed: {str(e)}")
+    # Misconfiguration, not an outage: refuse to start rather than serve without the snapshot
+    if snapshot_enabled():
+        database_collation()
+
+    await warm_up()
+
     # Startup: Start the scheduler
+    scheduler = AsyncIOScheduler()
     scheduler.add_job(
         keep_alive_ping,
         trigger=IntervalTrigger(minutes=14),
@@ -52,6 +128,34 @@ async def lifespan(app: FastAPI):
         name="Ping render service every 14 minutes",
         replace_existing=True
     )
+    # Eject unreachable read replicas and re-admit recovered ones
+    for replica_set, job_id in ((replicas, "replica_health_job"), (async_replicas, "async_replica_health_job")):
+        if replica_set:
+            scheduler.add_job(
+                replica_set.check_health,
+                trigger=IntervalTrigger(seconds=REPLICA_HEALTH_INTERVAL),
+                id=job_id,
+                name="Check read replica health",
+                replace_existing=True
+            )
+    # Periodically rebuild the in-memory indexes (runs on the scheduler's thread pool)
+    if INDEX_REFRESH_SECONDS > 0 and (SUGGEST_ENABLED or FUZZY_SEARCH_ENABLED):
+        scheduler.add_job(
+            build_search_indexes,
+            trigger=IntervalTrigger(seconds=INDEX_REFRESH_SECONDS),
+            id="index_refresh_job",
+            name="Rebuild in-memory search indexes",
+            replace_existing=True
+        )
+    # Keep the directory snapshot current from the change feed (reloads it if startup failed)
+    if snapshot_enabled():
+        scheduler.add_job(
+            refresh_snapshot,
+            trigger=IntervalTrigger(seconds=SNAPSHOT_REFRESH_SECONDS),
+            id="snapshot_refresh_job",
+            name="Refresh in-memory directory snapshot",
+            replace_existing=True
+        )
     scheduler.start()
     logger.info("Keep-alive scheduler started - pinging every 14 minutes")
     
@@ -61,6 +165,11 @@ async def lifespan(app: FastAPI):
     scheduler.shutdown()
     logger.info("Keep-alive scheduler stopped")
 
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in async_replicas.engines:
+        await replica.dispose()
+
 
 app = FastAPI(
     title="Employee Directory API",
@@ -76,10 +185,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
-# Include routers
-app.include_router(employee_router.router, prefix="/api/v1", tags=["employees"])
+# gzip / brotli compression of JSON, NDJSON and CSV bodies above COMPRESSION_MIN_SIZE
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
+# Request latency and per-request SQL metrics (outermost, so it times everything)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+# Include routers (async handlers when the async database path is enabled)
+if USE_ASYNC_DB:
+    from app.routers import async_employee_router
+    app.include_router(async_employee_router.router, prefix="/api/v1", tags=["employees"])
+else:
+    app.include_router(employee_router.router, prefix="/api/v1", tags=["employees"])
 
 
 @app.get("/")
@@ -90,3 +212,63 @@ def root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/cache/stats")
+def cache_stats():
+    """Hit/miss/eviction counters of the employee result cache, plus request coalescing."""
+    coalescing = {
+        "sync": single_flight.counters.stats(),
+        "async": async_single_flight.counters.stats(),
+    }
+    if employee_cache is None:
+        return {"enabled": False, "coalescing": coalescing}
+    return {"enabled": True, **employee_cache.stats(), "coalescing": coalescing}
+
+
+@app.get("/snapshot/stats")
+def snapshot_stats():
+    """Size, memory per employee and staleness of the in-memory directory snapshot."""
+    if not snapshot_enabled():
+        return {"enabled": False}
+    return directory_snapshot.stats()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    """Prometheus metrics in the text exposition format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
+def _cache_gauges():
+    if employee_cache is None:
+        return
+    stats = employee_cache.stats()
+    for key in ("size", "hits", "misses", "evictions"):
+        yield f"employee_cache_{key}", f"Employee result cache {key}", {}, stats[key]
+
+
+registry.register_gauges(_cache_gauges)
+
+
+def _replica_gauges():
+    for replica_set, prefix in ((replicas, "replica"), (async_replicas, "async_replica")):
+        for index, replica in enumerate(replica_set.stats()):
+            labels = {"engine": f"{prefix}_{index}"}
+            yield "db_replica_healthy", "1 if the read replica is in rotation", labels, int(replica["healthy"])
+
+
+registry.register_gauges(_replica_gauges)
+
+
+def _snapshot_gauges():
+    if not snapshot_enabled():
+        return
+    stats = directory_snapshot.stats()
+    yield "snapshot_employees", "Employees in the in-memory directory snapshot", {}, stats["employees"]
+    yield "snapshot_bytes", "Approximate memory used by the directory snapshot", {}, stats["bytes"]
+    yield "snapshot_age_seconds", "Seconds since the directory snapshot was last current", {}, stats["age_seconds"] or 0
+    yield "snapshot_serving", "1 if reads are served from the directory snapshot", {}, int(stats["serving"])
+
+
+registry.register_gauges(_snapshot_gauges)
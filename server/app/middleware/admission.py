@@ -0,0 +1,286 @@
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dotenv import load_dotenv
+from fastapi import HTTPException, Request
+from typing import Mapping, Optional, Tuple
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+
+from app.database.connection import DB_POOL_RETRY_AFTER, DB_POOL_SIZE
+from app.exceptions.custom_exceptions import RateLimitedError, ValidationError
+from app.monitoring.instrumentation import checkout_latency
+from app.monitoring.metrics import ADMISSION_REJECTIONS, registry
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Per-client token buckets, charged by search cost (each worker keeps its own
+# buckets unless RATE_LIMIT_REDIS_URL shares them)
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "false").lower() == "true"
+RATE_LIMIT_PER_SECOND = float(os.getenv("RATE_LIMIT_PER_SECOND", 10))
+RATE_LIMIT_BURST = float(os.getenv("RATE_LIMIT_BURST", 40))
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", "")
+# Seconds to wait for Redis before letting the request through unlimited
+RATE_LIMIT_REDIS_TIMEOUT = float(os.getenv("RATE_LIMIT_REDIS_TIMEOUT", 0.1))
+# Identify clients by the first X-Forwarded-For address (only behind a proxy that sets it)
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true"
+
+# Cost-based admission control of searches, per worker
+# ADMISSION_MAX_COST: searches costing more are rejected with 400 (0 = no limit)
+# ADMISSION_EXPENSIVE_COST / ADMISSION_MAX_EXPENSIVE: searches costing at least this
+#   run at most N at a time (default: half the pool, so cheap reads still get connections);
+#   the rest wait up to ADMISSION_QUEUE_SECONDS, then get 429
+# ADMISSION_SHED_LATENCY_MS: answer searches with 429 while pool checkouts take longer (0 = never);
+#   revalidations (If-None-Match) are not shed
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+ADMISSION_MAX_COST = int(os.getenv("ADMISSION_MAX_COST", 0))
+ADMISSION_EXPENSIVE_COST = int(os.getenv("ADMISSION_EXPENSIVE_COST", 8))
+ADMISSION_MAX_EXPENSIVE = int(os.getenv("ADMISSION_MAX_EXPENSIVE", max(1, DB_POOL_SIZE // 2)))
+ADMISSION_QUEUE_SECONDS = float(os.getenv("ADMISSION_QUEUE_SECONDS", 2))
+ADMISSION_SHED_LATENCY_MS = float(os.getenv("ADMISSION_SHED_LATENCY_MS", 250))
+
+# Rows skipped by OFFSET that cost as much as one keyword
+OFFSET_COST_ROWS = 1000
+# Clients whose buckets are kept in memory (least recently seen are dropped first)
+MAX_TRACKED_CLIENTS = 10000
+
+_TRUE = ("1", "true", "yes", "on")
+
+
+def search_cost(params: Mapping[str, str]) -> int:
+    """
+    Estimated database cost of a search, in units of a plain page:
+    one per keyword (each adds predicates on name and department), one per
+    OFFSET_COST_ROWS rows skipped by offset (cursors skip nothing), and two
+    for the facet aggregate of `envelope`.
+    """
+    cost = 1 + len((params.get("search") or "").split())
+    if not params.get("cursor"):
+        try:
+            cost += max(int(params.get("offset") or 0), 0) // OFFSET_COST_ROWS
+        except ValueError:
+            pass
+    if (params.get("envelope") or "").lower() in _TRUE:
+        cost += 2
+    return cost
+
+
+class LocalRateLimitStore:
+    """
+    Token buckets in this worker's memory. With several workers each one
+    limits separately, so a client gets up to WORKERS times the rate.
+    """
+
+    def __init__(self, max_clients: int = MAX_TRACKED_CLIENTS):
+        self.max_clients = max_clients
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> float:
+        """Take `cost` tokens; returns 0 if granted, else seconds until they would be."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return wait
+
+
+class RedisRateLimitStore:
+    """
+    Token buckets shared by all workers, updated atomically by a Lua script.
+
+    Any Redis-protocol server (a local redis-server works) can be used.
+    Calls are async and time out after `timeout` seconds; if the server
+    cannot be reached in time, requests are let through rather than failed.
+    """
+
+    prefix = "rate_limit:"
+    script = """
+    local cost, rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+    local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+    local tokens = tonumber(bucket[1]) or burst
+    local updated_at = tonumber(bucket[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+    local wait = 0
+    if tokens >= cost then
+        tokens = tokens - cost
+    else
+        wait = (cost - tokens) / rate
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url: str, timeout: float = RATE_LIMIT_REDIS_TIMEOUT):
+        import redis.asyncio
+
+        self._client = redis.asyncio.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._take = self._client.register_script(self.script)
+
+    async def take(self, key: str, cost: float, rate: float, burst: float) -> float:
+        try:
+            return float(await self._take(keys=[self.prefix + key], args=[cost, rate, burst, time.time()]))
+        except Exception as e:
+            logger.warning(f"Rate limit check failed: {str(e)}")
+            return 0.0
+
+
+class RateLimiter:
+    """
+    Per-client token bucket: `burst` tokens, refilled at `rate` per second.
+    Each request takes as many tokens as it costs (capped at the bucket size,
+    so every request can eventually pass).
+    """
+
+    def __init__(self, store, rate: float = RATE_LIMIT_PER_SECOND, burst: float = RATE_LIMIT_BURST):
+        self.store = store
+        self.rate = rate
+        self.burst = burst
+
+    async def check(self, client: str, cost: float = 1) -> None:
+        wait = await self.store.take(client, min(cost, self.burst), self.rate, self.burst)
+        if wait > 0:
+            raise RateLimitedError("Too many requests, please slow down", retry_after=math.ceil(wait))
+
+
+class AdmissionController:
+    """
+    Admits searches by estimated cost: rejects those above `max_cost`,
+    runs at most `max_expensive` costly ones at a time (others queue for
+    up to `queue_seconds`), and sheds all of them while pool checkouts
+    are slower than `shed_latency_ms`, before the pool starts timing out.
+    """
+
+    def __init__(
+        self,
+        max_cost: int = ADMISSION_MAX_COST,
+        expensive_cost: int = ADMISSION_EXPENSIVE_COST,
+        max_expensive: int = ADMISSION_MAX_EXPENSIVE,
+        queue_seconds: float = ADMISSION_QUEUE_SECONDS,
+        shed_latency_ms: float = ADMISSION_SHED_LATENCY_MS
+    ):
+        self.max_cost = max_cost
+        self.expensive_cost = expensive_cost
+        self.queue_seconds = queue_seconds
+        self.shed_latency_ms = shed_latency_ms
+        self._slots = asyncio.Semaphore(max_expensive)
+        self.running = 0
+        self.queued = 0
+
+    def check(self, cost: int, revalidation: bool = False) -> None:
+        """
+        Reject searches above the cost cap, and shed load while the pool is
+        slow. Revalidations are not shed: their answer is usually cached and
+        a 304 costs the client nothing to receive.
+        """
+        if self.max_cost and cost > self.max_cost:
+            raise ValidationError("Search is too expensive: use fewer keywords, or a cursor instead of a deep offset")
+        if revalidation:
+            return
+        if self.shed_latency_ms and checkout_latency.seconds() * 1000 > self.shed_latency_ms:
+            raise RateLimitedError("Database is overloaded, please retry", retry_after=DB_POOL_RETRY_AFTER)
+
+    @asynccontextmanager
+    async def slot(self, cost: int):
+        """Hold one of the expensive-search slots while the search runs (cheap searches pass through)."""
+        if cost < self.expensive_cost:
+            yield
+            return
+        self.queued += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_seconds)
+        except asyncio.TimeoutError:
+            raise RateLimitedError("Too many expensive searches in progress, please retry", retry_after=1)
+        finally:
+            self.queued -= 1
+        self.running += 1
+        try:
+            yield
+        finally:
+            self.running -= 1
+            self._slots.release()
+
+
+def _create_rate_limiter() -> Optional[RateLimiter]:
+    if not RATE_LIMIT_ENABLED:
+        return None
+    if RATE_LIMIT_REDIS_URL:
+        try:
+            return RateLimiter(RedisRateLimitStore(RATE_LIMIT_REDIS_URL))
+        except ImportError:
+            logger.warning("RATE_LIMIT_REDIS_URL is set but the redis package is not installed; limiting per worker")
+    return RateLimiter(LocalRateLimitStore())
+
+
+# Shared instances used by admit_search (None when disabled)
+rate_limiter = _create_rate_limiter()
+admission = AdmissionController() if ADMISSION_ENABLED else None
+
+
+def client_key(request: Request) -> str:
+    """The address a client is rate limited by."""
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _reject(reason: str, status_code: int, error: Exception, headers: Optional[dict] = None) -> HTTPException:
+    ADMISSION_REJECTIONS.labels(reason).inc()
+    return HTTPException(status_code=status_code, detail=str(error), headers=headers)
+
+
+async def admit_search(request: Request):
+    """
+    Route dependency guarding search: cost limit and load shedding (not
+    applied to If-None-Match revalidations), then the client's rate limit,
+    then an expensive-search slot held until the handler has finished.
+    Rejections are 400 (too expensive) or 429 with Retry-After.
+    """
+    cost = search_cost(request.query_params)
+    try:
+        if admission is not None:
+            admission.check(cost, revalidation="if-none-match" in request.headers)
+    except ValidationError as e:
+        raise _reject("too_expensive", 400, e)
+    except RateLimitedError as e:
+        raise _reject("overloaded", 429, e, {"Retry-After": str(e.retry_after)})
+    try:
+        if rate_limiter is not None:
+            await rate_limiter.check(client_key(request), cost)
+    except RateLimitedError as e:
+        raise _reject("rate_limited", 429, e, {"Retry-After": str(e.retry_after)})
+    if admission is None:
+        yield
+        return
+    try:
+        async with admission.slot(cost):
+            yield
+    except RateLimitedError as e:
+        raise _reject("queue_timeout", 429, e, {"Retry-After": str(e.retry_after)})
+
+
+def _admission_gauges():
+    yield "db_pool_checkout_latency_seconds", "Recent pool checkout wait used for load shedding", {}, \
+        checkout_latency.seconds()
+    if admission is not None:
+        yield "admission_expensive_running", "Expensive searches holding a slot", {}, admission.running
+        yield "admission_expensive_queued", "Expensive searches waiting for a slot", {}, admission.queued
+
+
+registry.register_gauges(_admission_gauges)
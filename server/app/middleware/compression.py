@@ -0,0 +1,159 @@
+from dotenv import load_dotenv
+import logging
+import os
+import zlib
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Response compression (gzip, plus brotli when the `brotli` package is installed)
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+# Bodies smaller than this are sent as-is (compression would not pay for itself)
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Only text-like bodies are worth compressing; event streams must not be buffered
+_COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html")
+
+
+class _GzipEncoder:
+    name = "gzip"
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliEncoder:
+    name = "br"
+
+    def __init__(self):
+        self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+
+    def process(self, data: bytes) -> bytes:
+        return self._compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+def _accepted_encodings(header: str) -> set:
+    accepted = set()
+    for part in header.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        name, _, value = params.replace(" ", "").partition("=")
+        try:
+            if name == "q" and float(value) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip())
+    return accepted
+
+
+def choose_encoder(accept_encoding: str):
+    """Encoder class for the client's Accept-Encoding (brotli preferred), or None."""
+    accepted = _accepted_encodings(accept_encoding)
+    if brotli is not None and "br" in accepted:
+        return _BrotliEncoder
+    if "gzip" in accepted:
+        return _GzipEncoder
+    return None
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware compressing JSON / NDJSON / CSV responses with brotli
+    or gzip, chosen from Accept-Encoding.
+
+    Complete bodies below `min_size` are sent uncompressed. Streaming bodies
+    (exports) are compressed chunk by chunk, so memory use stays flat.
+    """
+
+    def __init__(self, app, min_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+        encoder_class = choose_encoder(accept_encoding)
+        if encoder_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        encoder = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, encoder, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                content_type = headers.get(b"content-type", b"").decode("latin-1").split(";")[0].strip()
+                if b"content-encoding" in headers or content_type not in _COMPRESSIBLE_TYPES:
+                    passthrough = True
+                    await send(message)
+                    return
+                # Hold the headers until the first body chunk decides the encoding
+                start_message = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if encoder is None:
+                headers = [
+                    (name, value) for name, value in start_message.get("headers", [])
+                    if name.lower() not in (b"content-length", b"vary")
+                ]
+                vary = [value for name, value in start_message.get("headers", []) if name.lower() == b"vary"]
+                headers.append((b"vary", b", ".join(vary + [b"Accept-Encoding"])))
+                if not more_body and len(body) < self.min_size:
+                    start_message["headers"] = headers + [
+                        (name, value) for name, value in start_message.get("headers", [])
+                        if name.lower() == b"content-length"
+                    ]
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                encoder = encoder_class()
+                headers.append((b"content-encoding", encoder.name.encode("latin-1")))
+                data = encoder.process(body)
+                if not more_body:
+                    data += encoder.finish()
+                    headers.append((b"content-length", str(len(data)).encode("latin-1")))
+                start_message["headers"] = headers
+                await send(start_message)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            data = encoder.process(body)
+            if not more_body:
+                data += encoder.finish()
+            await send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,233 @@
+from contextvars import ContextVar
+from functools import wraps
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from time import perf_counter
+from typing import Optional
+import inspect
+import math
+import threading
+
+try:
+    # Async engines check out connections from greenlets sharing the event loop's thread
+    from greenlet import getcurrent as _current_waiter
+except ImportError:
+    _current_waiter = threading.get_ident
+
+from app.monitoring.metrics import (
+    DB_POOL_CHECKOUT_DURATION,
+    DB_POOL_TIMEOUTS,
+    DB_QUERY_DURATION,
+    HTTP_REQUEST_DB_DURATION,
+    HTTP_REQUEST_DB_QUERIES,
+    HTTP_REQUEST_DURATION,
+    LAYER_DURATION,
+    METRICS_ENABLED,
+    registry,
+)
+
+
+class RequestStats:
+    """SQL statements and time accumulated by the current HTTP request."""
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Stats of the request being handled; copied into threadpool workers with the context
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency per route and status, plus the
+    number and total time of SQL statements each request executed.
+    Routes are labelled by endpoint name (e.g. "search_employees"), which
+    is stable however routers are mounted; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = perf_counter() - start
+            current_request_stats.reset(token)
+            route = scope.get("route")
+            name = getattr(route, "name", None) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(scope["method"], name, str(status)).observe(elapsed)
+            HTTP_REQUEST_DB_QUERIES.labels(name).observe(stats.queries)
+            HTTP_REQUEST_DB_DURATION.labels(name).observe(stats.db_seconds)
+
+
+def instrument_engine(engine: Engine, label: str = "primary") -> None:
+    """
+    Time every SQL statement on the engine (SQLAlchemy cursor events) and
+    publish connection pool size / checked-out / overflow gauges.
+    """
+    if not METRICS_ENABLED:
+        return
+    query_duration = DB_QUERY_DURATION.labels(label)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started_at", []).append(perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = perf_counter() - conn.info["query_started_at"].pop()
+        query_duration.observe(elapsed)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        conn = context.connection
+        if conn is not None and conn.info.get("query_started_at"):
+            conn.info["query_started_at"].pop()
+
+    def pool_gauges():
+        pool = engine.pool
+        labels = {"engine": label}
+        if hasattr(pool, "size"):
+            yield "db_pool_size", "Configured connection pool size", labels, pool.size()
+        if hasattr(pool, "checkedout"):
+            yield "db_pool_checked_out", "Connections currently checked out", labels, pool.checkedout()
+        if hasattr(pool, "overflow"):
+            yield "db_pool_overflow", "Connections opened beyond pool_size", labels, max(0, pool.overflow())
+
+    registry.register_gauges(pool_gauges)
+
+
+class CheckoutLatency:
+    """
+    Recent pool checkout wait, across all engines: the slowest recent
+    checkout, fading exponentially (time constant `decay_seconds`), or the
+    longest wait still in progress. Read by admission control to shed load
+    before the pool times out.
+
+    Lock-free: each waiter (thread, or greenlet for async engines) records
+    its start time under its own key, and completed waits replace the
+    decayed peak last-writer-wins. A checkout finishing at the same moment
+    as another may be forgotten; the next one makes up for it.
+    """
+
+    def __init__(self, decay_seconds: float = 1.0):
+        self.decay_seconds = decay_seconds
+        # (seconds, measured at), replaced as one object so readers never see a torn pair
+        self._peak = (0.0, perf_counter())
+        self._waiting = {}
+
+    def _decayed(self, now: float) -> float:
+        peak, updated_at = self._peak
+        return peak * math.exp(-(now - updated_at) / self.decay_seconds)
+
+    def start(self) -> float:
+        started = perf_counter()
+        self._waiting[_current_waiter()] = started
+        return started
+
+    def finish(self, started: float) -> None:
+        self._waiting.pop(_current_waiter(), None)
+        now = perf_counter()
+        # A checkout counts fully when it completes, then fades
+        self._peak = (max(self._decayed(now), now - started), now)
+
+    def seconds(self) -> float:
+        """Current checkout latency estimate, including the longest wait in progress."""
+        now = perf_counter()
+        oldest = min(list(self._waiting.values()), default=now)
+        return max(self._decayed(now), now - oldest)
+
+
+# Shared by every engine's pool
+checkout_latency = CheckoutLatency()
+
+
+def timed_pool_class(url: str, label: str = "primary"):
+    """
+    The dialect's default pool class, with checkout wait time tracked for
+    admission control (checkout_latency) and, when metrics are enabled,
+    checkout wait time and timeouts recorded.
+    Pass as `poolclass` to create_engine.
+    """
+    parsed = make_url(url)
+    base = parsed.get_dialect().get_pool_class(parsed)
+    checkout_duration = DB_POOL_CHECKOUT_DURATION.labels(label)
+    timeouts = DB_POOL_TIMEOUTS.labels(label)
+
+    def connect(self):
+        start = checkout_latency.start()
+        try:
+            return base.connect(self)
+        except PoolTimeoutError:
+            if METRICS_ENABLED:
+                timeouts.inc()
+            raise
+        finally:
+            checkout_latency.finish(start)
+            if METRICS_ENABLED:
+                checkout_duration.observe(perf_counter() - start)
+
+    return type(f"Timed{base.__name__}", (base,), {"connect": connect})
+
+
+def instrument_layer(layer: str):
+    """
+    Class decorator timing every public method into layer_duration_seconds.
+    Generator methods are left alone (their work happens while iterating).
+    """
+    def decorate(cls):
+        if not METRICS_ENABLED:
+            return cls
+        for name, method in list(vars(cls).items()):
+            if name.startswith("_") or not inspect.isfunction(method):
+                continue
+            if inspect.isgeneratorfunction(method) or inspect.isasyncgenfunction(method):
+                continue
+            setattr(cls, name, _timed(method, LAYER_DURATION.labels(layer, name)))
+        return cls
+    return decorate
+
+
+def _timed(method, histogram):
+    if inspect.iscoroutinefunction(method):
+        @wraps(method)
+        async def async_wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                histogram.observe(perf_counter() - start)
+        return async_wrapper
+
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            histogram.observe(perf_counter() - start)
+    return wrapper
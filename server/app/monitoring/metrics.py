@@ -0,0 +1,203 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from dotenv import load_dotenv
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+import os
+
+load_dotenv()
+
+# Prometheus-style metrics at GET /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+
+# Latency buckets in seconds, from 0.5ms to 10s
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+# Metric updates are plain in-place increments without locks. Under the GIL
+# a concurrent increment can very rarely be lost, which is fine for monitoring
+# and keeps the request hot path free of lock contention.
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _CounterChild:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+class _Metric(ABC):
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        if not self.labelnames:
+            self._default = self._new_child()
+
+    @abstractmethod
+    def _new_child(self):
+        """The value holder of one label combination."""
+
+    @abstractmethod
+    def _render_child(self, values, child) -> List[str]:
+        """Exposition lines of one label combination."""
+
+    def labels(self, *values: str):
+        child = self._children.get(values)
+        if child is None:
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _items(self):
+        if not self.labelnames:
+            return [((), self._default)]
+        return list(self._children.items())
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in self._items():
+            lines.extend(self._render_child(values, child))
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def _render_child(self, values, child):
+        return [f"{self.name}{_format_labels(self.labelnames, values)} {child.value}"]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def _render_child(self, values, child):
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, child.counts):
+            cumulative += count
+            le = _format_labels(self.labelnames, values, f'le="{bound}"')
+            lines.append(f"{self.name}_bucket{le} {cumulative}")
+        cumulative += child.counts[-1]
+        inf = _format_labels(self.labelnames, values, 'le="+Inf"')
+        lines.append(f"{self.name}_bucket{inf} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labelnames, values)} {child.sum}")
+        lines.append(f"{self.name}_count{_format_labels(self.labelnames, values)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    Holds metrics and gauge callbacks, and renders the Prometheus text format.
+    Gauges are computed at scrape time, so they cost nothing on the hot path.
+    """
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+        self._gauge_callbacks: List[Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        metric = Histogram(name, documentation, labelnames, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def register_gauges(self, callback: Callable[[], Iterable[Tuple[str, str, Dict[str, str], float]]]) -> None:
+        """
+        Register a callback yielding (name, documentation, labels, value) gauge samples.
+        """
+        self._gauge_callbacks.append(callback)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        documented = set()
+        for callback in self._gauge_callbacks:
+            for name, documentation, labels, value in callback():
+                if name not in documented:
+                    documented.add(name)
+                    lines.append(f"# HELP {name} {documentation}")
+                    lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name}{_format_labels(list(labels), list(labels.values()))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route", "status")
+)
+HTTP_REQUEST_DB_QUERIES = registry.histogram(
+    "http_request_db_queries", "SQL statements executed per HTTP request", ("route",), buckets=COUNT_BUCKETS
+)
+HTTP_REQUEST_DB_DURATION = registry.histogram(
+    "http_request_db_duration_seconds", "Total SQL execution time per HTTP request", ("route",)
+)
+DB_QUERY_DURATION = registry.histogram(
+    "db_query_duration_seconds", "SQL statement execution time", ("engine",)
+)
+DB_POOL_CHECKOUT_DURATION = registry.histogram(
+    "db_pool_checkout_duration_seconds", "Time spent waiting for a pooled connection", ("engine",)
+)
+DB_POOL_TIMEOUTS = registry.counter(
+    "db_pool_timeouts_total", "Pool checkouts that gave up waiting for a connection", ("engine",)
+)
+COALESCED_REQUESTS = registry.counter(
+    "singleflight_requests_total", "Reads that ran a query (leader) or shared one in flight (coalesced)",
+    ("operation", "role")
+)
+ADMISSION_REJECTIONS = registry.counter(
+    "admission_rejections_total", "Searches turned away by rate limiting or admission control", ("reason",)
+)
+LAYER_DURATION = registry.histogram(
+    "layer_duration_seconds", "Time spent in repository and service methods", ("layer", "operation")
+)
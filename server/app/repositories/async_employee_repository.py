@@ -0,0 +1,130 @@
+from sqlalchemy import select, func
+from sqlalchemy.engine import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Sequence, Tuple
+
+from app.database.models import ChangeSequence, Employee
+from app.schemas.employee import EmployeeCreate
+from app.repositories.employee_repository import (
+    LOOKUP_CHUNK_SIZE, RESPONSE_COLUMNS, build_changes_query, build_search_query, record_changes
+)
+from app.repositories.search_backends import SearchBackend, get_search_backend
+from app.monitoring.instrumentation import instrument_layer
+
+
+@instrument_layer("repository")
+class AsyncEmployeeRepository:
+    """
+    Async counterpart of EmployeeRepository, used with an AsyncSession.
+    Shares query building with the sync repository.
+    """
+
+    def __init__(self, db: AsyncSession, search_backend: Optional[SearchBackend] = None):
+        self.db = db
+        self.search_backend = search_backend or get_search_backend()
+
+    async def search(
+        self,
+        search: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        after: Optional[Tuple[str, int]] = None
+    ) -> List[Employee]:
+        """
+        Search employees by name or department (see EmployeeRepository.search).
+        """
+        stmt = build_search_query(select(Employee), self.search_backend, search, limit, offset, after)
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
+    async def search_rows(
+        self,
+        search: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        after: Optional[Tuple[str, int]] = None
+    ) -> List[Row]:
+        """
+        Same as search(), but selects RESPONSE_COLUMNS as plain row tuples.
+        """
+        stmt = build_search_query(select(*RESPONSE_COLUMNS), self.search_backend, search, limit, offset, after)
+        result = await self.db.execute(stmt)
+        return list(result.all())
+
+    async def facet_counts(self, search: Optional[str] = None) -> List[Row]:
+        """
+        Count matching employees per (department, designation) in one grouped query.
+        """
+        keywords = search.lower().split() if search else []
+        stmt = self.search_backend.filter(
+            select(Employee.department, Employee.designation, func.count().label("count")), keywords
+        ).group_by(Employee.department, Employee.designation)
+        result = await self.db.execute(stmt)
+        return list(result.all())
+
+    async def get_by_id(self, employee_id: int) -> Optional[Employee]:
+        """
+        Get an employee by their ID.
+        """
+        result = await self.db.execute(select(Employee).where(Employee.id == employee_id))
+        return result.scalars().first()
+
+    async def get_rows_by_ids(self, ids: Sequence[int], chunk_size: int = LOOKUP_CHUNK_SIZE) -> List[Row]:
+        """
+        Fetch RESPONSE_COLUMNS rows for the given ids, one IN query per chunk.
+        """
+        rows = []
+        for start in range(0, len(ids), chunk_size):
+            result = await self.db.execute(
+                select(*RESPONSE_COLUMNS).where(Employee.id.in_(ids[start:start + chunk_size]))
+            )
+            rows.extend(result.all())
+        return rows
+
+    async def get_by_email(self, email: str) -> Optional[Employee]:
+        """
+        Get an employee by their email address.
+        """
+        result = await self.db.execute(select(Employee).where(Employee.email == email))
+        return result.scalars().first()
+
+    async def create(self, employee_data: EmployeeCreate) -> Employee:
+        """
+        Create a new employee record.
+        """
+        db_employee = Employee(
+            name=employee_data.name,
+            email=employee_data.email,
+            department=employee_data.department,
+            designation=employee_data.designation,
+            date_of_joining=employee_data.date_of_joining
+        )
+        self.db.add(db_employee)
+        await self.db.flush()
+        # Keep the search index and the change feed in sync within the same transaction
+        await self.db.run_sync(lambda session: self.search_backend.index(session, db_employee))
+        await self.db.run_sync(lambda session: record_changes(session, [db_employee.id], "create"))
+        await self.db.commit()
+        await self.db.refresh(db_employee)
+        return db_employee
+
+    async def get_changes(self, since: int = 0, limit: int = 1000) -> List[Row]:
+        """
+        Change feed entries after sequence number `since`.
+        """
+        result = await self.db.execute(build_changes_query(since, limit))
+        return result.all()
+
+    async def get_change_head(self) -> int:
+        """
+        Sequence number of the latest change (0 before the first one).
+        """
+        result = await self.db.execute(select(ChangeSequence.value).where(ChangeSequence.id == 1))
+        return result.scalar() or 0
+
+    async def get_all(self, limit: int = 100, offset: int = 0) -> List[Employee]:
+        """
+        Get all employees with pagination.
+        """
+        result = await self.db.execute(select(Employee).offset(offset).limit(limit))
+        return list(result.scalars().all())
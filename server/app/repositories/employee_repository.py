@@ -1,46 +1,168 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
-from typing import List, Optional
+from sqlalchemy import or_, insert, select, update, func
+from sqlalchemy.engine import Row
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
 
-from app.database.models import Employee
+from app.database.models import ChangeSequence, Employee, EmployeeChange
 from app.schemas.employee import EmployeeCreate
+from app.repositories.search_backends import SearchBackend, get_search_backend
+from app.monitoring.instrumentation import instrument_layer
 
+# Columns returned by exports, in output order
+EXPORT_COLUMNS = (
+    Employee.id,
+    Employee.name,
+    Employee.email,
+    Employee.department,
+    Employee.designation,
+    Employee.date_of_joining,
+)
 
+# Columns of the read-only search fast path, in EmployeeResponse field order
+RESPONSE_COLUMNS = (
+    Employee.name,
+    Employee.email,
+    Employee.department,
+    Employee.designation,
+    Employee.date_of_joining,
+    Employee.id,
+)
+
+# Columns loaded into the in-memory suggest and fuzzy search indexes
+INDEX_COLUMNS = (Employee.id, Employee.name, Employee.department, Employee.designation)
+
+# Columns of a change feed entry, followed by RESPONSE_COLUMNS of the employee (None once deleted)
+CHANGE_COLUMNS = (EmployeeChange.seq, EmployeeChange.operation, EmployeeChange.employee_id, EmployeeChange.changed_at)
+
+# Ids per IN query of a batch lookup (stays under bind-parameter limits, e.g. SQLite's)
+LOOKUP_CHUNK_SIZE = 500
+
+
+def build_search_query(
+    query,
+    search_backend: SearchBackend,
+    search: Optional[str] = None,
+    limit: int = 50,
+    offset: int = 0,
+    after: Optional[Tuple[str, int]] = None
+):
+    """
+    Apply keyword filtering, ordering and pagination to an Employee query.
+
+    Works on both a legacy ORM `Query` and a 2.0 `select()` statement, so
+    the sync and async repositories share the same search logic.
+    """
+    keywords = search.lower().split() if search else []
+    query = search_backend.filter(query, keywords)
+
+    if after is not None:
+        last_name, last_id = after
+        # The redundant `name >= last_name` gives the planner an index range to seek
+        query = query.filter(
+            Employee.name >= last_name,
+            or_(Employee.name > last_name, Employee.id > last_id)
+        )
+        offset = 0
+
+    return query.order_by(Employee.name, Employee.id).offset(offset).limit(limit)
+
+
+def record_changes(db: Session, employee_ids: Sequence[int], operation: str) -> None:
+    """
+    Append changes to the change feed inside the caller's transaction.
+
+    Bumping the ChangeSequence row first reserves a block of sequence
+    numbers and locks the row until commit, so concurrent writers commit
+    their changes in sequence order. Shared by the sync and async
+    repositories (the async one calls it through run_sync).
+    """
+    if not employee_ids:
+        return
+    bump = update(ChangeSequence).where(ChangeSequence.id == 1).values(value=ChangeSequence.value + len(employee_ids))
+    if db.execute(bump).rowcount == 0:
+        # First change ever (migrate.py normally creates the row)
+        db.execute(insert(ChangeSequence).values(id=1, value=len(employee_ids)))
+    last = db.execute(select(ChangeSequence.value).where(ChangeSequence.id == 1)).scalar_one()
+    first = last - len(employee_ids) + 1
+    db.execute(insert(EmployeeChange), [
+        {"seq": first + offset, "employee_id": employee_id, "operation": operation}
+        for offset, employee_id in enumerate(employee_ids)
+    ])
+
+
+def build_changes_query(since: int, limit: int):
+    """
+    Changes after sequence number `since`, oldest first, each joined with
+    the employee's current RESPONSE_COLUMNS.
+    """
+    return (
+        select(*CHANGE_COLUMNS, *RESPONSE_COLUMNS)
+        .outerjoin(Employee, Employee.id == EmployeeChange.employee_id)
+        .where(EmployeeChange.seq > since)
+        .order_by(EmployeeChange.seq)
+        .limit(limit)
+    )
+
+
+@instrument_layer("repository")
 class EmployeeRepository:
     """
     Repository layer for database operations on Employee model.
     Encapsulates all database queries and operations.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, search_backend: Optional[SearchBackend] = None):
         self.db = db
+        self.search_backend = search_backend or get_search_backend()
 
     def search(
         self,
         search: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
+        offset: int = 0,
+        after: Optional[Tuple[str, int]] = None
     ) -> List[Employee]:
         """
         Search employees by name or department.
         
-        Search is performed using LIKE with wildcards for partial matching.
-        The query is optimized by:
-        1. Using indexed columns (name, department)
-        2. Limiting results to prevent large data transfers
-        3. Using offset for pagination
+        Every keyword must match the name or the department (partial match).
+        Matching is delegated to the configured search backend, which uses a
+        full-text index where available and falls back to ILIKE otherwise.
+
+        Results are ordered by (name, id). Pass `after` as the (name, id) of
+        the last row of the previous page for keyset pagination: the index on
+        name seeks straight to the next page instead of skipping `offset` rows.
+        """
+        query = build_search_query(
+            self.db.query(Employee), self.search_backend, search, limit, offset, after
+        )
+        return query.all()
+
+    def search_rows(
+        self,
+        search: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        after: Optional[Tuple[str, int]] = None
+    ) -> List[Row]:
+        """
+        Same as search(), but selects RESPONSE_COLUMNS as plain row tuples.
+        Read-only: no ORM instances, identity map or change tracking.
+        """
+        stmt = build_search_query(select(*RESPONSE_COLUMNS), self.search_backend, search, limit, offset, after)
+        return self.db.execute(stmt).all()
+
+    def facet_counts(self, search: Optional[str] = None) -> List[Row]:
+        """
+        Count matching employees per (department, designation) in one grouped
+        query sharing the search filter. Totals per department, per
+        designation and overall are sums over these rows.
         """
         keywords = search.lower().split() if search else []
-        query = self.db.query(Employee)
-        for kw in keywords:
-            query = query.filter(
-                or_(
-                    Employee.name.ilike(f"%{kw}%"),
-                    Employee.department.ilike(f"%{kw}%")
-                )
-            )
-    
-        return query.order_by(Employee.name).offset(offset).limit(limit).all()
+        stmt = self.search_backend.filter(
+            select(Employee.department, Employee.designation, func.count().label("count")), keywords
+        ).group_by(Employee.department, Employee.designation)
+        return self.db.execute(stmt).all()
 
     def get_by_id(self, employee_id: int) -> Optional[Employee]:
         """
@@ -48,6 +170,17 @@ class EmployeeRepository:
         """
         return self.db.query(Employee).filter(Employee.id == employee_id).first()
 
+    def get_rows_by_ids(self, ids: Sequence[int], chunk_size: int = LOOKUP_CHUNK_SIZE) -> List[Row]:
+        """
+        Fetch RESPONSE_COLUMNS rows for the given ids, one IN query per chunk.
+        Rows come back in no particular order; unknown ids are simply absent.
+        """
+        rows = []
+        for start in range(0, len(ids), chunk_size):
+            stmt = select(*RESPONSE_COLUMNS).where(Employee.id.in_(ids[start:start + chunk_size]))
+            rows.extend(self.db.execute(stmt).all())
+        return rows
+
     def get_by_email(self, email: str) -> Optional[Employee]:
         """
         Get an employee by their email address.
@@ -66,10 +199,96 @@ class EmployeeRepository:
             date_of_joining=employee_data.date_of_joining
         )
         self.db.add(db_employee)
+        self.db.flush()
+        # Keep the search index and the change feed in sync within the same transaction
+        self.search_backend.index(self.db, db_employee)
+        record_changes(self.db, [db_employee.id], "create")
         self.db.commit()
         self.db.refresh(db_employee)
         return db_employee
 
+    def stream_export(self, search: Optional[str] = None, batch_size: int = 1000) -> Iterator[Sequence[Row]]:
+        """
+        Stream matching employees as plain row tuples, `batch_size` rows at a time.
+
+        Uses a server-side cursor (stream_results) and selects columns only,
+        so no ORM objects are built and memory stays flat for any table size.
+        """
+        keywords = search.lower().split() if search else []
+        stmt = self.search_backend.filter(select(*EXPORT_COLUMNS), keywords).order_by(Employee.id)
+        result = self.db.execute(stmt, execution_options={"stream_results": True, "yield_per": batch_size})
+        for partition in result.partitions():
+            yield partition
+
+    def iter_index_rows(self, batch_size: int = 10000) -> Iterator[Row]:
+        """
+        Stream (id, name, department, designation) for every employee, for in-memory indexes.
+        """
+        stmt = select(*INDEX_COLUMNS)
+        result = self.db.execute(stmt, execution_options={"stream_results": True, "yield_per": batch_size})
+        for partition in result.partitions():
+            yield from partition
+
+    def iter_response_rows(self, batch_size: int = 10000) -> Iterator[Row]:
+        """
+        Stream RESPONSE_COLUMNS for every employee, for the in-memory directory snapshot.
+        """
+        stmt = select(*RESPONSE_COLUMNS)
+        result = self.db.execute(stmt, execution_options={"stream_results": True, "yield_per": batch_size})
+        for partition in result.partitions():
+            yield from partition
+
+    def get_index_rows_by_emails(self, emails: List[str]) -> List[Row]:
+        """
+        Get (id, name, department, designation) of the employees with the given emails.
+        """
+        if not emails:
+            return []
+        stmt = select(*INDEX_COLUMNS).where(Employee.email.in_(emails))
+        return self.db.execute(stmt).all()
+
+    def get_existing_emails(self, emails: List[str]) -> Set[str]:
+        """
+        Return which of the given emails already exist, in a single IN query.
+        """
+        if not emails:
+            return set()
+        rows = self.db.query(Employee.email).filter(Employee.email.in_(emails)).all()
+        return {row.email for row in rows}
+
+    def bulk_create(self, rows: List[Dict]) -> int:
+        """
+        Insert many employees in one transaction using a single executemany.
+        Rows are plain dicts of column values; returns the number inserted.
+        """
+        if not rows:
+            return 0
+        try:
+            self.db.execute(insert(Employee), rows)
+            emails = [row["email"] for row in rows]
+            self.search_backend.index_batch(self.db, emails)
+            inserted_ids = self.db.execute(
+                select(Employee.id).where(Employee.email.in_(emails)).order_by(Employee.id)
+            ).scalars().all()
+            record_changes(self.db, inserted_ids, "create")
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return len(rows)
+
+    def get_changes(self, since: int = 0, limit: int = 1000) -> List[Row]:
+        """
+        Change feed entries after sequence number `since` (see build_changes_query).
+        """
+        return self.db.execute(build_changes_query(since, limit)).all()
+
+    def get_change_head(self) -> int:
+        """
+        Sequence number of the latest change (0 before the first one).
+        """
+        return self.db.execute(select(ChangeSequence.value).where(ChangeSequence.id == 1)).scalar() or 0
+
     def get_all(self, limit: int = 100, offset: int = 0) -> List[Employee]:
         """
         Get all employees with pagination.
@@ -0,0 +1,245 @@
+from abc import ABC, abstractmethod
+from sqlalchemy import or_, select, text, inspect, column, table
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, Query
+from typing import List, Optional
+from dotenv import load_dotenv
+import logging
+import os
+
+from app.database.models import Employee
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Which search backend to use: "fulltext" (native index) or "ilike" (table scan)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "fulltext").lower()
+
+FTS_TABLE = "employees_fts"
+MYSQL_FULLTEXT_INDEX = "ft_name_department"
+
+# Characters with special meaning in FTS5 / MySQL boolean mode queries
+_MYSQL_BOOLEAN_CHARS = '+-<>()~*"@'
+
+
+def _ilike_clause(kw: str):
+    return or_(
+        Employee.name.ilike(f"%{kw}%"),
+        Employee.department.ilike(f"%{kw}%")
+    )
+
+
+class SearchBackend(ABC):
+    """
+    Base class for employee search backends.
+
+    A backend narrows an Employee query to rows where every keyword
+    matches the name or the department (AND of keywords, OR of columns),
+    and keeps its index in sync when employees are written.
+    """
+
+    name = "base"
+
+    def ensure_index(self, engine: Engine, create: bool = True) -> bool:
+        """
+        Create the search index if it does not exist (only check for it
+        when `create` is False). Returns False if the backend cannot be
+        used on this engine.
+        """
+        return True
+
+    @abstractmethod
+    def filter(self, query: Query, keywords: List[str]) -> Query:
+        """Narrow `query` to employees matching every keyword."""
+
+    def index(self, db: Session, employee: Employee) -> None:
+        """Add a newly flushed employee to the index (same transaction)."""
+        pass
+
+    def index_batch(self, db: Session, emails: List[str]) -> None:
+        """Add bulk-inserted employees, identified by email, to the index."""
+        pass
+
+    def rebuild(self, db: Session) -> None:
+        """Rebuild the whole index after bulk changes to the table."""
+        pass
+
+
+class IlikeSearchBackend(SearchBackend):
+    """
+    Fallback backend using '%kw%' ILIKE predicates.
+    Works on any database but cannot use an index, so every search scans the table.
+    """
+
+    name = "ilike"
+
+    def filter(self, query: Query, keywords: List[str]) -> Query:
+        for kw in keywords:
+            query = query.filter(_ilike_clause(kw))
+        return query
+
+
+class SQLiteFTSSearchBackend(SearchBackend):
+    """
+    SQLite FTS5 backend using the trigram tokenizer.
+
+    The trigram index answers case-insensitive substring queries, so
+    results match the ILIKE backend. Keywords shorter than three
+    characters cannot be looked up in a trigram index and fall back to ILIKE.
+    """
+
+    name = "sqlite_fts5"
+    min_token_length = 3
+
+    def ensure_index(self, engine: Engine, create: bool = True) -> bool:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {"name": FTS_TABLE}
+            ).first()
+            if exists or not create:
+                return bool(exists)
+            try:
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+                    "name, department, content='employees', content_rowid='id', "
+                    "tokenize='trigram')"
+                ))
+            except Exception as e:
+                logger.warning(f"SQLite FTS5 trigram index unavailable: {str(e)}")
+                return False
+            conn.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        logger.info(f"Created {FTS_TABLE} full-text index")
+        return True
+
+    def filter(self, query: Query, keywords: List[str]) -> Query:
+        terms = []
+        for kw in keywords:
+            if len(kw) >= self.min_token_length:
+                terms.append('"' + kw.replace('"', '""') + '"')
+            else:
+                query = query.filter(_ilike_clause(kw))
+        if terms:
+            fts = table(FTS_TABLE, column("rowid"))
+            matches = select(fts.c.rowid).where(
+                text(f"{FTS_TABLE} MATCH :fts_query").bindparams(fts_query=" AND ".join(terms))
+            )
+            query = query.filter(Employee.id.in_(matches))
+        return query
+
+    def index(self, db: Session, employee: Employee) -> None:
+        db.execute(
+            text(f"INSERT INTO {FTS_TABLE}(rowid, name, department) VALUES (:id, :name, :department)"),
+            {"id": employee.id, "name": employee.name, "department": employee.department}
+        )
+
+    def index_batch(self, db: Session, emails: List[str]) -> None:
+        employees = Employee.__table__
+        db.execute(
+            table(FTS_TABLE, column("rowid"), column("name"), column("department")).insert().from_select(
+                ["rowid", "name", "department"],
+                select(employees.c.id, employees.c.name, employees.c.department).where(employees.c.email.in_(emails))
+            )
+        )
+
+    def rebuild(self, db: Session) -> None:
+        db.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+
+
+class MySQLFullTextSearchBackend(SearchBackend):
+    """
+    MySQL backend using an InnoDB FULLTEXT index with the ngram parser.
+
+    The ngram parser indexes substrings, so each keyword is looked up as
+    a phrase in the index and then re-checked with ILIKE on the (small)
+    candidate set to keep exact substring semantics. InnoDB maintains the
+    index itself, so no explicit sync is needed on writes.
+
+    The index is created without stopwords: the ngram parser drops every
+    n-gram containing one (e.g. "the" in "Theodore"), which would hide
+    such employees from searches the ILIKE re-check alone would match.
+    """
+
+    name = "mysql_fulltext"
+    min_token_length = 2  # default ngram_token_size
+
+    def ensure_index(self, engine: Engine, create: bool = True) -> bool:
+        indexes = inspect(engine).get_indexes("employees")
+        exists = any(ix["name"] == MYSQL_FULLTEXT_INDEX for ix in indexes)
+        if exists or not create:
+            return exists
+        try:
+            with engine.begin() as conn:
+                # Read when the index is created; it keeps the setting
+                conn.execute(text("SET SESSION innodb_ft_enable_stopword = OFF"))
+                conn.execute(text(
+                    f"ALTER TABLE employees ADD FULLTEXT INDEX {MYSQL_FULLTEXT_INDEX} "
+                    "(name, department) WITH PARSER ngram"
+                ))
+        except Exception as e:
+            logger.warning(f"MySQL FULLTEXT index unavailable: {str(e)}")
+            return False
+        logger.info(f"Created {MYSQL_FULLTEXT_INDEX} full-text index")
+        return True
+
+    def filter(self, query: Query, keywords: List[str]) -> Query:
+        from sqlalchemy.dialects.mysql import match
+
+        terms = []
+        for kw in keywords:
+            cleaned = "".join(ch for ch in kw if ch not in _MYSQL_BOOLEAN_CHARS)
+            if len(cleaned) >= self.min_token_length:
+                terms.append(f'+"{cleaned}"')
+            # Re-check every keyword so results are identical to ILIKE
+            query = query.filter(_ilike_clause(kw))
+        if terms:
+            query = query.filter(
+                match(Employee.name, Employee.department, against=" ".join(terms)).in_boolean_mode()
+            )
+        return query
+
+
+_ilike_backend = IlikeSearchBackend()
+_active_backend: SearchBackend = _ilike_backend
+
+
+def _backend_for_dialect(dialect_name: str) -> Optional[SearchBackend]:
+    if dialect_name == "sqlite":
+        return SQLiteFTSSearchBackend()
+    if dialect_name == "mysql":
+        return MySQLFullTextSearchBackend()
+    return None
+
+
+def configure_search_backend(
+    engine: Engine, backend_name: str = SEARCH_BACKEND, create_index: bool = True
+) -> SearchBackend:
+    """
+    Select the search backend for this engine and make sure its index exists.
+
+    Falls back to the ILIKE backend when "ilike" is requested, or when the
+    database has no supported full-text engine. With `create_index=False`
+    (schema managed by migrate.py) a missing index is not created, and
+    search falls back to ILIKE until the migration has run.
+    """
+    global _active_backend
+
+    backend: Optional[SearchBackend] = None
+    if backend_name == "fulltext":
+        backend = _backend_for_dialect(engine.dialect.name)
+        if backend is not None and not backend.ensure_index(engine, create=create_index):
+            if not create_index:
+                logger.warning("Full-text index missing; run `python migrate.py`")
+            backend = None
+    elif backend_name != "ilike":
+        logger.warning(f"Unknown SEARCH_BACKEND '{backend_name}', using ilike")
+
+    _active_backend = backend or _ilike_backend
+    logger.info(f"Search backend: {_active_backend.name}")
+    return _active_backend
+
+
+def get_search_backend() -> SearchBackend:
+    """Return the configured search backend (ILIKE until configured)."""
+    return _active_backend
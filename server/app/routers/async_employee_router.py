@@ -0,0 +1,227 @@
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+
+from app.database.connection import get_async_db, get_async_read_db, async_replicas, AsyncReadSessionLocal
+from app.database.routing import pin_client_to_primary
+from app.routers import employee_router
+from app.services.async_employee_service import AsyncEmployeeService
+from app.schemas.employee import (
+    EmployeeResponse, EmployeeCreate, SearchEnvelope, EmployeeBatchRequest, EmployeeBatchResponse,
+    RankedEmployee, RankedEnvelope, ChangeFeedResponse
+)
+from app.services.fuzzy_index import fuzzy_index
+from app.services.snapshot import snapshot_enabled
+from app.services.change_feed import (
+    MAX_WAIT_SECONDS, STREAM_BATCH_SIZE, encode_changes, poll_changes, resume_position, stream_changes
+)
+from app.middleware.admission import admit_search
+from app.services.http_cache import json_response
+from app.exceptions.custom_exceptions import DatabaseConnectionError, PoolSaturatedError, ValidationError
+
+# Async route handlers, used instead of employee_router when USE_ASYNC_DB=true
+router = APIRouter()
+
+
+@router.get(
+    "/employees",
+    response_model=Union[List[EmployeeResponse], SearchEnvelope, List[RankedEmployee], RankedEnvelope],
+    dependencies=[Depends(admit_search)]
+)
+async def search_employees(
+    request: Request,
+    search: Optional[str] = Query(
+        None,
+        max_length=100,
+        description="Search term for employee name or department. If empty, returns all employees."
+    ),
+    limit: int = Query(default=50, ge=1, le=100, description="Maximum number of results"),
+    offset: int = Query(default=0, ge=0, description="Number of results to skip"),
+    cursor: Optional[str] = Query(
+        None,
+        max_length=512,
+        description="Opaque cursor from the X-Next-Cursor header of the previous page. Takes precedence over offset."
+    ),
+    envelope: bool = Query(
+        default=False,
+        description="Return {items, total, facets, next_cursor} instead of a bare list"
+    ),
+    ranked: bool = Query(
+        default=False,
+        description="Order by relevance with typo tolerance instead of by name; each item gets a score"
+    ),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Search employees by name or department.
+    
+    - **search**: Optional search term (searches both name and department)
+    - **limit**: Maximum number of results to return (1-100, default 50)
+    - **offset**: Number of results to skip for pagination
+    - **cursor**: Keyset pagination cursor; use it instead of offset for deep pages
+    - **envelope**: Also return the total hit count and counts by department and designation
+    - **ranked**: Rank matches on name, department and designation, tolerating typos
+      ("rahl sharma" finds Rahul Sharma); pages with offset only
+    
+    Returns a list of employees matching the search criteria.
+    When the page is full, the `X-Next-Cursor` header holds the cursor for the next page.
+    Responses carry an ETag of their body; send it back in `If-None-Match` to get an empty 304
+    while the results are unchanged.
+    Searches are admitted by cost (see app/middleware/admission.py): when the database is
+    overloaded or the client is over its rate limit, the answer is 429 with Retry-After.
+    """
+    ranked = ranked and bool(search and search.strip())
+    if ranked and cursor:
+        raise HTTPException(status_code=400, detail="Ranked search pages with offset, not cursor")
+    if ranked and not fuzzy_index.ready:
+        raise HTTPException(status_code=503, detail="Ranked search is not available yet")
+    try:
+        service = AsyncEmployeeService(db)
+        if ranked:
+            body = await service.search_ranked_json(search=search, limit=limit, offset=offset, envelope=envelope)
+            return json_response(request, body)
+        # Fast path: rows are encoded straight to JSON, bypassing response_model validation
+        body, next_cursor = await service.search_employees_json(
+            search=search, limit=limit, offset=offset, cursor=cursor, envelope=envelope
+        )
+        return json_response(request, body, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except DatabaseConnectionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+
+async def fetch_changes(since: int, limit: int) -> List:
+    # One short session per read: long-poll and stream waits must not hold a pooled connection
+    async with AsyncReadSessionLocal() as db:
+        return await AsyncEmployeeService(db).get_changes(since=since, limit=limit)
+
+
+@router.get("/employees/changes", response_model=ChangeFeedResponse)
+async def get_changes(
+    since: int = Query(default=0, ge=0, description="Sequence number of the last change already seen (0 = from the start)"),
+    limit: int = Query(default=1000, ge=1, le=5000, description="Maximum number of changes"),
+    wait: float = Query(
+        default=0,
+        ge=0,
+        le=MAX_WAIT_SECONDS,
+        description="Long-poll: seconds to wait for the next change when there is none yet"
+    )
+):
+    """
+    Changes to the directory after sequence number `since`, oldest first.
+
+    Each entry carries the employee's current data. Store `next_since` and
+    pass it back to receive only what changed since; with `wait`, the
+    request is held open until a change arrives (or the wait runs out).
+    `since=0` replays the whole directory.
+    """
+    try:
+        rows = await poll_changes(fetch_changes, since, limit, wait)
+        return Response(content=encode_changes(rows, since), media_type="application/json")
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except DatabaseConnectionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+
+@router.get("/employees/changes/stream")
+async def stream_employee_changes(
+    request: Request,
+    since: int = Query(default=0, ge=0, description="Sequence number of the last change already seen (0 = from the start)")
+):
+    """
+    Server-Sent Events stream of changes after `since`: first the backlog,
+    then each change as it is committed. Event ids are sequence numbers,
+    so a reconnecting EventSource resumes from its Last-Event-ID.
+    """
+    since = resume_position(request.headers.get("last-event-id"), since)
+    return StreamingResponse(
+        stream_changes(fetch_changes, since, STREAM_BATCH_SIZE),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/employees/{employee_id:int}", response_model=EmployeeResponse)
+async def get_employee(employee_id: int, request: Request, db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Get a specific employee by ID.
+    Supports `If-None-Match` with the ETag of a previous response (empty 304 while unchanged).
+    """
+    try:
+        service = AsyncEmployeeService(db)
+        employee = await service.get_employee_by_id(employee_id)
+        if not employee:
+            raise HTTPException(status_code=404, detail="Employee not found")
+        return json_response(request, employee.model_dump_json().encode())
+    except HTTPException:
+        raise
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except DatabaseConnectionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+
+@router.post("/employees/batch", response_model=EmployeeBatchResponse)
+async def get_employees_batch(batch: EmployeeBatchRequest, db: AsyncSession = Depends(get_async_read_db)):
+    """
+    Look up many employees by ID in one request (up to 5000 ids).
+
+    Returns `items` in request order, with null for unknown ids,
+    and `missing` listing those ids. Cached employees are served first;
+    the rest are fetched with a few chunked IN queries.
+    """
+    try:
+        service = AsyncEmployeeService(db)
+        items, missing = await service.get_employees_by_ids(batch.ids)
+        return EmployeeBatchResponse(items=items, missing=missing)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except DatabaseConnectionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+
+@router.post("/employees", response_model=EmployeeResponse, status_code=201)
+async def create_employee(employee: EmployeeCreate, response: Response, db: AsyncSession = Depends(get_async_db)):
+    """
+    Create a new employee.
+    """
+    try:
+        service = AsyncEmployeeService(db)
+        created = await service.create_employee(employee)
+        pin_client_to_primary(response, async_replicas, lagging_reads=snapshot_enabled())
+        return created
+    except ValidationError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except DatabaseConnectionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+
+# Endpoints without an async implementation are served by the sync handlers
+_async_routes = {
+    (route.path, method)
+    for route in router.routes if isinstance(route, APIRoute)
+    for method in route.methods
+}
+for _route in employee_router.router.routes:
+    if isinstance(_route, APIRoute) and not any(
+        (_route.path, method) in _async_routes for method in _route.methods
+    ):
+        router.routes.append(_route)
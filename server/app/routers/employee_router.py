@@ -1,17 +1,41 @@
-from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Optional, Union
+import logging
 
-from app.database.connection import get_db
+from app.database.connection import get_db, get_read_db, ReadSessionLocal, replicas
+from app.database.routing import pin_client_to_primary
 from app.services.employee_service import EmployeeService
-from app.schemas.employee import EmployeeResponse, EmployeeCreate
-from app.exceptions.custom_exceptions import DatabaseConnectionError, ValidationError
+from app.services.bulk_import import SUPPORTED_FORMATS, iter_records
+from app.services.export import EXPORT_MEDIA_TYPES
+from app.services.suggest_index import suggest_index
+from app.services.fuzzy_index import fuzzy_index
+from app.services.snapshot import snapshot_enabled
+from app.services.change_feed import (
+    MAX_WAIT_SECONDS, STREAM_BATCH_SIZE, encode_changes, poll_changes, resume_position, stream_changes
+)
+from app.schemas.employee import (
+    EmployeeResponse, EmployeeCreate, SearchEnvelope, ImportReport, SuggestResponse,
+    EmployeeBatchRequest, EmployeeBatchResponse, RankedEmployee, RankedEnvelope, ChangeFeedResponse
+)
+from app.middleware.admission import admit_search
+from app.services.http_cache import json_response
+from app.exceptions.custom_exceptions import DatabaseConnectionError, PoolSaturatedError, ValidationError
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-@router.get("/employees", response_model=List[EmployeeResponse])
+@router.get(
+    "/employees",
+    response_model=Union[List[EmployeeResponse], SearchEnvelope, List[RankedEmployee], RankedEnvelope],
+    dependencies=[Depends(admit_search)]
+)
 def search_employees(
+    request: Request,
     search: Optional[str] = Query(
         None,
         max_length=100,
@@ -19,7 +43,20 @@ def search_employees(
     ),
     limit: int = Query(default=50, ge=1, le=100, description="Maximum number of results"),
     offset: int = Query(default=0, ge=0, description="Number of results to skip"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(
+        None,
+        max_length=512,
+        description="Opaque cursor from the X-Next-Cursor header of the previous page. Takes precedence over offset."
+    ),
+    envelope: bool = Query(
+        default=False,
+        description="Return {items, total, facets, next_cursor} instead of a bare list"
+    ),
+    ranked: bool = Query(
+        default=False,
+        description="Order by relevance with typo tolerance instead of by name; each item gets a score"
+    ),
+    db: Session = Depends(get_read_db)
 ):
     """
     Search employees by name or department.
@@ -27,13 +64,35 @@ def search_employees(
     - **search**: Optional search term (searches both name and department)
     - **limit**: Maximum number of results to return (1-100, default 50)
     - **offset**: Number of results to skip for pagination
+    - **cursor**: Keyset pagination cursor; use it instead of offset for deep pages
+    - **envelope**: Also return the total hit count and counts by department and designation
+    - **ranked**: Rank matches on name, department and designation, tolerating typos
+      ("rahl sharma" finds Rahul Sharma); pages with offset only
     
     Returns a list of employees matching the search criteria.
+    When the page is full, the `X-Next-Cursor` header holds the cursor for the next page.
+    Responses carry an ETag of their body; send it back in `If-None-Match` to get an empty 304
+    while the results are unchanged.
+    Searches are admitted by cost (see app/middleware/admission.py): when the database is
+    overloaded or the client is over its rate limit, the answer is 429 with Retry-After.
     """
+    ranked = ranked and bool(search and search.strip())
+    if ranked and cursor:
+        raise HTTPException(status_code=400, detail="Ranked search pages with offset, not cursor")
+    if ranked and not fuzzy_index.ready:
+        raise HTTPException(status_code=503, detail="Ranked search is not available yet")
     try:
         service = EmployeeService(db)
-        employees = service.search_employees(search=search, limit=limit, offset=offset)
-        return employees
+        if ranked:
+            body = service.search_ranked_json(search=search, limit=limit, offset=offset, envelope=envelope)
+            return json_response(request, body)
+        # Fast path: rows are encoded straight to JSON, bypassing response_model validation
+        body, next_cursor = service.search_employees_json(
+            search=search, limit=limit, offset=offset, cursor=cursor, envelope=envelope
+        )
+        return json_response(request, body, {"X-Next-Cursor": next_cursor} if next_cursor else None)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except DatabaseConnectionError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except ValidationError as e:
@@ -42,19 +101,120 @@ def search_employees(
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
 
 
-@router.get("/employees/{employee_id}", response_model=EmployeeResponse)
-def get_employee(employee_id: int, db: Session = Depends(get_db)):
+@router.get("/employees/suggest", response_model=SuggestResponse)
+async def suggest_employees(
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix typed so far"),
+    limit: int = Query(default=10, ge=1, le=50, description="Maximum suggestions of each kind")
+):
+    """
+    Typeahead suggestions for names and departments starting with `q`
+    (any word of the name, or the full name).
+
+    Served from an in-memory prefix index built at startup, without a database query.
+    """
+    if not suggest_index.ready:
+        raise HTTPException(status_code=503, detail="Suggestions are not available yet")
+    return suggest_index.suggest(q, limit)
+
+
+def _read_changes(since: int, limit: int) -> List:
+    db = ReadSessionLocal()
+    try:
+        return EmployeeService(db).get_changes(since=since, limit=limit)
+    finally:
+        db.close()
+
+
+async def fetch_changes(since: int, limit: int) -> List:
+    # One short session per read: long-poll and stream waits must not hold a pooled connection
+    return await run_in_threadpool(_read_changes, since, limit)
+
+
+@router.get("/employees/changes", response_model=ChangeFeedResponse)
+async def get_changes(
+    since: int = Query(default=0, ge=0, description="Sequence number of the last change already seen (0 = from the start)"),
+    limit: int = Query(default=1000, ge=1, le=5000, description="Maximum number of changes"),
+    wait: float = Query(
+        default=0,
+        ge=0,
+        le=MAX_WAIT_SECONDS,
+        description="Long-poll: seconds to wait for the next change when there is none yet"
+    )
+):
+    """
+    Changes to the directory after sequence number `since`, oldest first.
+
+    Each entry carries the employee's current data. Store `next_since` and
+    pass it back to receive only what changed since; with `wait`, the
+    request is held open until a change arrives (or the wait runs out).
+    `since=0` replays the whole directory.
+    """
+    try:
+        rows = await poll_changes(fetch_changes, since, limit, wait)
+        return Response(content=encode_changes(rows, since), media_type="application/json")
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except DatabaseConnectionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+
+@router.get("/employees/changes/stream")
+async def stream_employee_changes(
+    request: Request,
+    since: int = Query(default=0, ge=0, description="Sequence number of the last change already seen (0 = from the start)")
+):
+    """
+    Server-Sent Events stream of changes after `since`: first the backlog,
+    then each change as it is committed. Event ids are sequence numbers,
+    so a reconnecting EventSource resumes from its Last-Event-ID.
+    """
+    since = resume_position(request.headers.get("last-event-id"), since)
+    return StreamingResponse(
+        stream_changes(fetch_changes, since, STREAM_BATCH_SIZE),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/employees/{employee_id:int}", response_model=EmployeeResponse)
+def get_employee(employee_id: int, request: Request, db: Session = Depends(get_read_db)):
     """
     Get a specific employee by ID.
+    Supports `If-None-Match` with the ETag of a previous response (empty 304 while unchanged).
     """
     try:
         service = EmployeeService(db)
         employee = service.get_employee_by_id(employee_id)
         if not employee:
             raise HTTPException(status_code=404, detail="Employee not found")
-        return employee
+        return json_response(request, employee.model_dump_json().encode())
     except HTTPException:
         raise
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except DatabaseConnectionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+
+@router.post("/employees/batch", response_model=EmployeeBatchResponse)
+def get_employees_batch(batch: EmployeeBatchRequest, db: Session = Depends(get_read_db)):
+    """
+    Look up many employees by ID in one request (up to 5000 ids).
+
+    Returns `items` in request order, with null for unknown ids,
+    and `missing` listing those ids. Cached employees are served first;
+    the rest are fetched with a few chunked IN queries.
+    """
+    try:
+        service = EmployeeService(db)
+        items, missing = service.get_employees_by_ids(batch.ids)
+        return EmployeeBatchResponse(items=items, missing=missing)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except DatabaseConnectionError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
@@ -62,16 +222,102 @@ def get_employee(employee_id: int, db: Session = Depends(get_db)):
 
 
 @router.post("/employees", response_model=EmployeeResponse, status_code=201)
-def create_employee(employee: EmployeeCreate, db: Session = Depends(get_db)):
+def create_employee(employee: EmployeeCreate, response: Response, db: Session = Depends(get_db)):
     """
     Create a new employee.
     """
     try:
         service = EmployeeService(db)
-        return service.create_employee(employee)
+        created = service.create_employee(employee)
+        pin_client_to_primary(response, replicas, lagging_reads=snapshot_enabled())
+        return created
     except ValidationError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except DatabaseConnectionError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+
+def _import_format(request: Request, fmt: Optional[str]) -> Optional[str]:
+    if fmt:
+        return fmt.lower() if fmt.lower() in SUPPORTED_FORMATS else None
+    content_type = request.headers.get("content-type", "").lower()
+    if "csv" in content_type:
+        return "csv"
+    if any(kind in content_type for kind in ("ndjson", "jsonl", "json-lines", "json-seq")):
+        return "ndjson"
+    return None
+
+
+@router.post("/employees/import", response_model=ImportReport)
+async def import_employees(
+    request: Request,
+    response: Response,
+    format: Optional[str] = Query(
+        None,
+        description="Body format: 'ndjson' or 'csv'. Inferred from Content-Type when omitted."
+    ),
+    db: Session = Depends(get_db)
+):
+    """
+    Bulk import employees from a streamed NDJSON or CSV body.
+
+    - **NDJSON**: one employee JSON object per line
+    - **CSV**: header row (name,email,department,designation,date_of_joining), one employee per line
+
+    Rows are validated and inserted in batches, each in its own transaction.
+    Returns counts and a per-row error report; valid rows are imported even if others fail.
+    """
+    fmt = _import_format(request, format)
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Send NDJSON (application/x-ndjson) or CSV (text/csv)")
+    try:
+        service = EmployeeService(db)
+        report = await service.import_stream(iter_records(request.stream(), fmt))
+        if report.inserted:
+            pin_client_to_primary(response, replicas, lagging_reads=snapshot_enabled())
+        return report
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
     except DatabaseConnectionError as e:
         raise HTTPException(status_code=503, detail=str(e))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Request body must be UTF-8 encoded")
     except Exception as e:
         raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+
+@router.get("/employees/export")
+def export_employees(
+    format: str = Query(default="ndjson", pattern="^(ndjson|csv)$", description="Output format: 'ndjson' or 'csv'"),
+    search: Optional[str] = Query(
+        None,
+        max_length=100,
+        description="Optional search term, same as the search endpoint. If empty, exports everyone."
+    )
+):
+    """
+    Stream the full directory (or the employees matching `search`) as NDJSON or CSV.
+
+    Rows are read with a server-side cursor and written as they arrive,
+    so memory use stays flat regardless of directory size.
+    """
+    def body():
+        # The session lives as long as the stream, not the request handler
+        db = ReadSessionLocal()
+        try:
+            yield from EmployeeService(db).export_employees(search=search, fmt=format)
+        except Exception as e:
+            logger.error(f"Export aborted: {str(e)}")
+            raise
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        body(),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f"attachment; filename=employees.{format}"}
+    )
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr, Field
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import Dict, List, Optional
 
 
 class EmployeeBase(BaseModel):
@@ -32,3 +32,86 @@ class EmployeeResponse(EmployeeBase):
 
     class Config:
         from_attributes = True  # Allows conversion from SQLAlchemy model
+
+
+class SearchEnvelope(BaseModel):
+    """Search page with total hit count and facet counts (envelope mode)."""
+    items: List[EmployeeResponse]
+    total: int = Field(..., description="Number of employees matching the search")
+    facets: Dict[str, Dict[str, int]] = Field(
+        ..., description="Matching employees counted by 'department' and by 'designation'"
+    )
+    next_cursor: Optional[str] = None
+
+
+class RankedEmployee(EmployeeResponse):
+    """Employee returned by ranked search, with its relevance score."""
+    score: float = Field(..., description="Relevance of the match; higher is better")
+
+
+class RankedEnvelope(BaseModel):
+    """Ranked search page with total hit count and facet counts."""
+    items: List[RankedEmployee]
+    total: int = Field(..., description="Number of employees matching the search")
+    facets: Dict[str, Dict[str, int]] = Field(
+        ..., description="Matching employees counted by 'department' and by 'designation'"
+    )
+    next_cursor: Optional[str] = Field(None, description="Always null: ranked results page with offset")
+
+
+class EmployeeBatchRequest(BaseModel):
+    """Ids to resolve in one batch lookup."""
+    ids: List[int] = Field(..., min_length=1, max_length=5000, description="Employee ids, up to 5000")
+
+
+class EmployeeBatchResponse(BaseModel):
+    """Batch lookup result, in request order."""
+    items: List[Optional[EmployeeResponse]] = Field(
+        ..., description="One entry per requested id (null where no employee has that id)"
+    )
+    missing: List[int] = Field(..., description="Requested ids with no employee")
+
+
+class EmployeeChangeEntry(BaseModel):
+    """One entry of the change feed."""
+    seq: int = Field(..., description="Position in the feed; increases in commit order")
+    operation: str = Field(..., description="'create' ('update' and 'delete' are reserved)")
+    employee_id: int
+    changed_at: datetime
+    employee: Optional[EmployeeResponse] = Field(
+        None, description="Current state of the employee (null once it no longer exists)"
+    )
+
+
+class ChangeFeedResponse(BaseModel):
+    """Changes after the requested sequence number, oldest first."""
+    changes: List[EmployeeChangeEntry]
+    next_since: int = Field(..., description="Pass as `since` to get the changes that follow")
+
+
+class ImportRowError(BaseModel):
+    """A row rejected by a bulk import."""
+    row: int = Field(..., description="1-based data row number in the uploaded file")
+    email: Optional[str] = None
+    error: str
+
+
+class ImportReport(BaseModel):
+    """Result of a bulk import."""
+    received: int = 0
+    inserted: int = 0
+    failed: int = 0
+    errors: List[ImportRowError] = []
+
+
+class SuggestEmployee(BaseModel):
+    """An employee suggested by typeahead."""
+    id: int
+    name: str
+    department: str
+
+
+class SuggestResponse(BaseModel):
+    """Typeahead suggestions for a prefix."""
+    employees: List[SuggestEmployee] = []
+    departments: List[str] = []
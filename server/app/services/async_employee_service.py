@@ -0,0 +1,301 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from app.repositories.async_employee_repository import AsyncEmployeeRepository
+from app.schemas.employee import EmployeeCreate, EmployeeResponse
+from app.database.models import Employee
+from app.exceptions.custom_exceptions import ValidationError
+from app.services.pagination import decode_cursor, encode_cursor
+from app.services.serialization import encode_rows, encode_envelope, encode_ranked
+from app.services.cache import TTLCache, employee_cache, record_write
+from app.services.employee_service import search_cache_key, build_facets, database_error, order_batch, rank_rows
+from app.services.suggest_index import suggest_index
+from app.services.fuzzy_index import fuzzy_index
+from app.database.routing import PIN_PRIMARY, pin_to_primary
+from app.services.single_flight import async_single_flight
+from app.services.change_feed import change_notifier
+from app.services.snapshot import snapshot_reads
+from app.monitoring.instrumentation import instrument_layer
+
+
+@instrument_layer("service")
+class AsyncEmployeeService:
+    """
+    Async counterpart of EmployeeService, used by the async route handlers.
+    Shares the result cache with the sync service.
+    """
+
+    def __init__(self, db: AsyncSession, cache: Optional[TTLCache] = employee_cache):
+        self.repository = AsyncEmployeeRepository(db)
+        self.cache = cache
+
+    def _read_cache(self) -> Optional[TTLCache]:
+        """Result cache for this session's reads (see EmployeeService._read_cache)."""
+        return None if self.repository.db.info.get(PIN_PRIMARY) else self.cache
+
+    async def _coalesce(self, operation: str, key: Hashable, load):
+        """Share `load` with identical in-flight reads (see EmployeeService._coalesce)."""
+        if self.repository.db.info.get(PIN_PRIMARY):
+            return await load()
+        return await async_single_flight.do(operation, key, load)
+
+    async def search_employees(
+        self,
+        search: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> List[EmployeeResponse]:
+        """
+        Search employees by name or department (see EmployeeService.search_employees).
+        """
+        after = decode_cursor(cursor) if cursor else None
+        cache_key = search_cache_key(search, limit, offset, after)
+
+        cache = self._read_cache()
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation()
+
+        async def load():
+            snapshot = snapshot_reads(self.repository.db, search)
+            try:
+                if snapshot is not None:
+                    rows = snapshot.search_rows(search=search, limit=limit, offset=offset, after=after)
+                else:
+                    rows = await self.repository.search(search=search, limit=limit, offset=offset, after=after)
+            except SQLAlchemyError as e:
+                raise database_error(e)
+
+            employees = [EmployeeResponse.model_validate(row) for row in rows]
+            if cache is not None:
+                cache.set(cache_key, employees, generation)
+            return employees
+
+        return await self._coalesce("search", cache_key, load)
+
+    async def search_employees_json(
+        self,
+        search: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        envelope: bool = False
+    ) -> Tuple[bytes, Optional[str]]:
+        """
+        Read-only fast path of search_employees for the HTTP handler.
+
+        Selects only the response columns as row tuples and encodes them
+        straight to JSON bytes, skipping ORM hydration and EmployeeResponse
+        validation. Returns the body and the cursor of the next page (if full).
+        With `envelope`, the body is a SearchEnvelope with total and facets.
+        """
+        after = decode_cursor(cursor) if cursor else None
+        cache_key = search_cache_key(
+            search, limit, offset, after, kind="search_envelope" if envelope else "search_json"
+        )
+
+        cache = self._read_cache()
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation()
+
+        async def load():
+            snapshot = snapshot_reads(self.repository.db, search)
+            try:
+                if snapshot is not None:
+                    rows = snapshot.search_rows(search=search, limit=limit, offset=offset, after=after)
+                else:
+                    rows = await self.repository.search_rows(search=search, limit=limit, offset=offset, after=after)
+            except SQLAlchemyError as e:
+                raise database_error(e)
+
+            next_cursor = encode_cursor(rows[-1].name, rows[-1].id) if len(rows) == limit else None
+            if envelope:
+                body = encode_envelope(rows, await self.get_facets(search), next_cursor)
+            else:
+                body = encode_rows(rows)
+            page = (body, next_cursor)
+            if cache is not None:
+                cache.set(cache_key, page, generation)
+            return page
+
+        return await self._coalesce("search_json", cache_key, load)
+
+    async def get_facets(self, search: Optional[str] = None) -> Dict:
+        """
+        Total hit count and per-department / per-designation counts for a search.
+
+        Computed with one grouped aggregate and cached per normalized query
+        (independent of pagination), so paging through results counts once.
+        """
+        cache_key = search_cache_key(search, 0, 0, None, kind="facets")
+        cache = self._read_cache()
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation()
+
+        async def load():
+            snapshot = snapshot_reads(self.repository.db, search)
+            try:
+                if snapshot is not None:
+                    # Counting visits every match; keep it off the event loop
+                    rows = await run_in_threadpool(snapshot.facet_counts, search)
+                else:
+                    rows = await self.repository.facet_counts(search=search)
+            except SQLAlchemyError as e:
+                raise database_error(e)
+
+            facets = build_facets(rows)
+            if cache is not None:
+                cache.set(cache_key, facets, generation)
+            return facets
+
+        return await self._coalesce("facets", cache_key, load)
+
+    async def search_ranked_json(
+        self,
+        search: str,
+        limit: int = 50,
+        offset: int = 0,
+        envelope: bool = False
+    ) -> bytes:
+        """
+        Ranked, typo-tolerant search for the HTTP handler (see EmployeeService).
+        Scoring runs on the threadpool so broad queries do not stall the event loop.
+        """
+        cache_key = search_cache_key(search, limit, offset, None, kind="ranked_envelope" if envelope else "ranked")
+        cache = self._read_cache()
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation()
+
+        async def load():
+            total, page, facets = await run_in_threadpool(fuzzy_index.search, search, limit, offset, envelope)
+            ids = [employee_id for employee_id, _ in page]
+            snapshot = snapshot_reads(self.repository.db)
+            try:
+                if snapshot is not None:
+                    rows = snapshot.get_rows_by_ids(ids)
+                else:
+                    rows = await self.repository.get_rows_by_ids(ids)
+            except SQLAlchemyError as e:
+                raise database_error(e)
+
+            rows, scores = rank_rows(page, rows)
+            body = encode_ranked(rows, scores, {"total": total, "facets": facets} if envelope else None)
+            if cache is not None:
+                cache.set(cache_key, body, generation)
+            return body
+
+        return await self._coalesce("ranked", cache_key, load)
+
+    async def get_employee_by_id(self, employee_id: int) -> Optional[EmployeeResponse]:
+        """
+        Get a single employee by their ID (cached until the next write).
+        """
+        cache_key = ("id", employee_id)
+        cache = self._read_cache()
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation()
+
+        async def load():
+            snapshot = snapshot_reads(self.repository.db)
+            if snapshot is not None:
+                row = snapshot.get_row(employee_id)
+                if row is None:
+                    return None
+                employee = EmployeeResponse.model_construct(**row._asdict())
+            else:
+                try:
+                    row = await self.repository.get_by_id(employee_id)
+                except SQLAlchemyError as e:
+                    raise database_error(e)
+
+                if row is None:
+                    return None
+                employee = EmployeeResponse.model_validate(row)
+            if cache is not None:
+                cache.set(cache_key, employee, generation)
+            return employee
+
+        return await self._coalesce("get_by_id", cache_key, load)
+
+    async def get_employees_by_ids(self, ids: List[int]) -> Tuple[List[Optional[EmployeeResponse]], List[int]]:
+        """
+        Resolve many ids at once: cached employees first, the rest with
+        chunked IN queries. Returns items in request order plus the missing ids.
+        Fetched employees are not cached (see EmployeeService.get_employees_by_ids).
+        """
+        found: Dict[int, EmployeeResponse] = {}
+        to_fetch = []
+        cache = self._read_cache()
+        for employee_id in dict.fromkeys(ids):
+            cached = cache.get(("id", employee_id)) if cache is not None else None
+            if cached is not None:
+                found[employee_id] = cached
+            else:
+                to_fetch.append(employee_id)
+
+        if to_fetch:
+            snapshot = snapshot_reads(self.repository.db)
+            try:
+                if snapshot is not None:
+                    rows = snapshot.get_rows_by_ids(to_fetch)
+                else:
+                    rows = await self.repository.get_rows_by_ids(to_fetch)
+            except SQLAlchemyError as e:
+                raise database_error(e)
+            for row in rows:
+                # Rows were validated on write; skip re-validating (EmailStr checks are slow)
+                employee = EmployeeResponse.model_construct(**row._asdict())
+                found[employee.id] = employee
+
+        return order_batch(ids, found)
+
+    async def get_changes(self, since: int = 0, limit: int = 1000) -> List:
+        """
+        Change feed entries after sequence number `since`, oldest first (see EmployeeService).
+        """
+        async def load():
+            try:
+                return await self.repository.get_changes(since=since, limit=limit)
+            except SQLAlchemyError as e:
+                raise database_error(e)
+
+        return await self._coalesce("changes", (since, limit), load)
+
+    async def create_employee(self, employee_data: EmployeeCreate) -> Employee:
+        """
+        Create a new employee record.
+        """
+        # The uniqueness check and the insert must both see the primary
+        pin_to_primary(self.repository.db)
+        try:
+            # Check if email already exists
+            existing = await self.repository.get_by_email(employee_data.email)
+            if existing:
+                raise ValidationError("An employee with this email already exists")
+
+            employee = await self.repository.create(employee_data)
+        except SQLAlchemyError as e:
+            raise database_error(e)
+
+        record_write(self.cache)
+        change_notifier.notify()
+        suggest_index.add(employee.id, employee.name, employee.department)
+        fuzzy_index.add(employee.id, employee.name, employee.department, employee.designation)
+        return employee
@@ -0,0 +1,107 @@
+from collections import deque
+import csv
+import json
+from typing import AsyncIterator, Iterable, Iterator, List, Tuple
+from dotenv import load_dotenv
+import os
+
+load_dotenv()
+
+# Number of rows validated and inserted per transaction
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+
+SUPPORTED_FORMATS = ("ndjson", "csv")
+
+
+class RecordParseError(Exception):
+    """A line of the uploaded file could not be parsed into a record."""
+    pass
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Split a stream of byte chunks into text lines without buffering the body.
+    """
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8-sig").rstrip("\r")
+    if pending:
+        yield pending.decode("utf-8-sig").rstrip("\r")
+
+
+class _LineFeed:
+    """Iterator a csv.reader pulls lines from, filled as they arrive."""
+
+    def __init__(self):
+        self.lines = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def iter_records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator[object]:
+    """
+    Yield one record per data line of an NDJSON or CSV (header row, then
+    one record per row; quoted fields may span lines) stream. Unparseable
+    lines yield a RecordParseError instead of aborting the import.
+    """
+    header = None
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    quotes = 0
+    async for line in iter_lines(chunks):
+        if not feed.lines and not line.strip():
+            continue
+        if fmt == "ndjson":
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("expected a JSON object")
+                yield record
+            except ValueError as e:
+                yield RecordParseError(f"Invalid JSON: {str(e)}")
+        else:
+            feed.lines.append(line + "\n")
+            # An odd number of quotes so far means a quoted field continues on the next line
+            quotes += line.count('"')
+            if quotes % 2:
+                continue
+            quotes = 0
+            # Usually one row; more if a stray quote (literal, mid-field) held rows back
+            while feed.lines:
+                values = next(reader)
+                if not values:
+                    continue
+                if header is None:
+                    header = [name.strip() for name in values]
+                elif len(values) != len(header):
+                    yield RecordParseError(f"Expected {len(header)} columns, got {len(values)}")
+                else:
+                    yield dict(zip(header, values))
+    if feed.lines:
+        yield RecordParseError("Unterminated quoted field")
+
+
+def chunked(records: Iterable, size: int = IMPORT_BATCH_SIZE) -> Iterator[List]:
+    """Group an iterable into lists of at most `size` items."""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def numbered(batch: List, start_row: int) -> List[Tuple[int, object]]:
+    """Attach 1-based row numbers to a batch of records."""
+    return [(start_row + i, record) for i, record in enumerate(batch)]
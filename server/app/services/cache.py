@@ -0,0 +1,225 @@
+from collections import OrderedDict
+from dotenv import load_dotenv
+from typing import Any, Dict, Hashable, Optional
+import logging
+import os
+import threading
+import time
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Cache configuration from environment variables
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+CACHE_MAX_SIZE = int(os.getenv("CACHE_MAX_SIZE", 1024))
+CACHE_TTL_SECONDS = float(os.getenv("CACHE_TTL_SECONDS", 30))
+# Optional Redis URL used to share invalidation between worker processes
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "")
+CACHE_SYNC_INTERVAL = float(os.getenv("CACHE_SYNC_INTERVAL", 1.0))
+# Connect and read timeout (seconds) of the Redis calls made by the sync thread
+CACHE_REDIS_TIMEOUT = float(os.getenv("CACHE_REDIS_TIMEOUT", 0.5))
+
+
+class LocalInvalidation:
+    """
+    In-process invalidation: a generation counter bumped on every write.
+    """
+
+    def __init__(self):
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def generation(self) -> int:
+        return self._generation
+
+    def bump(self) -> None:
+        with self._lock:
+            self._generation += 1
+
+
+class RedisInvalidation:
+    """
+    Shared invalidation through a generation counter stored in Redis.
+
+    A background thread re-reads the counter every `sync_interval` seconds
+    and publishes local writes, so a write in one worker invalidates the
+    caches of all workers within that bound, and reads only look at a local
+    int. While Redis is unreachable, every sync invalidates this worker's
+    cache (writes elsewhere cannot be seen). Any Redis-protocol server (a
+    local redis-server works) can be used.
+    """
+
+    key = "employee_cache:generation"
+
+    def __init__(
+        self,
+        url: str,
+        sync_interval: float = CACHE_SYNC_INTERVAL,
+        timeout: float = CACHE_REDIS_TIMEOUT,
+        client=None
+    ):
+        if client is None:
+            import redis
+
+            client = redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._client = client
+        self._sync_interval = sync_interval
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._remote: Optional[int] = None  # last counter value seen in Redis
+        self._unpublished = 0
+        self._failing = False
+        self._wake = threading.Event()
+        threading.Thread(target=self._run, name="cache-invalidation-sync", daemon=True).start()
+
+    def generation(self) -> int:
+        return self._generation
+
+    def bump(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._unpublished += 1
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self._sync_interval)
+            self._wake.clear()
+            self.sync()
+
+    def sync(self) -> None:
+        """Publish local writes and pick up other workers' (run by the background thread)."""
+        with self._lock:
+            unpublished, self._unpublished = self._unpublished, 0
+        try:
+            if unpublished:
+                remote = int(self._client.incr(self.key, unpublished))
+                seen = self._remote is not None and remote - unpublished == self._remote
+            else:
+                remote = int(self._client.get(self.key) or 0)
+                seen = remote == self._remote
+        except Exception as e:
+            if not self._failing:
+                logger.warning(f"Cache invalidation sync failed, invalidating locally: {str(e)}")
+            self._failing = True
+            self._remote = None
+            with self._lock:
+                self._generation += 1
+            return
+        if self._failing:
+            logger.info("Cache invalidation sync recovered")
+            self._failing = False
+        if not seen:
+            # Another worker wrote (or this is the first sync since startup or an outage)
+            with self._lock:
+                self._generation += 1
+        self._remote = remote
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry TTL.
+
+    Entries are tagged with the invalidation generation they were stored
+    under; bumping the generation makes every older entry a miss.
+    Hit, miss and eviction counters are kept for reporting.
+    """
+
+    def __init__(
+        self,
+        max_size: int = CACHE_MAX_SIZE,
+        ttl: float = CACHE_TTL_SECONDS,
+        invalidation=None
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.invalidation = invalidation or LocalInvalidation()
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        generation = self.invalidation.generation()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at, entry_generation = entry
+            if entry_generation != generation or expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self) -> int:
+        """
+        Current invalidation generation. Read it before loading a value and
+        pass it to set() so a write racing with the load is not cached over.
+        """
+        return self.invalidation.generation()
+
+    def set(self, key: Hashable, value: Any, generation: Optional[int] = None) -> None:
+        if generation is None:
+            generation = self.invalidation.generation()
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl, generation)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self) -> None:
+        """Drop every entry, in this worker and (if shared) in all others."""
+        self.invalidation.bump()
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+def _create_invalidation():
+    if CACHE_REDIS_URL:
+        try:
+            return RedisInvalidation(CACHE_REDIS_URL)
+        except ImportError:
+            logger.warning("CACHE_REDIS_URL is set but the redis package is not installed; using local invalidation")
+    return LocalInvalidation()
+
+
+# Version of the directory contents, bumped on every write (also used for ETags)
+directory_version = _create_invalidation()
+
+
+def _create_cache() -> Optional[TTLCache]:
+    if not CACHE_ENABLED:
+        return None
+    return TTLCache(invalidation=directory_version)
+
+
+# Shared cache instance used by the service layer (None when disabled)
+employee_cache = _create_cache()
+
+
+def record_write(cache: Optional[TTLCache]) -> None:
+    """
+    Bump the directory version and drop cached results after a write.
+    """
+    if cache is None or cache.invalidation is not directory_version:
+        directory_version.bump()
+    if cache is not None:
+        cache.invalidate()
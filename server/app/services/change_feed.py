@@ -0,0 +1,144 @@
+from dotenv import load_dotenv
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+import asyncio
+import logging
+import os
+import threading
+import time
+
+from app.exceptions.custom_exceptions import DatabaseConnectionError
+from app.services.serialization import RESPONSE_FIELDS, dumps
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# How often waiting feed readers re-check the database, which is how they see
+# changes committed by other workers (changes made in this worker wake them at once)
+CHANGE_FEED_POLL_SECONDS = float(os.getenv("CHANGE_FEED_POLL_SECONDS", 1.0))
+# Comment lines sent on idle event streams so proxies do not close them
+CHANGE_FEED_HEARTBEAT_SECONDS = float(os.getenv("CHANGE_FEED_HEARTBEAT_SECONDS", 15))
+
+# Longest long-poll wait a client may ask for, in seconds
+MAX_WAIT_SECONDS = 30
+# Changes read per query while an event stream catches up
+STREAM_BATCH_SIZE = 1000
+
+# Reads up to `limit` change rows after a sequence number
+FetchChanges = Callable[[int, int], Awaitable[List]]
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class ChangeNotifier:
+    """
+    Wakes feed readers waiting in this process when a change is committed
+    here. Writers may run on threadpool threads, so each waiter is woken
+    through its own event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = set()
+
+    def notify(self) -> None:
+        with self._lock:
+            waiters, self._waiters = self._waiters, set()
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, future)
+            except RuntimeError:
+                pass  # loop already closed
+
+    async def wait(self, timeout: float) -> None:
+        """Return after the next notify() or after `timeout` seconds."""
+        loop = asyncio.get_running_loop()
+        waiter = (loop, loop.create_future())
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1], timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+# Notified by the service layer after every committed write
+change_notifier = ChangeNotifier()
+
+
+def change_entry(row) -> Dict:
+    """
+    One feed entry (EmployeeChangeEntry) from a CHANGE_COLUMNS + RESPONSE_COLUMNS row.
+    """
+    seq, operation, employee_id, changed_at, *employee = row
+    return {
+        "seq": seq,
+        "operation": operation,
+        "employee_id": employee_id,
+        "changed_at": changed_at.isoformat() if changed_at else None,
+        # The outer join yields no employee columns once the employee is gone
+        "employee": dict(zip(RESPONSE_FIELDS, employee)) if employee[-1] is not None else None,
+    }
+
+
+def encode_changes(rows: List, since: int) -> bytes:
+    """Encode a long-poll response (ChangeFeedResponse)."""
+    return dumps({
+        "changes": [change_entry(row) for row in rows],
+        "next_since": rows[-1].seq if rows else since,
+    })
+
+
+async def poll_changes(fetch: FetchChanges, since: int, limit: int, wait: float) -> List:
+    """
+    Long-poll: the changes after `since`, or, if there are none yet, the
+    first ones committed within `wait` seconds (an empty list after that).
+    """
+    deadline = time.monotonic() + wait
+    while True:
+        rows = await fetch(since, limit)
+        remaining = deadline - time.monotonic()
+        if rows or remaining <= 0:
+            return rows
+        await change_notifier.wait(min(remaining, CHANGE_FEED_POLL_SECONDS))
+
+
+def resume_position(last_event_id: Optional[str], since: int) -> int:
+    """Where an event stream starts: after Last-Event-ID when a client reconnects, else `since`."""
+    if last_event_id and last_event_id.strip().isdigit():
+        return int(last_event_id)
+    return since
+
+
+async def stream_changes(fetch: FetchChanges, since: int, batch_size: int) -> AsyncIterator[bytes]:
+    """
+    Server-Sent Events: every change after `since` (in batches), then each
+    new change as it is committed. The event id is the sequence number, so
+    a reconnecting client resumes with Last-Event-ID. The stream ends on a
+    database error; the client reconnects after the advertised retry delay.
+    """
+    yield f"retry: {int(CHANGE_FEED_POLL_SECONDS * 1000)}\n\n".encode()
+    last_sent = time.monotonic()
+    while True:
+        try:
+            rows = await fetch(since, batch_size)
+        except DatabaseConnectionError as e:
+            logger.warning(f"Change stream ended: {str(e)}")
+            return
+        for row in rows:
+            yield b"id: %d\nevent: change\ndata: %s\n\n" % (row.seq, dumps(change_entry(row)))
+        if rows:
+            since = rows[-1].seq
+            last_sent = time.monotonic()
+            if len(rows) == batch_size:
+                continue  # still catching up
+        elif time.monotonic() - last_sent >= CHANGE_FEED_HEARTBEAT_SECONDS:
+            yield b": keep-alive\n\n"
+            last_sent = time.monotonic()
+        await change_notifier.wait(CHANGE_FEED_POLL_SECONDS)
@@ -1,60 +1,489 @@
 from sqlalchemy.orm import Session
-from sqlalchemy.exc import SQLAlchemyError
-from typing import List, Optional
+from sqlalchemy.exc import SQLAlchemyError, IntegrityError, TimeoutError as PoolTimeoutError
+from pydantic import ValidationError as PydanticValidationError
+from starlette.concurrency import run_in_threadpool
+from typing import AsyncIterator, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
 
 from app.repositories.employee_repository import EmployeeRepository
-from app.schemas.employee import EmployeeCreate
+from app.schemas.employee import EmployeeCreate, EmployeeResponse, ImportReport, ImportRowError
 from app.database.models import Employee
-from app.exceptions.custom_exceptions import DatabaseConnectionError, ValidationError
+from app.exceptions.custom_exceptions import DatabaseConnectionError, PoolSaturatedError, ValidationError
+from app.database.connection import DB_POOL_RETRY_AFTER
+from app.services.pagination import decode_cursor, encode_cursor
+from app.services.serialization import encode_rows, encode_envelope, encode_ranked
+from app.services.cache import TTLCache, employee_cache, record_write
+from app.services.export import ENCODERS
+from app.services.suggest_index import suggest_index
+from app.services.fuzzy_index import fuzzy_index
+from app.services.bulk_import import IMPORT_BATCH_SIZE, RecordParseError, chunked, numbered
+from app.database.routing import PIN_PRIMARY, pin_to_primary
+from app.services.single_flight import single_flight
+from app.services.change_feed import change_notifier
+from app.services.snapshot import snapshot_reads
+from app.monitoring.instrumentation import instrument_layer
 
 
+def search_cache_key(
+    search: Optional[str],
+    limit: int,
+    offset: int,
+    after: Optional[Tuple[str, int]],
+    kind: str = "search"
+) -> Hashable:
+    """
+    Cache key for a search: normalized keywords plus pagination.
+    """
+    keywords = tuple(search.lower().split()) if search else ()
+    return (kind, keywords, limit, offset if after is None else 0, after)
+
+
+def build_facets(rows) -> Dict:
+    """
+    Fold (department, designation, count) rows into a total and facet counts.
+    """
+    departments: Dict[str, int] = {}
+    designations: Dict[str, int] = {}
+    total = 0
+    for department, designation, count in rows:
+        total += count
+        departments[department] = departments.get(department, 0) + count
+        designations[designation] = designations.get(designation, 0) + count
+    return {"total": total, "facets": {"department": departments, "designation": designations}}
+
+
+def order_batch(ids: List[int], found: Dict[int, EmployeeResponse]) -> Tuple[List[Optional[EmployeeResponse]], List[int]]:
+    """
+    Arrange looked-up employees in request order, with None (and an entry
+    in the missing list) for ids that do not exist.
+    """
+    items = [found.get(employee_id) for employee_id in ids]
+    missing = [employee_id for employee_id, item in zip(ids, items) if item is None]
+    return items, missing
+
+
+def rank_rows(page: List[Tuple[int, float]], rows) -> Tuple[List, List[float]]:
+    """
+    Put rows fetched by id into ranked order, with their scores. Ids the
+    database did not return (e.g. not yet on a lagging replica) are dropped.
+    """
+    by_id = {row.id: row for row in rows}
+    ranked = [(by_id[employee_id], score) for employee_id, score in page if employee_id in by_id]
+    return [row for row, _ in ranked], [score for _, score in ranked]
+
+
+def database_error(error: SQLAlchemyError) -> DatabaseConnectionError:
+    """
+    Map a database failure to the service-level error. Pool checkout timeouts
+    become PoolSaturatedError so callers can fail fast with a Retry-After hint.
+    """
+    if isinstance(error, PoolTimeoutError):
+        return PoolSaturatedError("Database is busy, please retry", retry_after=DB_POOL_RETRY_AFTER)
+    return DatabaseConnectionError("Failed to connect to database")
+
+
+def _format_validation_error(error: PydanticValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in error.errors()
+    )
+
+
+@instrument_layer("service")
 class EmployeeService:
     """
     Service layer for employee-related business logic.
     Separates business logic from route handlers and database operations.
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, cache: Optional[TTLCache] = employee_cache):
         self.repository = EmployeeRepository(db)
+        self.cache = cache
+
+    def _reader(self, search: Optional[str] = None):
+        """
+        Source of row reads: the in-memory directory snapshot while it may
+        serve this session and `search` (see snapshot_reads), otherwise the repository.
+        """
+        return snapshot_reads(self.repository.db, search) or self.repository
+
+    def _read_cache(self) -> Optional[TTLCache]:
+        """
+        Result cache for this session's reads. Sessions pinned to the primary
+        (read-your-writes) bypass it: a cached answer may predate their write.
+        """
+        return None if self.repository.db.info.get(PIN_PRIMARY) else self.cache
+
+    def _coalesce(self, operation: str, key: Hashable, load):
+        """
+        Share `load` with identical in-flight reads, except in sessions pinned
+        to the primary, which must not join a call that read a replica or the
+        snapshot, or that started before their write.
+        """
+        if self.repository.db.info.get(PIN_PRIMARY):
+            return load()
+        return single_flight.do(operation, key, load)
 
     def search_employees(
         self,
         search: Optional[str] = None,
         limit: int = 50,
-        offset: int = 0
-    ) -> List[Employee]:
+        offset: int = 0,
+        cursor: Optional[str] = None
+    ) -> List[EmployeeResponse]:
         """
         Search employees by name or department.
         
         Performance optimizations:
-        1. Uses indexed columns (name, department) for searching
+        1. Uses a full-text index for keyword matching where available
         2. Implements pagination to avoid fetching unnecessary data
-        3. Uses LIKE with prefix matching for better index utilization
+        3. Keyset pagination via `cursor` keeps deep pages as cheap as the first
+        4. Results are cached per normalized query until the next write
+        5. Concurrent identical queries share one in-flight database call
         """
-        try:
-            return self.repository.search(search=search, limit=limit, offset=offset)
-        except SQLAlchemyError as e:
-            raise DatabaseConnectionError("Failed to connect to database")
+        after = decode_cursor(cursor) if cursor else None
+        cache_key = search_cache_key(search, limit, offset, after)
+
+        cache = self._read_cache()
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation()
+
+        def load():
+            try:
+                snapshot = snapshot_reads(self.repository.db, search)
+                if snapshot is not None:
+                    rows = snapshot.search_rows(search=search, limit=limit, offset=offset, after=after)
+                else:
+                    rows = self.repository.search(search=search, limit=limit, offset=offset, after=after)
+            except SQLAlchemyError as e:
+                raise database_error(e)
 
-    def get_employee_by_id(self, employee_id: int) -> Optional[Employee]:
+            employees = [EmployeeResponse.model_validate(row) for row in rows]
+            if cache is not None:
+                cache.set(cache_key, employees, generation)
+            return employees
+
+        return self._coalesce("search", cache_key, load)
+
+    def search_employees_json(
+        self,
+        search: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        envelope: bool = False
+    ) -> Tuple[bytes, Optional[str]]:
         """
-        Get a single employee by their ID.
+        Read-only fast path of search_employees for the HTTP handler.
+
+        Selects only the response columns as row tuples and encodes them
+        straight to JSON bytes, skipping ORM hydration and EmployeeResponse
+        validation. Returns the body and the cursor of the next page (if full).
+        With `envelope`, the body is a SearchEnvelope with total and facets.
         """
-        try:
-            return self.repository.get_by_id(employee_id)
-        except SQLAlchemyError as e:
-            raise DatabaseConnectionError("Failed to connect to database")
+        after = decode_cursor(cursor) if cursor else None
+        cache_key = search_cache_key(
+            search, limit, offset, after, kind="search_envelope" if envelope else "search_json"
+        )
+
+        cache = self._read_cache()
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation()
+
+        def load():
+            try:
+                rows = self._reader(search).search_rows(search=search, limit=limit, offset=offset, after=after)
+            except SQLAlchemyError as e:
+                raise database_error(e)
+
+            next_cursor = encode_cursor(rows[-1].name, rows[-1].id) if len(rows) == limit else None
+            if envelope:
+                body = encode_envelope(rows, self.get_facets(search), next_cursor)
+            else:
+                body = encode_rows(rows)
+            page = (body, next_cursor)
+            if cache is not None:
+                cache.set(cache_key, page, generation)
+            return page
+
+        return self._coalesce("search_json", cache_key, load)
+
+    def get_facets(self, search: Optional[str] = None) -> Dict:
+        """
+        Total hit count and per-department / per-designation counts for a search.
+
+        Computed with one grouped aggregate and cached per normalized query
+        (independent of pagination), so paging through results counts once.
+        """
+        cache_key = search_cache_key(search, 0, 0, None, kind="facets")
+        cache = self._read_cache()
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation()
+
+        def load():
+            try:
+                rows = self._reader(search).facet_counts(search=search)
+            except SQLAlchemyError as e:
+                raise database_error(e)
+
+            facets = build_facets(rows)
+            if cache is not None:
+                cache.set(cache_key, facets, generation)
+            return facets
+
+        return self._coalesce("facets", cache_key, load)
+
+    def search_ranked_json(
+        self,
+        search: str,
+        limit: int = 50,
+        offset: int = 0,
+        envelope: bool = False
+    ) -> bytes:
+        """
+        Ranked, typo-tolerant search for the HTTP handler.
+
+        The in-memory fuzzy index finds, scores and orders the matches;
+        only the requested page is read from the database, by id. Each
+        employee carries its `score`. With `envelope`, the body also holds
+        the total and facet counts over all matches.
+        """
+        cache_key = search_cache_key(search, limit, offset, None, kind="ranked_envelope" if envelope else "ranked")
+        cache = self._read_cache()
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation()
+
+        def load():
+            total, page, facets = fuzzy_index.search(search, limit, offset, with_facets=envelope)
+            try:
+                rows = self._reader().get_rows_by_ids([employee_id for employee_id, _ in page])
+            except SQLAlchemyError as e:
+                raise database_error(e)
+
+            rows, scores = rank_rows(page, rows)
+            body = encode_ranked(rows, scores, {"total": total, "facets": facets} if envelope else None)
+            if cache is not None:
+                cache.set(cache_key, body, generation)
+            return body
+
+        return self._coalesce("ranked", cache_key, load)
+
+    def get_employee_by_id(self, employee_id: int) -> Optional[EmployeeResponse]:
+        """
+        Get a single employee by their ID (cached until the next write).
+        """
+        cache_key = ("id", employee_id)
+        cache = self._read_cache()
+        if cache is not None:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = cache.generation()
+
+        def load():
+            snapshot = snapshot_reads(self.repository.db)
+            if snapshot is not None:
+                row = snapshot.get_row(employee_id)
+                if row is None:
+                    return None
+                employee = EmployeeResponse.model_construct(**row._asdict())
+            else:
+                try:
+                    row = self.repository.get_by_id(employee_id)
+                except SQLAlchemyError as e:
+                    raise database_error(e)
+
+                if row is None:
+                    return None
+                employee = EmployeeResponse.model_validate(row)
+            if cache is not None:
+                cache.set(cache_key, employee, generation)
+            return employee
+
+        return self._coalesce("get_by_id", cache_key, load)
+
+    def get_employees_by_ids(self, ids: List[int]) -> Tuple[List[Optional[EmployeeResponse]], List[int]]:
+        """
+        Resolve many ids at once: cached employees first, the rest with
+        chunked IN queries. Returns items in request order plus the missing ids.
+        Fetched employees are not written to the cache: a batch of up to
+        5000 would evict most of its entries.
+        """
+        found: Dict[int, EmployeeResponse] = {}
+        to_fetch = []
+        cache = self._read_cache()
+        for employee_id in dict.fromkeys(ids):
+            cached = cache.get(("id", employee_id)) if cache is not None else None
+            if cached is not None:
+                found[employee_id] = cached
+            else:
+                to_fetch.append(employee_id)
+
+        if to_fetch:
+            try:
+                rows = self._reader().get_rows_by_ids(to_fetch)
+            except SQLAlchemyError as e:
+                raise database_error(e)
+            for row in rows:
+                # Rows were validated on write; skip re-validating (EmailStr checks are slow)
+                employee = EmployeeResponse.model_construct(**row._asdict())
+                found[employee.id] = employee
+
+        return order_batch(ids, found)
+
+    def get_changes(self, since: int = 0, limit: int = 1000) -> List:
+        """
+        Change feed entries after sequence number `since`, oldest first.
+        Never cached; identical concurrent reads (e.g. caught-up mirrors
+        polling the same position) share one query.
+        """
+        def load():
+            try:
+                return self.repository.get_changes(since=since, limit=limit)
+            except SQLAlchemyError as e:
+                raise database_error(e)
+
+        return self._coalesce("changes", (since, limit), load)
 
     def create_employee(self, employee_data: EmployeeCreate) -> Employee:
         """
         Create a new employee record.
         """
+        # The uniqueness check and the insert must both see the primary
+        pin_to_primary(self.repository.db)
         try:
             # Check if email already exists
             existing = self.repository.get_by_email(employee_data.email)
             if existing:
                 raise ValidationError("An employee with this email already exists")
             
-            return self.repository.create(employee_data)
+            employee = self.repository.create(employee_data)
+        except SQLAlchemyError as e:
+            raise database_error(e)
+
+        # Any cached search page (or ETag) may now be missing the new employee
+        record_write(self.cache)
+        change_notifier.notify()
+        suggest_index.add(employee.id, employee.name, employee.department)
+        fuzzy_index.add(employee.id, employee.name, employee.department, employee.designation)
+        return employee
+
+    def export_employees(self, search: Optional[str] = None, fmt: str = "ndjson") -> Iterator[str]:
+        """
+        Stream matching employees encoded as NDJSON or CSV chunks.
+        Rows go straight from the database cursor to the encoder.
+        """
+        return ENCODERS[fmt](self.repository.stream_export(search=search))
+
+    def import_batch(self, records: List[Tuple[int, object]]) -> ImportReport:
+        """
+        Validate and insert one batch of (row number, record) pairs.
+
+        Rows are validated with EmployeeCreate, emails are checked against
+        the database with a single IN query, and valid rows are inserted
+        with one executemany in a single transaction. Rejected rows are
+        reported with their row number instead of failing the batch.
+        """
+        report = ImportReport(received=len(records))
+        valid: List[Tuple[int, Dict]] = []
+        seen_emails = set()
+
+        for row, record in records:
+            if isinstance(record, RecordParseError):
+                report.errors.append(ImportRowError(row=row, error=str(record)))
+                continue
+            try:
+                employee = EmployeeCreate.model_validate(record)
+            except PydanticValidationError as e:
+                report.errors.append(ImportRowError(
+                    row=row, email=str(record.get("email") or "") or None, error=_format_validation_error(e)
+                ))
+                continue
+            if employee.email in seen_emails:
+                report.errors.append(ImportRowError(row=row, email=employee.email, error="Duplicate email in import"))
+                continue
+            seen_emails.add(employee.email)
+            valid.append((row, employee.model_dump()))
+
+        pin_to_primary(self.repository.db)
+        try:
+            existing = self.repository.get_existing_emails([data["email"] for _, data in valid])
+            to_insert = []
+            for row, data in valid:
+                if data["email"] in existing:
+                    report.errors.append(ImportRowError(
+                        row=row, email=data["email"], error="An employee with this email already exists"
+                    ))
+                else:
+                    to_insert.append((row, data))
+            try:
+                report.inserted = self.repository.bulk_create([data for _, data in to_insert])
+                if report.inserted:
+                    rows = self.repository.get_index_rows_by_emails([data["email"] for _, data in to_insert])
+                    suggest_index.add_many(rows)
+                    for row in rows:
+                        fuzzy_index.add(row.id, row.name, row.department, row.designation)
+            except IntegrityError:
+                # A concurrent write took one of the emails; reject the batch rather than guess
+                report.errors.extend(
+                    ImportRowError(row=row, email=data["email"], error="Rejected by the database (duplicate email)")
+                    for row, data in to_insert
+                )
         except SQLAlchemyError as e:
-            raise DatabaseConnectionError("Failed to connect to database")
+            raise database_error(e)
+
+        report.errors.sort(key=lambda error: error.row)
+        report.failed = len(report.errors)
+        if report.inserted:
+            record_write(self.cache)
+            change_notifier.notify()
+        return report
+
+    def import_employees(self, records: Iterable[object], batch_size: int = IMPORT_BATCH_SIZE) -> ImportReport:
+        """
+        Bulk import employees from an iterable of dicts, one transaction per batch.
+        """
+        report = ImportReport()
+        row = 1
+        for batch in chunked(records, batch_size):
+            merge_import_reports(report, self.import_batch(numbered(batch, row)))
+            row += len(batch)
+        return report
+
+    async def import_stream(self, records: AsyncIterator[object], batch_size: int = IMPORT_BATCH_SIZE) -> ImportReport:
+        """
+        Bulk import from an async stream of records (e.g. an upload being
+        parsed line by line). Only one batch is held in memory at a time;
+        each batch is written on the threadpool so the event loop keeps serving.
+        """
+        report = ImportReport()
+        row = 1
+        batch = []
+        async for record in records:
+            batch.append(record)
+            if len(batch) == batch_size:
+                merge_import_reports(report, await run_in_threadpool(self.import_batch, numbered(batch, row)))
+                row += len(batch)
+                batch = []
+        if batch:
+            merge_import_reports(report, await run_in_threadpool(self.import_batch, numbered(batch, row)))
+        return report
+
+
+def merge_import_reports(total: ImportReport, batch: ImportReport) -> ImportReport:
+    """Accumulate a batch report into a running total."""
+    total.received += batch.received
+    total.inserted += batch.inserted
+    total.failed += batch.failed
+    total.errors.extend(batch.errors)
+    return total
@@ -0,0 +1,39 @@
+import csv
+import io
+from typing import Iterable, Iterator, Sequence
+
+from app.repositories.employee_repository import EXPORT_COLUMNS
+from app.services.serialization import dumps
+
+EXPORT_FIELDS = [col.key for col in EXPORT_COLUMNS]
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def encode_ndjson(batches: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+    """Encode row batches as NDJSON, one chunk per batch."""
+    for batch in batches:
+        yield b"".join(dumps(dict(zip(EXPORT_FIELDS, row))) + b"\n" for row in batch)
+
+
+def encode_csv(batches: Iterable[Sequence[tuple]]) -> Iterator[str]:
+    """Encode row batches as CSV with a header row, one chunk per batch."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+ENCODERS = {
+    "ndjson": encode_ndjson,
+    "csv": encode_csv,
+}
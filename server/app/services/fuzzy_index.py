@@ -0,0 +1,283 @@
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from dotenv import load_dotenv
+from heapq import nsmallest
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import os
+import sys
+import threading
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Ranked, typo-tolerant search served from memory (built at startup)
+FUZZY_SEARCH_ENABLED = os.getenv("FUZZY_SEARCH_ENABLED", "true").lower() == "true"
+
+# How much a match in each field is worth
+FIELD_WEIGHTS = (3.0, 2.0, 1.0)  # name, department, designation
+NAME, DEPARTMENT, DESIGNATION = range(3)
+
+# How well a query term matches an indexed word
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.75
+FUZZY_SCORES = {1: 0.6, 2: 0.4}  # by edit distance
+INFIX_SCORE = 0.5
+# Extra score when the whole name equals the query
+FULL_NAME_BONUS = 2.0
+# Cap on indexed words a single prefix may expand to
+MAX_PREFIX_EXPANSION = 200
+
+
+def max_edits(term: str) -> int:
+    """Typos tolerated in a query term: none below 4 characters, 2 from 8."""
+    if len(term) < 4:
+        return 0
+    return 1 if len(term) < 8 else 2
+
+
+def _trigrams(word: str) -> List[str]:
+    padded = f"${word}$"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (insert, delete, substitute, swap
+    adjacent characters) between a and b, or limit + 1 once it exceeds limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else limit + 1
+
+
+class FuzzyIndex:
+    """
+    In-memory inverted index for ranked, typo-tolerant search.
+
+    Every distinct lower-cased word of a name, department or designation
+    is a vocabulary entry with one posting array of employee ids per
+    field. A query word is matched against the vocabulary exactly, as a
+    prefix (bisect over the sorted words), as an infix, or within a small
+    edit distance; infix and typo candidates come from a trigram index over
+    the vocabulary and are verified with a bounded edit distance. Scores
+    combine match quality with field weights, and every query word must
+    match for an employee to be returned.
+
+    Adds only append to the structures, and write each one before anything
+    that refers to it, so searches read them without holding the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._words: List[str] = []
+        self._word_ids: Dict[str, int] = {}
+        self._sorted_words: List[str] = []
+        self._postings: List[Tuple[array, array, array]] = []
+        self._trigrams: Dict[str, array] = {}
+        self._full_names: Dict[str, array] = {}
+        self._employees: Dict[int, Tuple[str, str, str]] = {}
+        # Employees added while a load is scanning the table (None when no load runs)
+        self._pending: Optional[List[Tuple[int, str, str, Optional[str]]]] = None
+        self.ready = False
+
+    def _word_id(self, word: str) -> int:
+        word_id = self._word_ids.get(word)
+        if word_id is None:
+            word_id = len(self._words)
+            self._words.append(word)
+            self._postings.append((array("l"), array("l"), array("l")))
+            self._word_ids[word] = word_id
+            for gram in set(_trigrams(word)):
+                self._trigrams.setdefault(gram, array("l")).append(word_id)
+            if self.ready:
+                insort(self._sorted_words, word)
+        return word_id
+
+    def _index(self, employee_id: int, fields: Tuple[str, str, str]) -> None:
+        full_name = " ".join(fields[NAME].lower().split())
+        self._full_names.setdefault(full_name, array("l")).append(employee_id)
+        for field, text in enumerate(fields):
+            for word in set(text.lower().split()):
+                self._postings[self._word_id(word)][field].append(employee_id)
+
+    def load(self, rows: Iterable[Tuple[int, str, str, str]]) -> None:
+        """
+        Rebuild the index from (id, name, department, designation) rows.
+        Employees added while the rows are read are replayed into the new
+        index before it replaces the current one.
+        """
+        with self._lock:
+            if self._pending is None:
+                self._pending = []
+        fresh = FuzzyIndex()
+        for employee_id, name, department, designation in rows:
+            fields = (name, sys.intern(department), sys.intern(designation or ""))
+            fresh._employees[employee_id] = fields
+            fresh._index(employee_id, fields)
+        fresh._sorted_words = sorted(fresh._words)
+        fresh.ready = True
+        with self._lock:
+            for added in self._pending:
+                fresh.add(*added)
+            self._pending = None
+            self._words = fresh._words
+            self._word_ids = fresh._word_ids
+            self._sorted_words = fresh._sorted_words
+            self._postings = fresh._postings
+            self._trigrams = fresh._trigrams
+            self._full_names = fresh._full_names
+            self._employees = fresh._employees
+            self.ready = True
+        logger.info(f"Fuzzy index loaded: {len(self._employees)} employees, {len(self._words)} words")
+
+    def add(self, employee_id: int, name: str, department: str, designation: Optional[str]) -> None:
+        """Index a newly created employee."""
+        fields = (name, sys.intern(department), sys.intern(designation or ""))
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((employee_id, name, department, designation))
+            if employee_id in self._employees:
+                return
+            self._employees[employee_id] = fields
+            self._index(employee_id, fields)
+
+    def _view(self) -> "FuzzyIndex":
+        """The current structures, taken together (load swaps them all under the lock)."""
+        view = FuzzyIndex.__new__(FuzzyIndex)
+        with self._lock:
+            view.__dict__.update(self.__dict__)
+        return view
+
+    def _match_word(self, term: str) -> Dict[int, float]:
+        """Vocabulary words matching a query term, with their match score."""
+        matches: Dict[int, float] = {}
+        word_id = self._word_ids.get(term)
+        if word_id is not None:
+            matches[word_id] = EXACT_SCORE
+
+        position = bisect_left(self._sorted_words, term)
+        end = min(position + MAX_PREFIX_EXPANSION, len(self._sorted_words))
+        while position < end and self._sorted_words[position].startswith(term):
+            matches.setdefault(self._word_ids[self._sorted_words[position]], PREFIX_SCORE)
+            position += 1
+
+        if len(term) < 3:
+            return matches
+        grams = set(_trigrams(term))
+        limit = max_edits(term)
+        # Each edit changes at most 3 trigrams, so closer words share at least this many
+        min_shared = len(grams) - 3 * limit
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._trigrams.get(gram, ()))
+        for word_id, count in shared.items():
+            if word_id in matches:
+                continue
+            word = self._words[word_id]
+            if term in word:
+                matches[word_id] = INFIX_SCORE
+            elif limit and count >= min_shared:
+                distance = bounded_edit_distance(term, word, limit)
+                if distance <= limit:
+                    matches[word_id] = FUZZY_SCORES[distance]
+        return matches
+
+    def _term_scores(self, term: str) -> Dict[int, float]:
+        """
+        Score of every employee matching one query term: the best match in
+        each field, summed over fields (a name hit plus a department hit
+        beats either alone).
+        """
+        by_field: List[List[Tuple[float, array]]] = [[], [], []]
+        for word_id, match_score in self._match_word(term).items():
+            for field, employee_ids in enumerate(self._postings[word_id]):
+                if employee_ids:
+                    by_field[field].append((match_score * FIELD_WEIGHTS[field], employee_ids))
+
+        total: Dict[int, float] = {}
+        for matches in by_field:
+            # Best score per employee: take matches best-first, each employee once (set ops run in C)
+            best: Dict[int, float] = {}
+            for score, employee_ids in sorted(matches, key=lambda match: -match[0]):
+                best.update(dict.fromkeys(set(employee_ids).difference(best), score))
+            if len(best) > len(total):
+                total, best = best, total
+            total.update({e: s + total.get(e, 0.0) for e, s in best.items()})
+        return total
+
+    def search(
+        self, query: str, limit: int = 50, offset: int = 0, with_facets: bool = False
+    ) -> Tuple[int, List[Tuple[int, float]], Optional[Dict]]:
+        """
+        Rank employees for `query`. Returns the total number of matches,
+        the (id, score) pairs of the requested page (best first; ties by
+        name, then id) and, with `with_facets`, department / designation
+        counts over all matches.
+        """
+        terms = list(dict.fromkeys(query.lower().split()))
+        scores: Dict[int, float] = {}
+        # Score without the lock, so broad queries do not hold up adds
+        index = self._view()
+        for position, term in enumerate(terms):
+            term_scores = index._term_scores(term)
+            if position == 0:
+                scores = term_scores
+            else:
+                # Every term must match; add up the scores of all terms
+                if len(term_scores) < len(scores):
+                    scores, term_scores = term_scores, scores
+                scores = {e: s + term_scores[e] for e, s in scores.items() if e in term_scores}
+            if not scores:
+                break
+
+        for employee_id in index._full_names.get(" ".join(terms), ()):
+            if employee_id in scores:
+                scores[employee_id] += FULL_NAME_BONUS
+
+        employees = index._employees
+        page = nsmallest(
+            offset + limit, scores.items(), key=lambda item: (-item[1], employees[item[0]][NAME], item[0])
+        )[offset:]
+
+        facets = None
+        if with_facets:
+            departments = Counter(employees[employee_id][DEPARTMENT] for employee_id in scores)
+            designations = Counter(employees[employee_id][DESIGNATION] for employee_id in scores)
+            facets = {"department": dict(departments), "designation": dict(designations)}
+
+        return len(scores), [(employee_id, round(score, 3)) for employee_id, score in page], facets
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"employees": len(self._employees), "words": len(self._words)}
+
+
+# Shared index used by ranked search and kept current by the service layer
+fuzzy_index = FuzzyIndex()
+
+
+def build_fuzzy_index() -> None:
+    """Load the fuzzy index from the employees table."""
+    from app.database.connection import SessionLocal
+    from app.repositories.employee_repository import EmployeeRepository
+
+    db = SessionLocal()
+    try:
+        fuzzy_index.load(EmployeeRepository(db).iter_index_rows())
+    finally:
+        db.close()
@@ -0,0 +1,48 @@
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from typing import Dict, Optional
+import hashlib
+import os
+
+load_dotenv()
+
+# Cache-Control sent with cacheable reads; "no-cache" lets browsers and CDNs
+# store responses but revalidate them with If-None-Match every time
+HTTP_CACHE_CONTROL = os.getenv("HTTP_CACHE_CONTROL", "no-cache")
+
+
+def content_etag(body: bytes) -> str:
+    """
+    Weak ETag of a response body. It is derived from the data actually
+    returned, so it changes exactly when the answer does, whichever worker,
+    replica, snapshot or cache produced it.
+    """
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches `etag` (weak comparison).
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def cache_headers(etag: str) -> Dict[str, str]:
+    """Validator headers sent with 200 and 304 responses."""
+    return {"ETag": etag, "Cache-Control": HTTP_CACHE_CONTROL}
+
+
+def json_response(request: Request, body: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    """
+    A JSON body with its validators, or an empty 304 when the request's
+    If-None-Match already holds its ETag (the body is not sent again).
+    """
+    etag = content_etag(body)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=cache_headers(etag))
+    return Response(content=body, media_type="application/json", headers={**cache_headers(etag), **(headers or {})})
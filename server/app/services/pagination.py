@@ -0,0 +1,27 @@
+import base64
+import json
+from typing import Tuple
+
+from app.exceptions.custom_exceptions import ValidationError
+
+
+def encode_cursor(name: str, employee_id: int) -> str:
+    """
+    Encode the (name, id) keyset of the last row of a page into an opaque cursor.
+    """
+    raw = json.dumps([name, employee_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    """
+    Decode a cursor produced by encode_cursor back into a (name, id) keyset.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        name, employee_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if not isinstance(name, str) or not isinstance(employee_id, int):
+            raise ValueError("bad cursor payload")
+        return name, employee_id
+    except (ValueError, TypeError, UnicodeError):
+        raise ValidationError("Invalid pagination cursor")
@@ -0,0 +1,50 @@
+import json
+from typing import Any, Dict, Optional, Sequence
+
+from app.repositories.employee_repository import RESPONSE_COLUMNS
+
+# orjson is optional; it encodes dates natively and is several times faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+RESPONSE_FIELDS = tuple(col.key for col in RESPONSE_COLUMNS)
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode an object to compact UTF-8 JSON bytes, like orjson (dates as ISO strings)."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def encode_rows(rows: Sequence[tuple]) -> bytes:
+    """
+    Encode RESPONSE_COLUMNS row tuples to the same JSON as List[EmployeeResponse].
+    """
+    return dumps([dict(zip(RESPONSE_FIELDS, row)) for row in rows])
+
+
+def encode_envelope(rows: Sequence[tuple], facets: Dict[str, Any], next_cursor: Optional[str]) -> bytes:
+    """
+    Encode a search page with its total and facet counts (SearchEnvelope).
+    """
+    return dumps({
+        "items": [dict(zip(RESPONSE_FIELDS, row)) for row in rows],
+        "total": facets["total"],
+        "facets": facets["facets"],
+        "next_cursor": next_cursor,
+    })
+
+
+def encode_ranked(rows: Sequence[tuple], scores: Sequence[float], envelope: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Encode ranked search results (RankedEmployee: the response fields plus
+    `score`), in the given order. With `envelope` (total and facets), the
+    items are wrapped like SearchEnvelope, without a cursor.
+    """
+    items = [{**dict(zip(RESPONSE_FIELDS, row)), "score": score} for row, score in zip(rows, scores)]
+    if envelope is None:
+        return dumps(items)
+    return dumps({"items": items, **envelope, "next_cursor": None})
@@ -0,0 +1,144 @@
+from dotenv import load_dotenv
+from typing import Any, Awaitable, Callable, Dict, Hashable
+import asyncio
+import os
+import threading
+
+from app.monitoring.metrics import COALESCED_REQUESTS
+from app.services.cache import directory_version
+
+load_dotenv()
+
+# Share one in-flight database call between concurrent identical reads
+COALESCE_ENABLED = os.getenv("COALESCE_ENABLED", "true").lower() == "true"
+# How long a thread waits for another's call before running its own
+COALESCE_WAIT_SECONDS = float(os.getenv("COALESCE_WAIT_SECONDS", 10))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Counters:
+    def __init__(self):
+        self.leaders = 0
+        self.coalesced = 0
+
+    def record(self, operation: str, leader: bool) -> None:
+        # Plain int updates can race under threads; good enough for reporting
+        if leader:
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        COALESCED_REQUESTS.labels(operation, "leader" if leader else "coalesced").inc()
+
+    def stats(self) -> Dict[str, int]:
+        return {"leaders": self.leaders, "coalesced": self.coalesced}
+
+
+def _flight_key(operation: str, key: Hashable) -> Hashable:
+    # Keyed by directory version too: a read starting after a write never
+    # joins a call that started before it
+    return (operation, key, directory_version.generation())
+
+
+class SingleFlight:
+    """
+    Thread-based single-flight: while a call for a key is running, other
+    threads asking for the same key wait for it and receive its result
+    (or its exception) instead of running their own. Used by the sync
+    service, whose requests run on the threadpool. A thread that has
+    waited `wait_seconds` (e.g. behind a hung query) runs the call itself.
+    """
+
+    def __init__(self, enabled: bool = COALESCE_ENABLED, wait_seconds: float = COALESCE_WAIT_SECONDS):
+        self.enabled = enabled
+        self.wait_seconds = wait_seconds
+        self.counters = _Counters()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, operation: str, key: Hashable, fn: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return fn()
+        flight_key = _flight_key(operation, key)
+        with self._lock:
+            call = self._calls.get(flight_key)
+            leader = call is None
+            if leader:
+                call = self._calls[flight_key] = _Call()
+        self.counters.record(operation, leader)
+
+        if not leader:
+            if not call.done.wait(self.wait_seconds):
+                return fn()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[flight_key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """
+    asyncio single-flight for the async service: concurrent identical
+    calls on the event loop await the first caller's future. If the first
+    caller is cancelled (e.g. its client disconnected), the waiters start
+    over and one of them runs the call.
+    """
+
+    def __init__(self, enabled: bool = COALESCE_ENABLED):
+        self.enabled = enabled
+        self.counters = _Counters()
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, operation: str, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            return await fn()
+        flight_key = _flight_key(operation, key)
+        future = self._calls.get(flight_key)
+        while future is not None:
+            self.counters.record(operation, False)
+            try:
+                # shield: a waiter being cancelled must not cancel the shared call
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Retry only if the leader was cancelled, not this task
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+            future = self._calls.get(flight_key)
+
+        self.counters.record(operation, True)
+        future = self._calls[flight_key] = asyncio.get_running_loop().create_future()
+        try:
+            result = await fn()
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved, in case nobody was waiting
+            raise
+        finally:
+            del self._calls[flight_key]
+
+
+# Shared by all service instances of each execution model
+single_flight = SingleFlight()
+async_single_flight = AsyncSingleFlight()
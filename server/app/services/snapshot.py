@@ -0,0 +1,520 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, namedtuple
+from datetime import date
+from dotenv import load_dotenv
+from itertools import accumulate, compress, count, islice
+from operator import add
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import logging
+import os
+import string
+import sys
+import threading
+import time
+import unicodedata
+
+from app.database.routing import PIN_PRIMARY
+from app.services.serialization import RESPONSE_FIELDS
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Serve search, get-by-id and pagination from an in-memory copy of the employees table
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "false").lower() == "true"
+# How often the snapshot catches up with the change feed
+SNAPSHOT_REFRESH_SECONDS = float(os.getenv("SNAPSHOT_REFRESH_SECONDS", 1))
+# Reads go to the database while the last successful refresh is older than this
+SNAPSHOT_MAX_STALENESS_SECONDS = float(os.getenv("SNAPSHOT_MAX_STALENESS_SECONDS", 5))
+
+# Change feed entries read per query while refreshing
+REFRESH_BATCH_SIZE = 5000
+
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+# Letters utf8mb4_0900_ai_ci compares as their base letter, though Unicode does not decompose them
+_MYSQL_BASE_LETTERS = str.maketrans("øØđĐłŁıħĦŧŦ", "ooddlli" + "hhtt")
+# Letters it sorts as two (equal to the pair in comparisons, but not in LIKE)
+_MYSQL_EXPANSIONS = str.maketrans({"ß": "ss", "æ": "ae", "œ": "oe", "þ": "th"})
+
+
+def ascii_fold(text: str) -> str:
+    """Lower-case ASCII letters only, like SQLite's LIKE."""
+    return text.lower() if text.isascii() else text.translate(_ASCII_LOWER)
+
+
+def accent_fold(text: str) -> str:
+    """Lower-case and strip accents, like a MySQL *_ai_ci collation compares characters."""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFD", text.translate(_MYSQL_BASE_LETTERS))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def accent_sort_key(name: str) -> str:
+    """Sort key of a name under utf8mb4_0900_ai_ci: accents and case ignored, ß as ss."""
+    folded = accent_fold(name)
+    return folded if folded.isascii() else folded.translate(_MYSQL_EXPANSIONS)
+
+
+class Collation:
+    """
+    How a database orders and matches names, reproduced in Python.
+
+    `fold` maps names, labels and keywords to the form substring matching
+    compares (LIKE and the full-text index agree on it). `sort_key` maps a
+    name to its ORDER BY position, ties broken by id; None means code point
+    order. With `ascii_keywords_only`, searches with other keywords go to
+    the database (its search backends fold them differently).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fold: Callable[[str], str],
+        sort_key: Optional[Callable[[str], str]] = None,
+        ascii_keywords_only: bool = False
+    ):
+        self.name = name
+        self.fold = fold
+        self.sort_key = sort_key
+        self.ascii_keywords_only = ascii_keywords_only
+
+    def key(self, name: str) -> str:
+        return self.sort_key(name) if self.sort_key is not None else name
+
+    def can_search(self, search: Optional[str]) -> bool:
+        return not search or not self.ascii_keywords_only or search.isascii()
+
+
+# The default collation of each supported dialect: SQLite orders by code point
+# (BINARY) and its LIKE folds only ASCII case (its trigram index folds all of
+# Unicode); MySQL 8 tables default to utf8mb4_0900_ai_ci. PostgreSQL orders by
+# locale rules the snapshot does not reproduce.
+COLLATIONS = {
+    "sqlite": Collation("binary", ascii_fold, ascii_keywords_only=True),
+    "mysql": Collation("utf8mb4_0900_ai_ci", accent_fold, accent_sort_key),
+}
+
+# A row in RESPONSE_COLUMNS order with attribute access, like the repository's rows
+SnapshotRow = namedtuple("SnapshotRow", RESPONSE_FIELDS)
+
+
+class _Columns:
+    """
+    One immutable version of the snapshot. Employees are stored column by
+    column in search order (the collation's name order, then id): ids,
+    names and emails, department and designation as codes into a shared
+    label list, and joining dates as day ordinals. Derived lookups: the
+    names' sort keys (unless code point order), the folded names joined
+    into one string (keyword matching with str.find), ids sorted with their
+    positions (get-by-id with bisect) and the department codes in use.
+    """
+
+    __slots__ = (
+        "collation", "ids", "names", "emails", "departments", "designations", "joined",
+        "keys", "haystack", "offsets", "sorted_ids", "id_positions", "department_codes",
+    )
+
+    def __init__(self, collation, ids, names, emails, departments, designations, joined, keys=None):
+        self.collation = collation
+        self.ids = ids
+        self.names = names
+        self.emails = emails
+        self.departments = departments
+        self.designations = designations
+        self.joined = joined
+        if keys is None:
+            keys = names if collation.sort_key is None else list(map(collation.sort_key, names))
+        self.keys = keys
+        # offsets[i] is where names[i] starts in haystack (one extra entry marks the end)
+        self.haystack = collation.fold("\n".join(names)) + "\n"
+        self.offsets = array("q", map(add, accumulate(map(len, names), initial=0), count()))
+        if len(self.haystack) != self.offsets[-1]:
+            # Folding changed some name's length: fold names one by one
+            folded = [collation.fold(name) + "\n" for name in names]
+            self.haystack = "".join(folded)
+            self.offsets = array("q", accumulate(map(len, folded), initial=0))
+        self.id_positions = array("l", sorted(range(len(ids)), key=ids.__getitem__))
+        self.sorted_ids = array("q", map(ids.__getitem__, self.id_positions))
+        self.department_codes = frozenset(departments)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def position_of(self, employee_id: int) -> Optional[int]:
+        index = bisect_left(self.sorted_ids, employee_id)
+        if index < len(self.sorted_ids) and self.sorted_ids[index] == employee_id:
+            return self.id_positions[index]
+        return None
+
+    def position_after(self, name: str, employee_id: int) -> int:
+        """First position after (name, id) in search order (keyset pagination)."""
+        key = self.collation.key(name)
+        low = bisect_left(self.keys, key)
+        high = bisect_right(self.keys, key, low)
+        return bisect_right(self.ids, employee_id, low, high)
+
+    def nbytes(self) -> int:
+        columns = (self.ids, self.names, self.emails, self.departments, self.designations, self.joined,
+                   self.haystack, self.offsets, self.sorted_ids, self.id_positions)
+        nbytes = (sum(map(sys.getsizeof, columns))
+                  + sum(map(sys.getsizeof, self.names)) + sum(map(sys.getsizeof, self.emails)))
+        if self.keys is not self.names:
+            nbytes += sys.getsizeof(self.keys) + sum(map(sys.getsizeof, self.keys))
+        return nbytes
+
+
+class DirectorySnapshot:
+    """
+    Column-oriented, in-memory copy of the employees table that answers
+    the repository's read queries (search_rows, facet_counts,
+    get_rows_by_ids) with the same results.
+
+    Loaded at startup, then kept current from the change feed. Each refresh
+    builds a new column set and swaps it in, so readers never lock and
+    always see one consistent version.
+    """
+
+    def __init__(
+        self, max_staleness: float = SNAPSHOT_MAX_STALENESS_SECONDS, collation: Collation = COLLATIONS["sqlite"]
+    ):
+        self.max_staleness = max_staleness
+        self._lock = threading.Lock()
+        self._labels: List[str] = []
+        self._label_codes: Dict[str, int] = {}
+        self._columns = _Columns(collation, array("q"), [], [], array("I"), array("I"), array("l"))
+        self.seq = 0
+        self.synced_at = 0.0
+        self.ready = False
+
+    def _code(self, label: str) -> int:
+        # Department and designation labels share one append-only vocabulary (codes are
+        # stored as unsigned 32-bit ints: label counts are not bounded by 65,535)
+        code = self._label_codes.get(label)
+        if code is None:
+            code = self._label_codes[label] = len(self._labels)
+            self._labels.append(sys.intern(label))
+        return code
+
+    @property
+    def collation(self) -> Collation:
+        return self._columns.collation
+
+    def can_search(self, search: Optional[str]) -> bool:
+        """Whether the snapshot matches `search` exactly as the database would."""
+        return self._columns.collation.can_search(search)
+
+    def load(self, rows: Iterable[Tuple], seq: int, started: float, collation: Optional[Collation] = None) -> None:
+        """
+        Replace the snapshot with RESPONSE_COLUMNS rows, as of change `seq`
+        (the feed head read before the rows) and monotonic time `started`,
+        ordered and matched by `collation` (by default, the current one).
+        """
+        with self._lock:
+            collation = collation or self._columns.collation
+            sort_key = collation.key
+            rows = sorted(rows, key=lambda row: (sort_key(row[0]), row[5]))
+            self._columns = _Columns(
+                collation,
+                array("q", (row[5] for row in rows)),
+                [row[0] for row in rows],
+                [row[1] for row in rows],
+                array("I", (self._code(row[2]) for row in rows)),
+                array("I", (self._code(row[3]) for row in rows)),
+                array("l", (row[4].toordinal() for row in rows)),
+            )
+            self.seq = seq
+            self.synced_at = started
+            self.ready = True
+        logger.info(f"Directory snapshot loaded: {len(rows)} employees at change {seq}")
+
+    def apply_changes(self, changes: Sequence[Tuple], started: float) -> int:
+        """
+        Apply change feed rows (CHANGE_COLUMNS + RESPONSE_COLUMNS) read
+        at monotonic time `started`. Returns the number of employees
+        added, changed or removed (entries already reflected are skipped).
+        """
+        updates: Dict[int, Optional[SnapshotRow]] = {}
+        for seq, operation, employee_id, changed_at, *employee in changes:
+            # The feed joins the employee's current data; none means it is gone
+            updates[employee_id] = SnapshotRow(*employee) if employee[-1] is not None else None
+
+        with self._lock:
+            current = self._columns
+            removals, inserts = [], []
+            for employee_id, row in updates.items():
+                position = current.position_of(employee_id)
+                if position is not None:
+                    if row == self._row(current, position):
+                        continue
+                    removals.append(position)
+                if row is not None:
+                    inserts.append(row)
+
+            if removals or inserts:
+                collation = current.collation
+                ids, names, emails = array("q", current.ids), list(current.names), list(current.emails)
+                departments, designations = array("I", current.departments), array("I", current.designations)
+                joined = array("l", current.joined)
+                keys = names if current.keys is current.names else list(current.keys)
+                columns = (ids, names, emails, departments, designations, joined)
+                if keys is not names:
+                    columns += (keys,)
+                for position in sorted(removals, reverse=True):
+                    for column in columns:
+                        del column[position]
+                for row in inserts:
+                    key = collation.key(row.name)
+                    low = bisect_left(keys, key)
+                    position = bisect_left(ids, row.id, low, bisect_right(keys, key, low))
+                    if keys is not names:
+                        keys.insert(position, key)
+                    ids.insert(position, row.id)
+                    names.insert(position, row.name)
+                    emails.insert(position, row.email)
+                    departments.insert(position, self._code(row.department))
+                    designations.insert(position, self._code(row.designation))
+                    joined.insert(position, row.date_of_joining.toordinal())
+                self._columns = _Columns(collation, ids, names, emails, departments, designations, joined, keys)
+
+            if changes:
+                self.seq = changes[-1][0]
+            self.synced_at = started
+        return len(removals) + len(inserts)
+
+    def _row(self, columns: _Columns, position: int) -> SnapshotRow:
+        labels = self._labels
+        return SnapshotRow(
+            columns.names[position],
+            columns.emails[position],
+            labels[columns.departments[position]],
+            labels[columns.designations[position]],
+            date.fromordinal(columns.joined[position]),
+            columns.ids[position],
+        )
+
+    def age(self) -> float:
+        """Seconds since the snapshot was last known to be current."""
+        return time.monotonic() - self.synced_at
+
+    def serving(self) -> bool:
+        """Whether reads may be answered from the snapshot (loaded and within the staleness bound)."""
+        return self.ready and self.age() <= self.max_staleness
+
+    def _matches(self, columns: _Columns, keywords: List[str], start: int) -> Iterator[int]:
+        """
+        Positions from `start` on, in search order, whose name or department
+        contains every (folded) keyword, like the search backends.
+        """
+        if not keywords:
+            yield from range(start, len(columns))
+            return
+        labels, haystack, offsets, departments = self._labels, columns.haystack, columns.offsets, columns.departments
+        fold = columns.collation.fold
+        # A keyword no name contains can only match departments: all such keywords
+        # together allow one set of department codes
+        allowed = None
+        name_keywords = []
+        for keyword in keywords:
+            hits = {code for code in columns.department_codes if keyword in fold(labels[code])}
+            if keyword in haystack:
+                name_keywords.append((keyword, hits))
+            else:
+                allowed = hits if allowed is None else allowed & hits
+        if allowed is not None and not allowed:
+            return
+
+        # Pick the cheapest candidate source: str.find on the keywords only names
+        # contain, else the department codes (filtered in C), else every row
+        seekers = sorted((keyword for keyword, hits in name_keywords if not hits), key=len, reverse=True)
+        if seekers:
+            name_keywords = [(keyword, hits) for keyword, hits in name_keywords if hits]
+
+            def candidates():
+                # Leapfrog: seek each keyword from the current row; rows where all
+                # of them land are matches, otherwise jump to the furthest one
+                position, end = start, len(columns)
+                while position < end:
+                    for keyword in seekers:
+                        index = haystack.find(keyword, offsets[position])
+                        if index == -1:
+                            return
+                        found = bisect_right(offsets, index) - 1
+                        if found != position:
+                            position = found
+                            break
+                    else:
+                        yield position
+                        position += 1
+
+            positions = candidates()
+        elif allowed is not None:
+            positions = compress(count(start), map(allowed.__contains__, islice(departments, start, None)))
+            allowed = None
+        else:
+            positions = range(start, len(columns))
+
+        for position in positions:
+            if allowed is not None and departments[position] not in allowed:
+                continue
+            if name_keywords:
+                name = haystack[offsets[position]:offsets[position + 1]]
+                if not all(keyword in name or departments[position] in hits for keyword, hits in name_keywords):
+                    continue
+            yield position
+
+    def search_rows(
+        self,
+        search: Optional[str] = None,
+        limit: int = 50,
+        offset: int = 0,
+        after: Optional[Tuple[str, int]] = None
+    ) -> List[SnapshotRow]:
+        """Same contract as EmployeeRepository.search_rows()."""
+        columns = self._columns
+        keywords = columns.collation.fold(search).split() if search else []
+        start = 0
+        if after is not None:
+            start = columns.position_after(*after)
+            offset = 0
+        positions = islice(self._matches(columns, keywords, start), offset, offset + limit)
+        return [self._row(columns, position) for position in positions]
+
+    def facet_counts(self, search: Optional[str] = None) -> List[Tuple[str, str, int]]:
+        """Same contract as EmployeeRepository.facet_counts()."""
+        columns = self._columns
+        keywords = columns.collation.fold(search).split() if search else []
+        departments, designations = columns.departments, columns.designations
+        counts = Counter(
+            (departments[position], designations[position]) for position in self._matches(columns, keywords, 0)
+        )
+        labels = self._labels
+        facets = [(labels[department], labels[designation], count) for (department, designation), count in counts.items()]
+        sort_key = columns.collation.sort_key
+        if sort_key is None:
+            return facets
+        # GROUP BY compares labels by the collation too (e.g. "Sales" and "SALES" are one group)
+        groups: Dict[Tuple[str, str], List] = {}
+        for department, designation, count in facets:
+            group = groups.setdefault((sort_key(department), sort_key(designation)), [department, designation, 0])
+            group[2] += count
+        return [tuple(group) for group in groups.values()]
+
+    def get_rows_by_ids(self, ids: Sequence[int], chunk_size: int = 0) -> List[SnapshotRow]:
+        """Same contract as EmployeeRepository.get_rows_by_ids()."""
+        columns = self._columns
+        positions = (columns.position_of(employee_id) for employee_id in ids)
+        return [self._row(columns, position) for position in positions if position is not None]
+
+    def get_row(self, employee_id: int) -> Optional[SnapshotRow]:
+        columns = self._columns
+        position = columns.position_of(employee_id)
+        return self._row(columns, position) if position is not None else None
+
+    def stats(self) -> Dict:
+        columns = self._columns
+        nbytes = columns.nbytes() + sum(map(sys.getsizeof, self._labels))
+        return {
+            "enabled": True,
+            "ready": self.ready,
+            "serving": self.serving(),
+            "employees": len(columns),
+            "bytes": nbytes,
+            "bytes_per_employee": round(nbytes / len(columns), 1) if len(columns) else None,
+            "seq": self.seq,
+            "age_seconds": round(self.age(), 3) if self.ready else None,
+            "max_staleness_seconds": self.max_staleness,
+        }
+
+
+# Shared snapshot; only loaded when SNAPSHOT_ENABLED
+directory_snapshot = DirectorySnapshot()
+
+
+def snapshot_enabled() -> bool:
+    """Whether SNAPSHOT_ENABLED is on (read at call time, so it can be switched at runtime)."""
+    return SNAPSHOT_ENABLED
+
+
+def snapshot_reads(db, search: Optional[str] = None) -> Optional[DirectorySnapshot]:
+    """
+    The snapshot if this session's reads (of `search`) may be served from
+    it: it is enabled and fresh, and the client has not just written
+    (read-your-writes pins the session to the primary, which the snapshot
+    may lag behind), and the snapshot's collation matches `search` like the
+    database (on SQLite, only ASCII keywords).
+    """
+    if (
+        SNAPSHOT_ENABLED
+        and directory_snapshot.serving()
+        and not db.info.get(PIN_PRIMARY)
+        and directory_snapshot.can_search(search)
+    ):
+        return directory_snapshot
+    return None
+
+
+def database_collation() -> Collation:
+    """
+    The collation the snapshot reproduces for the configured database.
+    Raises ValueError on a database it cannot mirror exactly (checked at
+    startup, so SNAPSHOT_ENABLED=true on such a database fails loudly).
+    """
+    from app.database.connection import engine
+
+    collation = COLLATIONS.get(engine.dialect.name)
+    if collation is None:
+        raise ValueError(
+            f"SNAPSHOT_ENABLED is not supported on '{engine.dialect.name}' databases: the snapshot "
+            f"only reproduces the ordering and matching of {', '.join(COLLATIONS)}"
+        )
+    return collation
+
+
+def build_snapshot() -> None:
+    """Load the snapshot from the employees table."""
+    from app.database.connection import SessionLocal
+    from app.repositories.employee_repository import EmployeeRepository
+
+    collation = database_collation()
+    started = time.monotonic()
+    db = SessionLocal()
+    try:
+        repository = EmployeeRepository(db)
+        # Read the feed head first: changes racing with the scan are applied again by refresh
+        seq = repository.get_change_head()
+        directory_snapshot.load(repository.iter_response_rows(), seq, started, collation)
+    finally:
+        db.close()
+
+
+def refresh_snapshot() -> None:
+    """
+    Catch the snapshot up with the change feed (scheduler job). Drops
+    cached results when anything changed, so they cannot outlive the
+    snapshot's staleness bound.
+    """
+    from app.database.connection import SessionLocal
+    from app.repositories.employee_repository import EmployeeRepository
+    from app.services.cache import employee_cache, record_write
+
+    if not SNAPSHOT_ENABLED:
+        return
+    if not directory_snapshot.ready:
+        build_snapshot()
+        return
+    db = SessionLocal()
+    try:
+        repository = EmployeeRepository(db)
+        changed = 0
+        while True:
+            started = time.monotonic()
+            changes = repository.get_changes(since=directory_snapshot.seq, limit=REFRESH_BATCH_SIZE)
+            changed += directory_snapshot.apply_changes(changes, started)
+            if len(changes) < REFRESH_BATCH_SIZE:
+                break
+    finally:
+        db.close()
+    if changed:
+        record_write(employee_cache)
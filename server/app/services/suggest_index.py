@@ -0,0 +1,200 @@
+from array import array
+from bisect import bisect_left
+from dotenv import load_dotenv
+from typing import Dict, Iterable, List, Optional, Tuple
+import logging
+import os
+import sys
+import threading
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Typeahead suggestions served from memory (built at startup)
+SUGGEST_ENABLED = os.getenv("SUGGEST_ENABLED", "true").lower() == "true"
+
+
+# Name keys added by copying the key list and inserting them one by one; larger batches are merged
+_MAX_COPY_INSERTS = 16
+
+
+def _prefix_keys(text: str) -> List[str]:
+    """
+    Keys under which a name or department is indexed: the whole value and
+    every word suffix of it, so 'sha' and 'rahul sh' both find 'Rahul Sharma'.
+    """
+    words = text.lower().split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+def _merge_sorted(keys: List[str], ids: array, entries: List[Tuple[str, int]]) -> Tuple[List[str], array]:
+    """
+    Merge sorted (key, id) entries into parallel sorted keys / ids in one
+    pass: each entry's position is bisected from the previous one and the
+    runs in between are copied as slices.
+    """
+    merged_keys: List[str] = []
+    merged_ids = array("l")
+    start = 0
+    for key, employee_id in entries:
+        position = bisect_left(keys, key, start)
+        merged_keys += keys[start:position]
+        merged_ids += ids[start:position]
+        merged_keys.append(key)
+        merged_ids.append(employee_id)
+        start = position
+    merged_keys += keys[start:]
+    merged_ids += ids[start:]
+    return merged_keys, merged_ids
+
+
+class PrefixIndex:
+    """
+    In-memory typeahead index over employee names and departments.
+
+    Names are kept as a sorted list of keys with a parallel array of
+    employee ids, so a prefix lookup is a bisect followed by a short scan.
+    Departments are few and kept in a small sorted key list of their own.
+
+    Writers (serialized by the lock) build new key lists and publish them
+    with one assignment, after the employees they refer to; suggest() reads
+    the published structures without the lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (name keys, employee ids), replaced as one tuple so readers never see them out of step
+        self._names: Tuple[List[str], array] = ([], array("l"))
+        self._department_keys: List[Tuple[str, str]] = []
+        self._employees: Dict[int, Tuple[str, str]] = {}
+        # Employees added while a load is scanning the table (None when no load runs)
+        self._pending: Optional[List[Tuple[int, str, str]]] = None
+        self.ready = False
+
+    def load(self, rows: Iterable[Tuple]) -> None:
+        """
+        Rebuild the index from (id, name, department, ...) rows. Employees
+        added while the rows are read are merged into the new index before
+        it replaces the current one.
+        """
+        with self._lock:
+            if self._pending is None:
+                self._pending = []
+        employees: Dict[int, Tuple[str, str]] = {}
+        name_entries = []
+        departments = set()
+        for employee_id, name, department, *_ in rows:
+            department = sys.intern(department)
+            employees[employee_id] = (name, department)
+            name_entries.extend((key, employee_id) for key in _prefix_keys(name))
+            departments.add(department)
+        name_entries.sort()
+
+        department_keys = sorted(
+            (key, department) for department in departments for key in _prefix_keys(department)
+        )
+        names = ([key for key, _ in name_entries], array("l", (employee_id for _, employee_id in name_entries)))
+        with self._lock:
+            pending, self._pending = self._pending, None
+            self._employees = employees
+            self._names = names
+            self._department_keys = department_keys
+            self._add_many(pending)
+            self.ready = True
+        logger.info(f"Suggest index loaded: {len(employees)} employees, {len(departments)} departments")
+
+    def add(self, employee_id: int, name: str, department: str) -> None:
+        """Index a newly created employee."""
+        self.add_many([(employee_id, name, department)])
+
+    def add_many(self, rows: Iterable[Tuple]) -> None:
+        """
+        Index a batch of newly created employees from (id, name, department, ...)
+        rows (e.g. an import batch): their name keys are sorted together and
+        merged into the index in one pass, instead of one list insert per key.
+        """
+        with self._lock:
+            if self._pending is not None:
+                rows = list(rows)
+                self._pending.extend(rows)
+            self._add_many(rows)
+
+    def _add_many(self, rows: Iterable[Tuple]) -> None:
+        # Caller holds the lock
+        name_entries = []
+        departments = set()
+        for employee_id, name, department, *_ in rows:
+            if employee_id in self._employees:
+                continue
+            department = sys.intern(department)
+            self._employees[employee_id] = (name, department)
+            name_entries.extend((key, employee_id) for key in _prefix_keys(name))
+            departments.add(department)
+        if name_entries:
+            name_entries.sort()
+            name_keys, name_ids = self._names
+            if len(name_entries) <= _MAX_COPY_INSERTS:
+                # Copying and inserting a few keys beats rebuilding the lists by merge
+                name_keys, name_ids = list(name_keys), name_ids[:]
+                for key, employee_id in name_entries:
+                    position = bisect_left(name_keys, key)
+                    name_keys.insert(position, key)
+                    name_ids.insert(position, employee_id)
+                self._names = (name_keys, name_ids)
+            else:
+                self._names = _merge_sorted(name_keys, name_ids, name_entries)
+        if departments:
+            department_keys = list(self._department_keys)
+            for department in departments:
+                for key in _prefix_keys(department):
+                    entry = (key, department)
+                    position = bisect_left(department_keys, entry)
+                    if position == len(department_keys) or department_keys[position] != entry:
+                        department_keys.insert(position, entry)
+            self._department_keys = department_keys
+
+    def suggest(self, prefix: str, limit: int = 10) -> Dict[str, list]:
+        """
+        Return up to `limit` employees and departments matching `prefix`.
+        """
+        prefix = " ".join(prefix.lower().split())
+        employees = []
+        departments = []
+        if not prefix:
+            return {"employees": employees, "departments": departments}
+
+        # Published structures are never modified in place: no lock needed
+        (name_keys, name_ids), department_keys = self._names, self._department_keys
+        employees_by_id = self._employees
+        seen = set()
+        position = bisect_left(name_keys, prefix)
+        while position < len(name_keys) and len(employees) < limit:
+            if not name_keys[position].startswith(prefix):
+                break
+            employee_id = name_ids[position]
+            # Missing only if a load swapped the index in between (the employee is gone)
+            fields = employees_by_id.get(employee_id)
+            if employee_id not in seen and fields is not None:
+                seen.add(employee_id)
+                name, department = fields
+                employees.append({"id": employee_id, "name": name, "department": department})
+            position += 1
+
+        position = bisect_left(department_keys, (prefix, ""))
+        while position < len(department_keys) and len(departments) < limit:
+            key, department = department_keys[position]
+            if not key.startswith(prefix):
+                break
+            if department not in departments:
+                departments.append(department)
+            position += 1
+
+        return {"employees": employees, "departments": departments}
+
+    def stats(self) -> Dict[str, int]:
+        return {"employees": len(self._employees), "name_keys": len(self._names[0])}
+
+
+# Shared index used by the suggest endpoint and kept current by the service layer
+suggest_index = PrefixIndex()
@@ -0,0 +1,117 @@
+"""
+Load benchmark: sync (threadpool) vs async (AsyncSession) API stacks.
+
+Each stack runs in its own subprocess (USE_ASYNC_DB=false/true) and is
+driven in-process through ASGI by `--concurrency` concurrent clients for
+`--duration` seconds of mixed search / get-by-id requests. The result
+cache is disabled so every request reaches the database.
+
+Usage:
+    python -m benchmarks.async_load_benchmark --rows 50000 --concurrency 200
+    python -m benchmarks.async_load_benchmark --database-url mysql+pymysql://...
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+from benchmarks.common import sqlite_url, populate, SERVER_DIR, FIRST_NAMES, DEPARTMENTS
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def drive(concurrency: int, duration: float, rows: int) -> dict:
+    import httpx
+    from app.main import app
+
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    transport = httpx.ASGITransport(app=app)
+
+    async def client_loop(seed: int):
+        nonlocal errors
+        rng = random.Random(seed)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            while time.perf_counter() < deadline:
+                roll = rng.random()
+                if roll < 0.5:
+                    url = f"/api/v1/employees?search={rng.choice(FIRST_NAMES + DEPARTMENTS)}&limit=20"
+                elif roll < 0.7:
+                    url = "/api/v1/employees?limit=50"
+                else:
+                    url = f"/api/v1/employees/{rng.randint(1, rows)}"
+                start = time.perf_counter()
+                response = await client.get(url)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code >= 400:
+                    errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "req_per_s": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+
+def run_worker(args):
+    result = asyncio.run(drive(args.concurrency, args.duration, args.rows))
+    print(json.dumps(result))
+
+
+def run_stack(mode: str, args) -> dict:
+    env = dict(
+        os.environ,
+        DATABASE_URL=args.database_url,
+        USE_ASYNC_DB="true" if mode == "async" else "false",
+        CACHE_ENABLED="false",
+    )
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.async_load_benchmark", "--worker",
+         "--rows", str(args.rows), "--concurrency", str(args.concurrency),
+         "--duration", str(args.duration)],
+        cwd=SERVER_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--database-url", default=sqlite_url("employee_async_bench.db"))
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    os.environ["DATABASE_URL"] = args.database_url
+    print(f"Populating {args.rows} employees in {args.database_url} ...")
+    populate(args.rows)
+
+    print(f"\n{'stack':>6} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9}")
+    for mode in ("sync", "async"):
+        r = run_stack(mode, args)
+        print(f"{mode:>6} {r['requests']:>9} {r['errors']:>7} {r['req_per_s']:>9.1f} "
+              f"{r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
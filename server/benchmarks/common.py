@@ -0,0 +1,76 @@
+"""
+Shared helpers for the benchmark scripts: synthetic data and bulk loading.
+
+Benchmarks must set DATABASE_URL before importing anything from `app`,
+so app modules are only imported inside functions here.
+"""
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+from typing import Dict, Iterator
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SERVER_DIR not in sys.path:
+    sys.path.insert(0, SERVER_DIR)
+
+FIRST_NAMES = [
+    "Rahul", "Priya", "Amit", "Sneha", "Vikram", "Neha", "Rajesh", "Anita", "Karan", "Pooja",
+    "Suresh", "Deepa", "Arun", "Meera", "Rohit", "Kavita", "Sanjay", "Ritu", "Manish", "Divya",
+]
+LAST_NAMES = [
+    "Sharma", "Patel", "Kumar", "Gupta", "Singh", "Verma", "Mehta", "Desai", "Iyer", "Nair",
+    "Malhotra", "Reddy", "Joshi", "Agarwal", "Chopra", "Bhatt", "Rao", "Menon", "Kapoor", "Kulkarni",
+]
+DEPARTMENTS = ["Engineering", "Marketing", "HR", "Finance", "Sales"]
+DESIGNATIONS = ["Engineer", "Manager", "Analyst", "Executive", "Specialist", "Lead"]
+
+
+def sqlite_url(name: str) -> str:
+    """URL of a throwaway SQLite database in the temp directory."""
+    return f"sqlite:///{os.path.join(tempfile.gettempdir(), name)}"
+
+
+def generate_employees(count: int, seed: int = 42) -> Iterator[Dict]:
+    """Yield `count` deterministic synthetic employee rows."""
+    rng = random.Random(seed)
+    start = date(2015, 1, 1)
+    for i in range(count):
+        first = rng.choice(FIRST_NAMES)
+        last = rng.choice(LAST_NAMES)
+        yield {
+            "name": f"{first} {last}",
+            "email": f"{first.lower()}.{last.lower()}.{i}@example.com",
+            "department": rng.choice(DEPARTMENTS),
+            "designation": rng.choice(DESIGNATIONS),
+            "date_of_joining": start + timedelta(days=rng.randrange(3650)),
+        }
+
+
+def populate(rows: int, batch_size: int = 10000) -> None:
+    """
+    Recreate the employees table on the configured engine and bulk insert
+    `rows` synthetic employees, then rebuild the search index.
+    """
+    from app.database.connection import engine
+    from app.database.models import Base, Employee
+    from app.repositories.search_backends import configure_search_backend
+    from sqlalchemy import text
+
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS employees_fts"))
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    batch = []
+    with engine.begin() as conn:
+        for row in generate_employees(rows):
+            batch.append(row)
+            if len(batch) == batch_size:
+                conn.execute(Employee.__table__.insert(), batch)
+                batch = []
+        if batch:
+            conn.execute(Employee.__table__.insert(), batch)
+
+    configure_search_backend(engine)
@@ -0,0 +1,85 @@
+"""
+Benchmark: ranked, typo-tolerant search from the in-memory fuzzy index.
+
+Builds the index over a synthetic directory and times a top-k page for a
+mix of exact, prefix, multi-word and misspelled queries, next to the SQL
+keyword search (SEARCH_BACKEND) for the same query:
+
+  ranked: fuzzy index scoring + one by-id fetch + JSON encoding
+  sql:    search_rows() + JSON encoding (exact keyword matching, name order)
+
+The hit columns show how many results each returns; misspelled queries
+find nothing through SQL.
+
+Usage:
+    python -m benchmarks.fuzzy_benchmark --rows 100000 --limit 20
+"""
+import argparse
+import os
+import statistics
+import time
+
+from benchmarks.common import sqlite_url, populate
+
+os.environ["DATABASE_URL"] = sqlite_url("employee_fuzzy_bench.db")
+os.environ["CACHE_ENABLED"] = "false"
+os.environ["COALESCE_ENABLED"] = "false"
+
+from app.database.connection import SessionLocal  # noqa: E402
+from app.services.employee_service import EmployeeService  # noqa: E402
+from app.services.fuzzy_index import build_fuzzy_index, fuzzy_index  # noqa: E402
+from app.services.serialization import encode_rows  # noqa: E402
+
+QUERIES = [
+    "rahul sharma",
+    "rahl sharma",
+    "priya",
+    "priay",
+    "sha",
+    "engineering manager",
+    "engneering manager",
+    "marketing analyst",
+    "kulkarni",
+    "kulkarini",
+]
+
+
+def measure(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, max(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"Populating {args.rows} employees ...")
+    populate(args.rows)
+
+    start = time.perf_counter()
+    build_fuzzy_index()
+    print(f"Index built in {time.perf_counter() - start:.2f}s: {fuzzy_index.stats()}\n")
+
+    db = SessionLocal()
+    service = EmployeeService(db, cache=None)
+    print(f"{'query':<22} {'hits':>7} {'ranked p50':>11} {'max':>8} {'sql hits':>9} {'sql p50':>9}")
+    for query in QUERIES:
+        total, _, _ = fuzzy_index.search(query, args.limit)
+        p50, worst = measure(lambda: service.search_ranked_json(query, args.limit), args.iterations)
+        sql_hits = len(service.repository.search_rows(search=query, limit=args.limit))
+        sql_p50, _ = measure(
+            lambda: encode_rows(service.repository.search_rows(search=query, limit=args.limit)), args.iterations
+        )
+        print(f"{query:<22} {total:>7} {p50:>9.2f}ms {worst:>6.2f}ms {sql_hits:>9} {sql_p50:>7.2f}ms")
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
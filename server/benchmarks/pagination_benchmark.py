@@ -0,0 +1,66 @@
+"""
+Benchmark: per-page latency of OFFSET vs keyset (cursor) pagination.
+
+Creates a throwaway SQLite database with N synthetic employees, then times
+fetching pages at increasing depths with both strategies.
+
+Usage:
+    python -m benchmarks.pagination_benchmark --rows 200000 --limit 100
+"""
+import argparse
+import os
+import statistics
+import time
+
+from benchmarks.common import sqlite_url, populate
+
+os.environ["DATABASE_URL"] = sqlite_url("employee_pagination_bench.db")
+
+from app.database.connection import SessionLocal  # noqa: E402
+from app.repositories.employee_repository import EmployeeRepository  # noqa: E402
+from app.repositories.search_backends import IlikeSearchBackend  # noqa: E402
+
+
+def time_page(fn, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Populating {args.rows} employees in {os.environ['DATABASE_URL']} ...")
+    populate(args.rows)
+
+    db = SessionLocal()
+    repo = EmployeeRepository(db, IlikeSearchBackend())
+
+    # Collect the keyset of the row preceding each measured depth
+    depths = [0] + [d for d in (1000, 10000, 50000, 100000, 500000, 1000000) if d < args.rows]
+    keysets = {}
+    for depth in depths:
+        if depth:
+            row = repo.search(limit=1, offset=depth - 1)[0]
+            keysets[depth] = (row.name, row.id)
+
+    print(f"\n{'depth':>10} {'offset ms':>12} {'cursor ms':>12}")
+    for depth in depths:
+        offset_ms = time_page(lambda: repo.search(limit=args.limit, offset=depth), args.repeats)
+        after = keysets.get(depth)
+        cursor_ms = time_page(lambda: repo.search(limit=args.limit, after=after), args.repeats)
+        print(f"{depth:>10} {offset_ms:>12.2f} {cursor_ms:>12.2f}")
+        db.expunge_all()
+
+    db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark: reads served from the in-memory directory snapshot vs the database.
+
+Loads the snapshot over a synthetic directory and reports its load time and
+memory per employee (next to the same rows held as ORM objects), then
+times the service read paths with the snapshot serving and with it off:
+
+  search:  search_employees_json() for a mix of queries (first page)
+  deep:    the same at a large offset
+  facets:  get_facets()
+  by id:   get_employee_by_id() for random ids
+  refresh: applying a batch of changes from the change feed
+
+The result cache and request coalescing are off, so every call does the work.
+
+Usage:
+    python -m benchmarks.snapshot_benchmark --rows 100000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+from benchmarks.common import sqlite_url, populate
+
+os.environ["DATABASE_URL"] = sqlite_url("employee_snapshot_bench.db")
+os.environ["CACHE_ENABLED"] = "false"
+os.environ["COALESCE_ENABLED"] = "false"
+os.environ["SNAPSHOT_ENABLED"] = "true"
+
+from sqlalchemy import select  # noqa: E402
+
+from app.database.connection import SessionLocal  # noqa: E402
+from app.database.models import Employee  # noqa: E402
+from app.database.schema import migrate  # noqa: E402
+from app.repositories.employee_repository import record_changes  # noqa: E402
+from app.services import snapshot  # noqa: E402
+from app.services.employee_service import EmployeeService  # noqa: E402
+from app.services.snapshot import build_snapshot, directory_snapshot, refresh_snapshot  # noqa: E402
+
+QUERIES = ["", "sharma", "rahul sharma", "engineering", "sales kulkarni", "xyz"]
+
+
+def measure(fn, iterations):
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def orm_bytes_per_employee(sample: int = 10000) -> float:
+    """Approximate memory of Employee ORM objects (instance, state, attribute dict and values)."""
+    db = SessionLocal()
+    try:
+        employees = db.execute(select(Employee).limit(sample)).scalars().all()
+        total = 0
+        for employee in employees:
+            values = employee.__dict__
+            total += sys.getsizeof(employee) + sys.getsizeof(values) + sys.getsizeof(values["_sa_instance_state"])
+            total += sum(sys.getsizeof(value) for key, value in values.items() if key != "_sa_instance_state")
+        return total / len(employees)
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--changes", type=int, default=100)
+    args = parser.parse_args()
+
+    print(f"Populating {args.rows} employees ...")
+    populate(args.rows)
+    migrate()
+
+    # No refresh job runs here and nothing else writes: keep the snapshot serving throughout
+    directory_snapshot.max_staleness = float("inf")
+    start = time.perf_counter()
+    build_snapshot()
+    stats = directory_snapshot.stats()
+    print(f"Snapshot loaded in {time.perf_counter() - start:.2f}s: {stats['employees']} employees, "
+          f"{stats['bytes'] / 2**20:.1f} MiB, {stats['bytes_per_employee']:.0f} bytes/employee "
+          f"(ORM objects: {orm_bytes_per_employee():.0f} bytes/employee)\n")
+
+    db = SessionLocal()
+    service = EmployeeService(db, cache=None)
+    rng = random.Random(7)
+    id_iter = iter(rng.sample(range(1, args.rows + 1), args.iterations * 2))
+
+    print(f"{'read':<24} {'snapshot p50':>13} {'database p50':>13}")
+    for query in QUERIES:
+        for label, offset in (("search", 0), ("deep", args.rows // 10)):
+            results = []
+            for enabled in (True, False):
+                snapshot.SNAPSHOT_ENABLED = enabled
+                results.append(measure(lambda: service.search_employees_json(query, 20, offset), args.iterations))
+            print(f"{label + ' ' + repr(query):<24} {results[0]:>11.2f}ms {results[1]:>11.2f}ms")
+    for label, fn in (
+        ("facets ''", lambda: service.get_facets("")),
+        ("facets 'sharma'", lambda: service.get_facets("sharma")),
+        ("by id", lambda: service.get_employee_by_id(next(id_iter))),
+    ):
+        results = []
+        for enabled in (True, False):
+            snapshot.SNAPSHOT_ENABLED = enabled
+            results.append(measure(fn, args.iterations))
+        print(f"{label:<24} {results[0]:>11.2f}ms {results[1]:>11.2f}ms")
+    db.close()
+
+    # Incremental refresh: touch employees and record them in the change feed
+    db = SessionLocal()
+    changed = rng.sample(range(1, args.rows + 1), args.changes)
+    for employee in db.execute(select(Employee).where(Employee.id.in_(changed))).scalars():
+        employee.designation = "Director"
+    record_changes(db, changed, "update")
+    db.commit()
+    db.close()
+    start = time.perf_counter()
+    refresh_snapshot()
+    print(f"\nRefresh of {len(changed)} changes: {(time.perf_counter() - start) * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: worker cold start, from process start to the first answered request.
+
+Starts `uvicorn app.main:app` in a fresh process for each run and polls
+until a search request returns 200, reporting:
+
+  import:         time to import app.main (measured in its own process)
+  first response: process start -> first 200 from /api/v1/employees?search=...
+                  (interpreter start, import, lifespan: schema step, pool
+                  warm-up and index builds, then the request itself)
+
+for SCHEMA_AUTO_CREATE=true (tables and full-text index checked/created on
+every start) and SCHEMA_AUTO_CREATE=false (schema applied once by migrate.py).
+`--unreachable-url` also times the import against a database that never
+answers, which must not block.
+
+Usage:
+    python -m benchmarks.startup_benchmark --rows 100000 --runs 5
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+from benchmarks.common import SERVER_DIR, sqlite_url, populate
+
+DATABASE_URL = sqlite_url("employee_startup_bench.db")
+os.environ["DATABASE_URL"] = DATABASE_URL
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_import(env: dict) -> float:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_SNIPPET], cwd=SERVER_DIR, env=env,
+        capture_output=True, text=True, check=True, timeout=120
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def time_first_response(env: dict, timeout: float = 120) -> float:
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/v1/employees?search=sharma"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=SERVER_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        with httpx.Client(timeout=5) as client:
+            while time.perf_counter() - start < timeout:
+                try:
+                    if client.get(url).status_code == 200:
+                        return time.perf_counter() - start
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+        raise RuntimeError("server did not answer in time")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--unreachable-url", default=None,
+        help="Database URL that never answers (e.g. mysql+pymysql://u:p@10.255.255.1/db) to time the import against"
+    )
+    args = parser.parse_args()
+
+    print(f"Populating {args.rows} employees ...")
+    populate(args.rows)
+
+    env = {**os.environ, "DATABASE_URL": DATABASE_URL, "RELOAD": "false", "METRICS_ENABLED": "true"}
+    print(f"\n{'mode':<26} {'import p50':>11} {'first response p50':>19} {'max':>8}")
+    for auto_create in ("true", "false"):
+        mode_env = {**env, "SCHEMA_AUTO_CREATE": auto_create}
+        imports = [time_import(mode_env) for _ in range(args.runs)]
+        firsts = [time_first_response(mode_env) for _ in range(args.runs)]
+        print(
+            f"{'SCHEMA_AUTO_CREATE=' + auto_create:<26} {statistics.median(imports) * 1000:>9.0f}ms "
+            f"{statistics.median(firsts) * 1000:>17.0f}ms {max(firsts) * 1000:>6.0f}ms"
+        )
+
+    if args.unreachable_url:
+        unreachable = time_import({**env, "DATABASE_URL": args.unreachable_url})
+        print(f"{'unreachable database':<26} {unreachable * 1000:>9.0f}ms {'(import only)':>19}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+Create the database schema: the employees table and the full-text search index.
+Run this once per deploy (before starting workers with SCHEMA_AUTO_CREATE=false).
+
+On MySQL the FULLTEXT index is created with innodb_ft_enable_stopword=OFF,
+so keywords containing stopwords ("the", "is", "de", ...) are not missed.
+An index created with stopwords (before this was the case) keeps them:
+drop it and run this script again to rebuild it:
+
+    ALTER TABLE employees DROP INDEX ft_name_department;
+"""
+import logging
+
+from app.database.schema import migrate
+
+logging.basicConfig(level=logging.INFO)
+
+if __name__ == "__main__":
+    migrate()
+    print("Database schema is up to date")
@@ -4,10 +4,16 @@ import os
 
 load_dotenv()
 
+# RELOAD: restart on code changes (development only)
+# WORKERS: worker processes; more than one always runs without reload
+RELOAD = os.getenv("RELOAD", "true").lower() == "true"
+WORKERS = int(os.getenv("WORKERS", 1))
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
         host=os.getenv("HOST", "0.0.0.0"),
         port=int(os.getenv("PORT", 8000)),
-        reload=True  # Enable auto-reload during development
+        reload=RELOAD and WORKERS == 1,
+        workers=WORKERS
     )
@@ -5,6 +5,8 @@ Run this after setting up the database.
 from datetime import date
 from app.database.connection import SessionLocal, engine
 from app.database.models import Base, Employee
+from app.repositories.search_backends import configure_search_backend
+from app.services.employee_service import EmployeeService
 
 # Sample employee data
 SAMPLE_EMPLOYEES = [
@@ -65,6 +67,7 @@ def seed_database():
     """Seed the database with sample employees."""
     # Create tables if they don't exist
     Base.metadata.create_all(bind=engine)
+    search_backend = configure_search_backend(engine)
     
     db = SessionLocal()
     try:
@@ -75,13 +78,15 @@ def seed_database():
             db.query(Employee).delete()
             db.commit()
         
-        # Insert sample employees
-        for emp_data in SAMPLE_EMPLOYEES:
-            employee = Employee(**emp_data)
-            db.add(employee)
-        
+        # Insert sample employees in batches through the bulk import path
+        report = EmployeeService(db).import_employees(SAMPLE_EMPLOYEES)
+        for error in report.errors:
+            print(f"Row {error.row} skipped: {error.error}")
+
+        # Deleted rows bypass index sync, so rebuild the search index
+        search_backend.rebuild(db)
         db.commit()
-        print(f"Successfully seeded {len(SAMPLE_EMPLOYEES)} employees!")
+        print(f"Successfully seeded {report.inserted} employees!")
         
     except Exception as e:
         db.rollback()
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+
+from app.services.bulk_import import RecordParseError, iter_records
+
+
+async def chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def records(data: bytes, fmt: str = "csv", size: int = 3):
+    async def collect():
+        return [record async for record in iter_records(chunks(data, size), fmt)]
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("size", [1, 3, 1000])
+def test_csv_quoted_fields_span_lines(size):
+    data = b'name,designation\r\n"Doe, Jane","Lead\r\n\r\n""Platform"""\r\n\r\nBob,Engineer\r\n'
+    assert records(data, size=size) == [
+        {"name": "Doe, Jane", "designation": 'Lead\n\n"Platform"'},
+        {"name": "Bob", "designation": "Engineer"},
+    ]
+
+
+def test_csv_stray_quotes_are_literal():
+    data = b'name,designation\nAl "Ace" Smith,Engineer\nO"Brien,Lead\nBob,Manager\nE"ve,Analyst\n'
+    assert [record["name"] for record in records(data)] == ['Al "Ace" Smith', 'O"Brien', "Bob", 'E"ve']
+
+
+def test_csv_parse_errors_do_not_abort_the_import():
+    result = records(b'name,designation\nAmy\nBob,Engineer\nCal,"unterminated\n')
+    assert isinstance(result[0], RecordParseError)
+    assert result[1] == {"name": "Bob", "designation": "Engineer"}
+    assert isinstance(result[2], RecordParseError)
+
+
+def test_ndjson_skips_blank_lines():
+    result = records(b'{"name": "Amy"}\n\n[1]\n{"name": "Bob"}', fmt="ndjson")
+    assert result[0] == {"name": "Amy"} and result[2] == {"name": "Bob"}
+    assert isinstance(result[1], RecordParseError)
@@ -0,0 +1,127 @@
+from datetime import date
+import time
+
+import pytest
+
+from app.database.connection import SessionLocal
+from app.database.schema import migrate
+from app.schemas.employee import EmployeeCreate
+from app.services import snapshot
+from app.services.cache import RedisInvalidation, TTLCache
+from app.services.employee_service import EmployeeService
+
+
+class FakeRedis:
+    """The GET / INCRBY subset of a Redis server RedisInvalidation uses; `down` makes calls fail."""
+
+    def __init__(self):
+        self.values = {}
+        self.down = False
+
+    def _check(self):
+        if self.down:
+            raise ConnectionError("Redis is down")
+
+    def get(self, key):
+        self._check()
+        return self.values.get(key)
+
+    def incr(self, key, amount=1):
+        self._check()
+        self.values[key] = int(self.values.get(key, 0)) + amount
+        return self.values[key]
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def server():
+    return FakeRedis()
+
+
+def invalidation(server):
+    return RedisInvalidation("redis://fake", sync_interval=0.01, client=server)
+
+
+def test_write_in_one_worker_invalidates_the_others(server):
+    writer, reader = invalidation(server), invalidation(server)
+    cache = TTLCache(invalidation=reader)
+    wait_for(lambda: server.values.get(RedisInvalidation.key) is None and reader._remote == 0)
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+
+    writer.bump()
+    wait_for(lambda: cache.get("key") is None)
+    assert server.values[RedisInvalidation.key] == 1
+
+
+def test_own_writes_invalidate_immediately(server):
+    cache = TTLCache(invalidation=invalidation(server))
+    cache.set("key", "value")
+    cache.invalidation.bump()
+    assert cache.get("key") is None
+
+
+def test_redis_errors_invalidate_locally(server):
+    reader = invalidation(server)
+    wait_for(lambda: reader._remote == 0)
+    server.down = True
+    generation = reader.generation()
+    # Reads never touch Redis, so they do not fail; the sync thread drops the cache instead
+    wait_for(lambda: reader.generation() > generation)
+
+    cache = TTLCache(invalidation=reader)
+    cache.set("key", "value")
+    server.down = False
+    # Writes published while Redis was unreachable are picked up once it is back
+    server.values[RedisInvalidation.key] = 5
+    wait_for(lambda: reader._remote == 5)
+    assert cache.get("key") is None
+
+
+@pytest.fixture
+def services(monkeypatch):
+    """Writer and reader services sharing one result cache, reading the database (no snapshot)."""
+    monkeypatch.setattr(snapshot, "SNAPSHOT_ENABLED", False)
+    migrate()
+    cache = TTLCache()
+    writer, reader = SessionLocal(), SessionLocal()
+    yield EmployeeService(writer, cache), EmployeeService(reader, cache)
+    writer.close()
+    reader.close()
+
+
+def cached_search(service, search):
+    body, _ = service.search_employees_json(search)
+    # Served from the cache the second time
+    hits = service.cache.hits
+    assert service.search_employees_json(search)[0] == body and service.cache.hits == hits + 1
+    return body
+
+
+def test_create_employee_invalidates_cached_results(services):
+    writer, reader = services
+    assert cached_search(reader, "cachecreate") == b"[]"
+    writer.create_employee(EmployeeCreate(
+        name="Cachecreate Lin", email="cachecreate@example.com", department="Sales",
+        designation="Engineer", date_of_joining=date(2021, 1, 1),
+    ))
+    assert b"cachecreate@example.com" in cached_search(reader, "cachecreate")
+
+
+def test_import_batch_invalidates_cached_results(services):
+    writer, reader = services
+    assert cached_search(reader, "cacheimport") == b"[]"
+    report = writer.import_batch([
+        (row, {"name": f"Cacheimport {row}", "email": f"cacheimport{row}@example.com", "department": "Sales",
+               "designation": "Engineer", "date_of_joining": "2021-01-01"})
+        for row in (1, 2)
+    ])
+    assert report.inserted == 2
+    body = cached_search(reader, "cacheimport")
+    assert b"cacheimport1@example.com" in body and b"cacheimport2@example.com" in body
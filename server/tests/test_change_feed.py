@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.database.connection import SessionLocal
+from app.database.schema import migrate
+from app.main import app
+from app.repositories.employee_repository import EmployeeRepository
+from app.services import change_feed
+
+URL = "/api/v1/employees"
+
+
+@pytest.fixture(scope="module")
+def client():
+    migrate()
+    return TestClient(app)
+
+
+def head() -> int:
+    db = SessionLocal()
+    try:
+        return EmployeeRepository(db).get_change_head()
+    finally:
+        db.close()
+
+
+def create(client, name: str) -> int:
+    response = client.post(URL, json={
+        "name": name, "email": f"{name.lower().replace(' ', '.')}@example.com", "department": "Sales",
+        "designation": "Engineer", "date_of_joining": "2021-01-01",
+    })
+    assert response.status_code == 201
+    return response.json()["id"]
+
+
+def changes(client, **params):
+    response = client.get(f"{URL}/changes", params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_changes_come_in_commit_order(client):
+    since = head()
+    ids = [create(client, f"Feed Order{i}") for i in range(3)]
+    feed = changes(client, since=since)
+    assert [entry["employee_id"] for entry in feed["changes"]] == ids
+    seqs = [entry["seq"] for entry in feed["changes"]]
+    assert seqs == sorted(seqs) and seqs[0] > since and feed["next_since"] == seqs[-1]
+    assert all(entry["operation"] == "create" for entry in feed["changes"])
+    assert feed["changes"][0]["employee"]["name"] == "Feed Order0"
+
+
+def test_since_returns_only_later_changes(client):
+    since = head()
+    ids = [create(client, f"Feed Since{i}") for i in range(3)]
+    first = changes(client, since=since)["changes"][0]
+    # Exclusive: the entry at `since` itself is not repeated
+    assert [entry["employee_id"] for entry in changes(client, since=first["seq"])["changes"]] == ids[1:]
+    # Caught up: nothing new, and next_since stays put
+    latest = head()
+    assert changes(client, since=latest) == {"changes": [], "next_since": latest}
+
+
+def test_limit_pages_through_next_since(client):
+    since = head()
+    ids = [create(client, f"Feed Page{i}") for i in range(3)]
+    seen = []
+    while True:
+        feed = changes(client, since=since, limit=1)
+        if not feed["changes"]:
+            break
+        assert len(feed["changes"]) == 1
+        seen.append(feed["changes"][0]["employee_id"])
+        since = feed["next_since"]
+    assert seen == ids
+
+
+def test_long_poll_wakes_on_create(client, monkeypatch):
+    # Only a notification from the write can end the wait early
+    monkeypatch.setattr(change_feed, "CHANGE_FEED_POLL_SECONDS", 30)
+    since = head()
+    result = {}
+
+    def poll():
+        started = time.monotonic()
+        result["feed"] = changes(client, since=since, wait=20)
+        result["seconds"] = time.monotonic() - started
+
+    poller = threading.Thread(target=poll)
+    poller.start()
+    time.sleep(0.3)
+    assert poller.is_alive()
+    employee_id = create(client, "Feed Wakeup")
+    poller.join(10)
+    assert not poller.is_alive()
+    assert [entry["employee_id"] for entry in result["feed"]["changes"]] == [employee_id]
+    assert result["seconds"] < 5
+
+
+def test_long_poll_times_out_empty(client):
+    latest = head()
+    started = time.monotonic()
+    assert changes(client, since=latest, wait=0.2) == {"changes": [], "next_since": latest}
+    assert time.monotonic() - started >= 0.2
@@ -0,0 +1,124 @@
+import base64
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from app.database.connection import SessionLocal
+from app.database.models import Employee
+from app.database.schema import migrate
+from app.main import app
+from app.schemas.employee import EmployeeCreate
+from app.services import snapshot
+from app.services.cache import employee_cache, record_write
+from app.services.employee_service import EmployeeService
+from app.services.pagination import encode_cursor
+
+# Every employee of this module matches "pagetest"; duplicate names force the id tie-break
+NAMES = ["Pagetest Adams"] * 3 + ["Pagetest Baker"] + ["Pagetest Clark"] * 4 + ["Pagetest Davis"]
+URL = "/api/v1/employees"
+
+
+def create_employees(names, prefix):
+    writer = SessionLocal()
+    service = EmployeeService(writer, cache=None)
+    for i, name in enumerate(names):
+        service.create_employee(EmployeeCreate(
+            name=name, email=f"{prefix}{i}@example.com", department="Sales",
+            designation="Engineer", date_of_joining=date(2020, 1, 1),
+        ))
+    writer.close()
+    record_write(employee_cache)
+
+
+@pytest.fixture(scope="module")
+def client():
+    migrate()
+    create_employees(NAMES, "pagetest")
+    # Read the database, not a snapshot loaded by another test module
+    with pytest.MonkeyPatch.context() as patch:
+        patch.setattr(snapshot, "SNAPSHOT_ENABLED", False)
+        yield TestClient(app)
+
+
+def page(client, search="pagetest", **params):
+    response = client.get(URL, params={"search": search, **params})
+    assert response.status_code == 200
+    return response.json(), response.headers.get("X-Next-Cursor")
+
+
+def keyset(employees):
+    return [(employee["name"], employee["id"]) for employee in employees]
+
+
+def walk(client, limit):
+    """Every page of the search, following X-Next-Cursor."""
+    pages, cursor = [], None
+    while True:
+        employees, cursor = page(client, limit=limit, **({"cursor": cursor} if cursor else {}))
+        pages.append(employees)
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 4, 9, 10])
+def test_cursor_pages_cover_duplicate_names_once(client, limit):
+    everything, _ = page(client, limit=100)
+    assert [employee["name"] for employee in everything] == NAMES
+    assert keyset(everything) == sorted(keyset(everything))
+    pages = walk(client, limit)
+    assert keyset([employee for employees in pages for employee in employees]) == keyset(everything)
+    assert all(len(employees) == limit for employees in pages[:-1])
+
+
+def test_last_page_has_no_next_cursor(client):
+    # A full last page still points at an (empty) next page; a short one does not
+    employees, cursor = page(client, limit=len(NAMES))
+    assert len(employees) == len(NAMES) and cursor is not None
+    assert page(client, limit=len(NAMES), cursor=cursor) == ([], None)
+    employees, cursor = page(client, limit=len(NAMES) + 1)
+    assert len(employees) == len(NAMES) and cursor is None
+
+
+def test_cursor_of_a_deleted_row_resumes_after_it(client):
+    create_employees(["Cursorgone Lee"] * 3 + ["Cursorgone Moss"], "cursorgone")
+    everything, _ = page(client, search="cursorgone", limit=100)
+    first, cursor = page(client, search="cursorgone", limit=2)
+    db = SessionLocal()
+    db.execute(delete(Employee).where(Employee.id == first[-1]["id"]))
+    db.commit()
+    db.close()
+    record_write(employee_cache)
+    rest, cursor = page(client, search="cursorgone", limit=100, cursor=cursor)
+    assert keyset(rest) == keyset(everything[2:]) and cursor is None
+
+
+def b64(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor!",
+    "%%%%",
+    b64(b"not json"),
+    b64(b'{"name": "Pagetest Adams", "id": 1}'),
+    b64(b'["Pagetest Adams"]'),
+    b64(b'["Pagetest Adams", "1"]'),
+    b64(b'[1, 2]'),
+    b64(b'["Pagetest Adams", 1, 2]'),
+    b64("ÿ".encode("latin-1")),
+    encode_cursor("Pagetest Adams", 1)[:-2],
+])
+def test_malformed_cursor_is_rejected(client, cursor):
+    response = client.get(URL, params={"search": "pagetest", "cursor": cursor})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid pagination cursor"
+
+
+def test_tampered_cursor_is_only_a_position(client):
+    # A well-formed cursor names a place in the (name, id) order, not a row: one
+    # pointing past every match returns an empty page rather than an error
+    assert page(client, cursor=encode_cursor("Pagetest Zzz", 0)) == ([], None)
+    employees, _ = page(client, cursor=encode_cursor("Pagetest Baker", -1))
+    assert employees[0]["name"] == "Pagetest Baker"
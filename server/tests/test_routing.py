@@ -0,0 +1,132 @@
+import os
+import tempfile
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, delete, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database import connection
+from app.database.connection import Base, engine as primary
+from app.database.models import Employee
+from app.database.routing import PIN_COOKIE, ReplicaSet, RoutingSession
+from app.database.schema import migrate
+from app.main import app
+from app.repositories.search_backends import SQLiteFTSSearchBackend
+from app.routers import employee_router
+from app.services import snapshot
+from app.services.cache import employee_cache, record_write
+
+URL = "/api/v1/employees"
+# An id far above the primary's: the row exists on the replicas only
+REPLICA_ONLY_ID = 900001
+
+
+def replica_engine(path: str):
+    """A SQLite file with the primary's schema and one row of its own, standing in for a lagging replica."""
+    replica = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=replica)
+    SQLiteFTSSearchBackend().ensure_index(replica)
+    with replica.begin() as conn:
+        conn.execute(insert(Employee).values(
+            id=REPLICA_ONLY_ID, name="Replica Only", email="replica-only@example.com",
+            department="Sales", designation="Engineer", date_of_joining=date(2020, 1, 1),
+        ))
+    return replica
+
+
+def route_reads(monkeypatch, replica_set: ReplicaSet):
+    """Make read-only routes use `replica_set`, as DATABASE_READ_URL would; returns their session factory."""
+    read_sessions = sessionmaker(
+        autocommit=False, autoflush=False, bind=primary, class_=RoutingSession, replicas=replica_set
+    )
+    monkeypatch.setattr(connection, "ReadSessionLocal", read_sessions)
+    monkeypatch.setattr(employee_router, "replicas", replica_set)
+    return read_sessions
+
+
+@pytest.fixture
+def replicas(monkeypatch):
+    migrate()
+    directory = tempfile.mkdtemp()
+    engines = [replica_engine(os.path.join(directory, f"replica_{i}.db")) for i in range(2)]
+    replica_set = ReplicaSet(engines)
+    read_sessions = route_reads(monkeypatch, replica_set)
+    # Reads must hit the databases, not the snapshot or results cached by earlier tests
+    monkeypatch.setattr(snapshot, "SNAPSHOT_ENABLED", False)
+    record_write(employee_cache)
+    yield replica_set, read_sessions
+    for replica in engines:
+        replica.dispose()
+
+
+def served_by(session) -> str:
+    return session.get_bind(clause=select(Employee.id)).url.database
+
+
+def test_reads_go_to_replicas_round_robin(replicas):
+    replica_set, read_sessions = replicas
+    used = []
+    for _ in range(4):
+        session = read_sessions()
+        assert session.execute(select(Employee.name).where(Employee.id == REPLICA_ONLY_ID)).scalar() == "Replica Only"
+        used.append(served_by(session))
+        # The replica is chosen once per session
+        assert served_by(session) == used[-1]
+        session.close()
+    assert set(used) == {bind.url.database for bind in replica_set.healthy()}
+
+
+def test_writes_go_to_primary(replicas):
+    _, read_sessions = replicas
+    session = read_sessions()
+    session.add(Employee(
+        name="Routing Write", email="routing-write@example.com", department="Sales",
+        designation="Engineer", date_of_joining=date(2020, 1, 1),
+    ))
+    session.commit()
+    employee_id = session.execute(
+        select(Employee.id).where(Employee.email == "routing-write@example.com")
+    ).scalar()
+    session.close()
+    # The new row is on the primary only; reads through the replicas do not see it
+    with primary.begin() as conn:
+        assert conn.execute(delete(Employee).where(Employee.email == "routing-write@example.com")).rowcount == 1
+    assert employee_id is None
+
+
+def test_read_your_writes_cookie_pins_reads_to_primary(replicas):
+    client = TestClient(app)
+    assert client.get(f"{URL}/{REPLICA_ONLY_ID}").status_code == 200
+
+    response = client.post(URL, json={
+        "name": "Routing Cookie", "email": "routing-cookie@example.com", "department": "Sales",
+        "designation": "Engineer", "date_of_joining": "2020-01-01",
+    })
+    assert response.status_code == 201 and PIN_COOKIE in response.cookies
+    employee_id = response.json()["id"]
+    # The writer reads its own write from the primary (the replica-only row is not there)...
+    assert client.get(f"{URL}/{employee_id}").status_code == 200
+    assert client.get(f"{URL}/{REPLICA_ONLY_ID}").status_code == 404
+    # ...while other clients still read the lagging replicas
+    other = TestClient(app)
+    assert other.get(f"{URL}/{employee_id}").status_code == 404
+    assert other.get(f"{URL}/{REPLICA_ONLY_ID}").status_code == 200
+
+
+def test_failed_replica_is_ejected_and_reads_fall_back_to_primary(replicas, monkeypatch):
+    # The file's directory does not exist: connecting fails
+    broken = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'missing', 'replica.db')}")
+    replica_set = ReplicaSet([broken])
+    read_sessions = route_reads(monkeypatch, replica_set)
+    client = TestClient(app)
+
+    # The read that finds the replica down fails; the replica leaves rotation
+    assert client.get(f"{URL}/{REPLICA_ONLY_ID}").status_code == 503
+    assert replica_set.healthy() == []
+    # Following reads use the primary
+    assert client.get(f"{URL}/{REPLICA_ONLY_ID}").status_code == 404
+    session = read_sessions()
+    assert served_by(session) == primary.url.database
+    session.close()
@@ -0,0 +1,41 @@
+from datetime import date
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database.models import Employee
+from app.repositories.employee_repository import EmployeeRepository
+from app.repositories.search_backends import IlikeSearchBackend, MySQLFullTextSearchBackend
+
+# Names and departments full of InnoDB default stopwords ("the", "is", "de", "la", "for", "on", ...)
+EMPLOYEES = [
+    ("Theodore Aston", "Finance"), ("Isabel Ortiz", "Forensics"), ("Dewan Singh", "Onboarding"),
+    ("Laila Fortune", "Sales"), ("Ian Wasabi", "Research and Development"), ("Anita De La Cruz", "Legal"),
+    ("Bob Atwood", "Information Technology"), ("Will Whoever", "Operations"), ("Ana Com", "Marketing"),
+]
+KEYWORDS = [
+    "the", "is", "de", "la", "for", "on", "as", "at", "an", "it", "in", "to", "was", "who", "will", "com",
+    "and", "ort", "wan", "theo", "de la", "sales la", "aston", "z",
+]
+
+
+@pytest.fixture(scope="module")
+def mysql_db(mysql_engine):
+    session = sessionmaker(bind=mysql_engine)()
+    session.execute(insert(Employee), [
+        dict(id=i + 1, name=name, email=f"employee{i}@example.com", department=department,
+             designation="Engineer", date_of_joining=date(2020, 1, 1))
+        for i, (name, department) in enumerate(EMPLOYEES)
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.mark.parametrize("search", KEYWORDS)
+def test_fulltext_matches_ilike(mysql_db, search):
+    ilike = EmployeeRepository(mysql_db, IlikeSearchBackend()).search_rows(search, 50, 0)
+    fulltext = EmployeeRepository(mysql_db, MySQLFullTextSearchBackend()).search_rows(search, 50, 0)
+    assert ilike, "keyword matches no employee"
+    assert [tuple(row) for row in fulltext] == [tuple(row) for row in ilike]
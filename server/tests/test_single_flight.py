@@ -0,0 +1,201 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from app.database.connection import SessionLocal, engine, get_async_database_url
+from app.database.routing import pin_to_primary
+from app.database.schema import migrate
+from app.repositories.async_employee_repository import AsyncEmployeeRepository
+from app.repositories.employee_repository import EmployeeRepository
+from app.services import snapshot
+from app.services.async_employee_service import AsyncEmployeeService
+from app.services.employee_service import EmployeeService
+from app.services.single_flight import AsyncSingleFlight, SingleFlight
+
+CALLERS = 5
+
+
+def run_together(fn, callers=CALLERS):
+    """Call fn from `callers` threads at once; returns the results or exceptions."""
+    with ThreadPoolExecutor(callers) as pool:
+        futures = [pool.submit(fn) for _ in range(callers)]
+        return [future.exception() or future.result() for future in futures]
+
+
+class SlowCall:
+    """A call that counts its runs and holds on until released, so callers overlap."""
+
+    def __init__(self, result="result"):
+        self.result = result
+        self.calls = 0
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.release.wait(2)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+def release_after(call: SlowCall, delay: float = 0.1):
+    threading.Timer(delay, call.release.set).start()
+
+
+def test_identical_calls_run_once():
+    flights, call = SingleFlight(enabled=True), SlowCall()
+    release_after(call)
+    assert run_together(lambda: flights.do("search", "key", call)) == ["result"] * CALLERS
+    assert call.calls == 1
+    assert flights.counters.stats() == {"leaders": 1, "coalesced": CALLERS - 1}
+
+
+def test_leader_exception_reaches_every_waiter():
+    error = ValueError("query failed")
+    flights, call = SingleFlight(enabled=True), SlowCall(error)
+    release_after(call)
+    assert run_together(lambda: flights.do("search", "key", call)) == [error] * CALLERS
+    assert call.calls == 1
+    # The failed call is not remembered
+    assert flights.do("search", "key", lambda: "retried") == "retried"
+
+
+def test_waiter_runs_its_own_call_after_wait_seconds():
+    flights, call = SingleFlight(enabled=True, wait_seconds=0.05), SlowCall("slow")
+    leader = threading.Thread(target=flights.do, args=("search", "key", call))
+    leader.start()
+    time.sleep(0.01)
+    assert flights.do("search", "key", lambda: "own") == "own"
+    call.release.set()
+    leader.join()
+
+
+async def slow_async(calls, result="result", delay=0.05):
+    calls.append(1)
+    await asyncio.sleep(delay)
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def test_async_identical_calls_run_once():
+    async def main():
+        flights, calls = AsyncSingleFlight(enabled=True), []
+        results = await asyncio.gather(*(flights.do("search", "key", lambda: slow_async(calls)) for _ in range(CALLERS)))
+        assert results == ["result"] * CALLERS and len(calls) == 1
+
+    asyncio.run(main())
+
+
+def test_async_leader_exception_reaches_every_waiter():
+    async def main():
+        flights, calls, error = AsyncSingleFlight(enabled=True), [], ValueError("query failed")
+        results = await asyncio.gather(
+            *(flights.do("search", "key", lambda: slow_async(calls, error)) for _ in range(CALLERS)),
+            return_exceptions=True,
+        )
+        assert results == [error] * CALLERS and len(calls) == 1
+
+    asyncio.run(main())
+
+
+def test_async_cancelled_leader_does_not_cancel_waiters():
+    async def main():
+        flights, calls = AsyncSingleFlight(enabled=True), []
+        leader = asyncio.create_task(flights.do("search", "key", lambda: slow_async(calls)))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(flights.do("search", "key", lambda: slow_async(calls))) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        # One waiter takes over the call; the others share it
+        assert await asyncio.gather(*waiters) == ["result"] * 3
+        assert leader.cancelled() and len(calls) == 2
+
+    asyncio.run(main())
+
+
+def test_async_cancelled_waiter_does_not_cancel_leader():
+    async def main():
+        flights, calls = AsyncSingleFlight(enabled=True), []
+        leader = asyncio.create_task(flights.do("search", "key", lambda: slow_async(calls)))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.create_task(flights.do("search", "key", lambda: slow_async(calls)))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        assert await leader == "result"
+        assert waiter.cancelled() and len(calls) == 1
+
+    asyncio.run(main())
+
+
+@pytest.fixture
+def slow_search(monkeypatch):
+    """Count repository searches, each held until released; reads go to the database, uncached."""
+    migrate()
+    monkeypatch.setattr(snapshot, "SNAPSHOT_ENABLED", False)
+    call = SlowCall()
+    search_rows = EmployeeRepository.search_rows
+
+    def counted(repository, *args, **kwargs):
+        call()
+        return search_rows(repository, *args, **kwargs)
+
+    monkeypatch.setattr(EmployeeRepository, "search_rows", counted)
+    return call
+
+
+def search(pinned: bool):
+    db = SessionLocal()
+    try:
+        if pinned:
+            pin_to_primary(db)
+        return EmployeeService(db, cache=None).search_employees_json("coalesce")
+    finally:
+        db.close()
+
+
+def test_concurrent_identical_searches_run_one_query(slow_search):
+    release_after(slow_search)
+    results = run_together(lambda: search(pinned=False))
+    assert results == [results[0]] * CALLERS and slow_search.calls == 1
+
+
+def test_pinned_sessions_bypass_coalescing(slow_search):
+    # Pinned readers (read-your-writes) must each see the primary now, not a shared older result
+    release_after(slow_search)
+    results = run_together(lambda: search(pinned=True))
+    assert results == [results[0]] * CALLERS and slow_search.calls == CALLERS
+
+
+@pytest.mark.parametrize("pinned, queries", [(False, 1), (True, CALLERS)])
+def test_async_pinned_sessions_bypass_coalescing(monkeypatch, pinned, queries):
+    migrate()
+    monkeypatch.setattr(snapshot, "SNAPSHOT_ENABLED", False)
+    calls = []
+    get_by_id = AsyncEmployeeRepository.get_by_id
+
+    async def counted(repository, employee_id):
+        await slow_async(calls)
+        return await get_by_id(repository, employee_id)
+
+    monkeypatch.setattr(AsyncEmployeeRepository, "get_by_id", counted)
+
+    async def main():
+        async_engine = create_async_engine(get_async_database_url(engine.url.render_as_string()))
+        sessions = [AsyncSession(async_engine) for _ in range(CALLERS)]
+        for db in sessions:
+            if pinned:
+                pin_to_primary(db)
+        try:
+            await asyncio.gather(*(AsyncEmployeeService(db, cache=None).get_employee_by_id(1) for db in sessions))
+        finally:
+            for db in sessions:
+                await db.close()
+            await async_engine.dispose()
+
+    asyncio.run(main())
+    assert len(calls) == queries
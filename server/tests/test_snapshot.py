@@ -0,0 +1,203 @@
+from datetime import date
+from types import SimpleNamespace
+import time
+
+import pytest
+from sqlalchemy import insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database.connection import SessionLocal
+from app.database.models import Employee
+from app.database.routing import pin_to_primary
+from app.database.schema import migrate
+from app.repositories.employee_repository import EmployeeRepository
+from app.repositories.search_backends import IlikeSearchBackend, MySQLFullTextSearchBackend
+from app.schemas.employee import EmployeeCreate
+from app.services.employee_service import EmployeeService
+from app.services.snapshot import (
+    COLLATIONS, DirectorySnapshot, build_snapshot, database_collation, directory_snapshot, snapshot_reads
+)
+
+NAMES = [
+    "Élodie Martin", "élodie martin", "Elodie MARTIN", "eLODIE martin", "Zoë Kulkarni", "ZOË KULKARNI",
+    "Zoe Kulkarni", "zoe kulkarni", "Ángel Núñez", "angel nunez", "ANGEL NUNEZ", "Øyvind Ødegård",
+    "oyvind odegard", "Ingrid Ström", "ingrid strom", "İlker Işık", "ilker isik", "Straße Weiß",
+    "strasse weiss", "Aaron Ng", "aaron ng", "ÆSIR ÅSE", "zed", "Zed", "ZED",
+]
+DEPARTMENTS = ["Engineering", "ingénierie", "R&D", "Sales", "SALES", "Qualité"]
+
+ASCII_QUERIES = [
+    None, "", "e", "E", "i", "is", "el", "ELO", "martin", "MARTIN elodie", "zo", "kulkarni zoe", "ang", "nunez",
+    "ng", "strom", "ingrid", "ilker", "sik", "weiss", "stra", "zed", "sales", "SALES zed", "r&d",
+    "eng", "ing", "quali", "xyz",
+]
+NON_ASCII_QUERIES = ["Élodie", "é", "ÉLO", "zoë", "Ñ", "ström", "ø", "işık", "ingénierie", "ß", "å"]
+
+
+@pytest.fixture(scope="module")
+def db():
+    migrate()
+    writer = SessionLocal()
+    service = EmployeeService(writer, cache=None)
+    for i, name in enumerate(NAMES):
+        service.create_employee(EmployeeCreate(
+            name=name,
+            email=f"employee{i}@example.com",
+            department=DEPARTMENTS[i % len(DEPARTMENTS)],
+            designation="Engineer",
+            date_of_joining=date(2020, 1, 1 + i),
+        ))
+    writer.close()
+    directory_snapshot.max_staleness = float("inf")
+    build_snapshot()
+    session = SessionLocal()
+    yield session
+    session.close()
+
+
+def rows(result):
+    return [tuple(row) for row in result]
+
+
+@pytest.mark.parametrize("search", ASCII_QUERIES)
+def test_snapshot_matches_repository(db, search):
+    repository = EmployeeRepository(db)
+    assert snapshot_reads(db, search) is directory_snapshot
+    for offset in (0, 3):
+        assert rows(directory_snapshot.search_rows(search, 5, offset)) == rows(repository.search_rows(search, 5, offset))
+    assert sorted(directory_snapshot.facet_counts(search)) == sorted(map(tuple, repository.facet_counts(search)))
+
+
+def test_snapshot_orders_like_repository(db):
+    repository = EmployeeRepository(db)
+    expected = rows(repository.search_rows(None, len(NAMES), 0))
+    assert rows(directory_snapshot.search_rows(None, len(NAMES), 0)) == expected
+    # Keyset pagination resumes at the same place, whatever the case or accents of the cursor name
+    for name, _, _, _, _, employee_id in expected:
+        after = (name, employee_id)
+        assert rows(directory_snapshot.search_rows(None, 4, 0, after)) == rows(repository.search_rows(None, 4, 0, after))
+
+
+@pytest.mark.parametrize("search", NON_ASCII_QUERIES)
+def test_non_ascii_searches_go_to_the_database(db, search):
+    assert snapshot_reads(db, search) is None
+    assert snapshot_reads(db) is directory_snapshot
+
+
+def test_pinned_writer_sees_own_write(db):
+    writer = SessionLocal()
+    try:
+        EmployeeService(writer).create_employee(EmployeeCreate(
+            name="Quentin Newhire", email="newhire@example.com", department="Sales",
+            designation="Engineer", date_of_joining=date(2021, 1, 1),
+        ))
+        # The snapshot has not refreshed: unpinned readers may still miss the hire...
+        assert EmployeeService(db).search_employees_json("newhire")[0] == b"[]"
+        # ...but the writer, pinned to the primary, bypasses the snapshot, cache and coalescing
+        pin_to_primary(writer)
+        body, _ = EmployeeService(writer).search_employees_json("newhire")
+        assert b"newhire@example.com" in body
+    finally:
+        writer.close()
+
+
+def test_unsupported_database_fails_loudly(monkeypatch):
+    assert database_collation() is COLLATIONS["sqlite"]
+    monkeypatch.setattr("app.database.connection.engine", SimpleNamespace(dialect=SimpleNamespace(name="postgresql")))
+    with pytest.raises(ValueError, match="postgresql"):
+        database_collation()
+    with pytest.raises(ValueError):
+        build_snapshot()
+
+
+def test_more_labels_than_fit_in_16_bits():
+    snapshot = DirectorySnapshot(float("inf"))
+    count = 70000
+    snapshot.load(
+        ((f"n{i:05}", f"e{i}@example.com", "Sales", f"Title {i}", date(2020, 1, 1), i + 1) for i in range(count)),
+        0, time.monotonic(),
+    )
+    assert snapshot.get_row(count).designation == f"Title {count - 1}"
+    assert snapshot.facet_counts("n69999") == [("Sales", "Title 69999", 1)]
+
+
+def employee_rows():
+    """RESPONSE_COLUMNS rows of NAMES, with ids 1, 2, ..."""
+    return [
+        (name, f"employee{i}@example.com", DEPARTMENTS[i % len(DEPARTMENTS)], "Engineer", date(2020, 1, 1 + i), i + 1)
+        for i, name in enumerate(NAMES)
+    ]
+
+
+@pytest.fixture(scope="module")
+def mysql_snapshot():
+    snapshot = DirectorySnapshot(float("inf"), COLLATIONS["mysql"])
+    snapshot.load(employee_rows(), 0, time.monotonic())
+    return snapshot
+
+
+def names(result):
+    return [row.name for row in result]
+
+
+def test_mysql_collation_orders_ignoring_case_and_accents(mysql_snapshot):
+    ordered = names(mysql_snapshot.search_rows(None, len(NAMES)))
+    # Equal names under utf8mb4_0900_ai_ci stay in id order
+    assert ordered[ordered.index("Élodie Martin"):][:4] == ["Élodie Martin", "élodie martin", "Elodie MARTIN", "eLODIE martin"]
+    assert ordered.index("Øyvind Ødegård") < ordered.index("Straße Weiß") < ordered.index("Zoë Kulkarni")
+    # ß sorts as ss
+    assert ordered.index("Straße Weiß") + 1 == ordered.index("strasse weiss")
+    # Cursors resume after (name, id), whatever case and accents the name has
+    page = names(mysql_snapshot.search_rows(None, 2, 0, ("elodie martin", 2)))
+    assert page == ["Elodie MARTIN", "eLODIE martin"]
+
+
+@pytest.mark.parametrize("search, expected", [
+    ("elodie", {"Élodie Martin", "élodie martin", "Elodie MARTIN", "eLODIE martin"}),
+    ("ÉLO", {"Élodie Martin", "élodie martin", "Elodie MARTIN", "eLODIE martin"}),
+    ("odegard", {"Øyvind Ødegård", "oyvind odegard"}),
+    ("işık", {"İlker Işık", "ilker isik"}),
+    # LIKE compares character by character: ß does not match ss
+    ("weiss", {"strasse weiss"}),
+    ("ß", {"Straße Weiß"}),
+])
+def test_mysql_collation_matches_ignoring_case_and_accents(mysql_snapshot, search, expected):
+    assert mysql_snapshot.can_search(search)
+    assert set(names(mysql_snapshot.search_rows(search, len(NAMES)))) == expected
+
+
+def facet_keys(facets):
+    sort_key = COLLATIONS["mysql"].sort_key
+    return sorted((sort_key(department), sort_key(designation), count) for department, designation, count in facets)
+
+
+def test_mysql_collation_facets_group_equal_labels(mysql_snapshot):
+    assert [department for department, _, _ in mysql_snapshot.facet_counts("ingenierie")] == ["ingénierie"]
+    # "Sales" and "SALES" are one group, named by its first employee in search order
+    assert facet_keys(mysql_snapshot.facet_counts("sales")) == [("sales", "engineer", 8)]
+
+
+@pytest.fixture(scope="module")
+def mysql_db(mysql_engine):
+    session = sessionmaker(bind=mysql_engine)()
+    session.execute(insert(Employee), [
+        dict(zip(("name", "email", "department", "designation", "date_of_joining", "id"), row))
+        for row in employee_rows()
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.mark.parametrize("backend", [IlikeSearchBackend(), MySQLFullTextSearchBackend()], ids=lambda b: b.name)
+def test_mysql_collation_matches_mysql(mysql_db, mysql_snapshot, backend):
+    repository = EmployeeRepository(mysql_db, backend)
+    expected = rows(repository.search_rows(None, len(NAMES), 0))
+    assert rows(mysql_snapshot.search_rows(None, len(NAMES), 0)) == expected
+    for name, _, _, _, _, employee_id in expected:
+        after = (name, employee_id)
+        assert rows(mysql_snapshot.search_rows(None, 4, 0, after)) == rows(repository.search_rows(None, 4, 0, after))
+    for search in ASCII_QUERIES + NON_ASCII_QUERIES:
+        assert rows(mysql_snapshot.search_rows(search, len(NAMES), 0)) == rows(repository.search_rows(search, len(NAMES), 0))
+        # Which spelling names a group of equal labels is up to MySQL
+        assert facet_keys(mysql_snapshot.facet_counts(search)) == facet_keys(repository.facet_counts(search))